@@ -0,0 +1,46 @@
+"""Fixtures shared by the benchmark and check scripts."""
+from __future__ import annotations
+
+import random
+from typing import Optional, Sequence
+
+from src.services.database_manager import DatabaseManager
+
+PERSONAS = ["batman", "gremlin best friend", "soft voice", "drill sergeant"]
+LABELS = ["Take Adderall", "Drink water", "Do stretches", "Take vitamins", "Anxiety meds"]
+TIMEZONES = [None, None, "Europe/London", "Europe/Berlin", "America/Los_Angeles", "Asia/Kolkata"]
+
+
+class BenchConfig:
+    """The one ConfigLoader getter DatabaseManager needs; every tuning knob keeps its default."""
+
+    def __init__(self, path: str):
+        self._path = path
+
+    def get_sqlite_db_path(self) -> str:
+        return self._path
+
+
+def seed(
+    db: DatabaseManager, reminders: int, users: int, timezones: Sequence[Optional[str]] = TIMEZONES
+) -> None:
+    """Insert `users` users and `reminders` reminders at random times (fixed seed, so runs compare)."""
+    rnd = random.Random(42)
+
+    def work(conn):
+        conn.executemany(
+            "INSERT OR IGNORE INTO users(user_id, timezone) VALUES(?,?)",
+            [(str(u), rnd.choice(timezones)) for u in range(users)],
+        )
+        conn.executemany(
+            "INSERT INTO reminders(user_id, chat_id, label, persona, time_hhmm, active) VALUES(?,?,?,?,?,1)",
+            [
+                (
+                    str(rnd.randrange(users)), 1, rnd.choice(LABELS), rnd.choice(PERSONAS),
+                    f"{rnd.randrange(24):02d}:{rnd.randrange(60):02d}",
+                )
+                for _ in range(reminders)
+            ],
+        )
+
+    db.execute(work)
@@ -0,0 +1,76 @@
+"""
+Per-call overhead of a fresh aiohttp session per request vs the pooled ProviderTransport,
+measured against a local fake Ollama server.
+
+    python -m benchmarks.bench_ai_transport --calls 500
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import aiohttp
+from aiohttp import web
+
+from src.adapters.ai.http_transport import ProviderTransport
+from src.services.ai_manager import AIManager
+
+
+async def _start_fake_ollama() -> tuple[web.AppRunner, str]:
+    async def generate(request: web.Request) -> web.Response:
+        await request.json()
+        return web.json_response({"response": "Gotham needs you. Take your meds.", "done": True})
+
+    app = web.Application()
+    app.router.add_post("/api/generate", generate)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+async def _fresh_session_call(host: str) -> None:
+    # What AIManager._generate_with_ollama used to do on every call
+    async with aiohttp.ClientSession() as session:
+        async with session.post(f"{host}/api/generate", json={"model": "m", "prompt": "p", "stream": False}) as resp:
+            await resp.json()
+
+
+def _report(name: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    print(
+        f"{name:<16} calls={len(samples):<5} mean={statistics.fmean(samples) * 1e3:7.3f}ms "
+        f"p50={statistics.median(samples) * 1e3:7.3f}ms p99={samples[int(len(samples) * 0.99) - 1] * 1e3:7.3f}ms"
+    )
+
+
+async def _time(n: int, call) -> list[float]:
+    out = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        await call()
+        out.append(time.perf_counter() - t0)
+    return out
+
+
+async def main(calls: int) -> None:
+    runner, host = await _start_fake_ollama()
+    transport = ProviderTransport()
+    try:
+        ai = AIManager(provider="ollama", ollama_host=host, enabled=True, transport=transport)
+
+        _report("fresh session", await _time(calls, lambda: _fresh_session_call(host)))
+        _report("pooled AIManager", await _time(calls, lambda: ai._generate_with_ollama(prompt="p")))
+    finally:
+        await transport.close()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=500)
+    asyncio.run(main(parser.parse_args().calls))
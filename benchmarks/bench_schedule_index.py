@@ -0,0 +1,71 @@
+"""
+Tick latency at scale: ScheduleIndex pop (UTC fire minutes) vs the per-tick SQLite query.
+
+    python -m benchmarks.bench_schedule_index --reminders 100000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks._common import TIMEZONES as COMMON_TIMEZONES, BenchConfig, seed
+from src.dao.reminders_dao import RemindersDAO
+from src.services.database_manager import DatabaseManager
+from src.services.schedule_index import ScheduleIndex
+from src.utils.timezones import now_minute
+
+# Adds a zone with a southern-hemisphere DST calendar to the usual mix
+TIMEZONES = [*COMMON_TIMEZONES, "Australia/Sydney"]
+
+
+def _report(name: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(
+        f"{name:<12} ticks={len(samples):<5} "
+        f"p50={statistics.median(samples) * 1e6:9.1f}us  p99={p99 * 1e6:9.1f}us  max={samples[-1] * 1e6:9.1f}us"
+    )
+
+
+async def main(reminders: int, users: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(BenchConfig(os.path.join(tmp, "bench.db")))
+        dao = RemindersDAO(db)
+        seed(db, reminders, users, TIMEZONES)
+
+        minutes = [f"{m // 60:02d}:{m % 60:02d}" for m in range(24 * 60)]
+        start = now_minute()
+
+        t0 = time.perf_counter()
+        index = ScheduleIndex()
+        index.load(await dao.list_active_schedule(), start)
+        print(f"index load: {len(index)} reminders in {(time.perf_counter() - t0) * 1e3:.1f} ms")
+
+        # One simulated day of ticks; each pop also re-arms the entries for tomorrow
+        index_samples = []
+        for minute in range(start, start + len(minutes)):
+            t0 = time.perf_counter()
+            [e.as_tuple() for _, e in index.pop_due(minute)]
+            index_samples.append(time.perf_counter() - t0)
+        print(f"index stats after one day: {index.stats()}")
+
+        sql_samples = []
+        for hhmm in minutes:
+            t0 = time.perf_counter()
+            await dao.due_at_minute(hhmm)
+            sql_samples.append(time.perf_counter() - t0)
+
+        _report("index", index_samples)
+        _report("sqlite", sql_samples)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reminders", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=20_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.reminders, args.users))
@@ -0,0 +1,142 @@
+"""
+Degraded-model check: runs dispatch ticks against a local fake Ollama that
+hangs, recovers, then gets slow, and checks that reminders are never held up
+by more than the render budget.
+
+- hung server: the first tick's renders time out at the render budget, then
+  the circuit breaker opens and the next tick falls back without waiting
+- recovered server: after reset_seconds a half-open probe closes the breaker
+  and model lines come back
+- slow server with more renders than max_pending: the excess is shed to the
+  `Remember to ...` line instead of queueing
+
+    python -m benchmarks.check_ai_degradation --reminders 100 --budget 2
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timezone
+
+from aiohttp import web
+
+from src.services.ai_manager import AIManager
+from src.services.circuit_breaker import CLOSED, OPEN, CircuitBreaker
+from src.services.dispatch_pipeline import DispatchPipeline, DueReminder
+
+MODEL_LINE = "Gotham needs you, so take your meds right now."
+
+
+async def _start_fake_ollama(state: dict) -> tuple[web.AppRunner, str]:
+    async def generate(request: web.Request) -> web.Response:
+        await request.json()
+        if state["mode"] == "hang":
+            await asyncio.sleep(3600)
+        elif state["mode"] == "slow":
+            await asyncio.sleep(0.5)
+        return web.json_response({"response": MODEL_LINE, "done": True})
+
+    app = web.Application()
+    app.router.add_post("/api/generate", generate)
+    runner = web.AppRunner(app, shutdown_timeout=0.1)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+class _Manager:
+    """The slice of RemindersManager that DispatchPipeline uses."""
+
+    def __init__(self, ai: AIManager):
+        self.ai = ai
+
+    async def render_message(self, persona, label, user_name=None):
+        return await self.ai.render(persona=persona, label=label, user_name=user_name)
+
+    async def render_batch(self, items):
+        return await self.ai.generate_batch(items)
+
+
+class _Chat:
+    def __init__(self):
+        self.texts = []
+
+    async def send_dm(self, user_id, text):
+        self.texts.append(text)
+
+
+async def _tick(pipeline: DispatchPipeline, chat: _Chat, n: int):
+    chat.texts.clear()
+    now = datetime.now(timezone.utc)
+    due = [DueReminder(str(i), "batman", f"med {i}", now, i) for i in range(n)]
+    report = await pipeline.run(due)
+    fallbacks = sum(1 for t in chat.texts if t.startswith("Remember to"))
+    return report, fallbacks
+
+
+async def main(args) -> int:
+    state = {"mode": "hang"}
+    runner, host = await _start_fake_ollama(state)
+    ai = AIManager(provider="ollama", ollama_host=host, enabled=True)
+    ai.stream = False
+    ai.breaker = CircuitBreaker("ollama", failure_threshold=5, slow_call_seconds=args.budget, reset_seconds=args.reset)
+    chat = _Chat()
+    pipeline = DispatchPipeline(
+        _Manager(ai), chat, concurrency=16, deadline_seconds=45.0, render_budget_seconds=args.budget
+    )
+    failures = []
+
+    def check(label, report, fallbacks, *, max_lateness, state_is=None, max_fallbacks=None, min_fallbacks=0):
+        print(
+            f"{label:<26} sent={report.sent:<4} model_fallbacks={fallbacks:<4} "
+            f"max_lateness={report.max_lateness:6.2f}s breaker={ai.breaker.state} shed={ai.status()['shed']}"
+        )
+        if report.sent != args.reminders:
+            failures.append(f"{label}: sent {report.sent}/{args.reminders}")
+        if report.max_lateness > max_lateness:
+            failures.append(f"{label}: max lateness {report.max_lateness:.2f}s > {max_lateness:.2f}s")
+        if state_is and ai.breaker.state != state_is:
+            failures.append(f"{label}: breaker {ai.breaker.state}, expected {state_is}")
+        if max_fallbacks is not None and fallbacks > max_fallbacks:
+            failures.append(f"{label}: {fallbacks} fallback lines, expected at most {max_fallbacks}")
+        if fallbacks < min_fallbacks:
+            failures.append(f"{label}: {fallbacks} fallback lines, expected at least {min_fallbacks}")
+
+    slack = 0.5
+    try:
+        report, fb = await _tick(pipeline, chat, args.reminders)
+        check("hung server", report, fb, max_lateness=args.budget + slack, state_is=OPEN)
+        report, fb = await _tick(pipeline, chat, args.reminders)
+        check("hung server, breaker open", report, fb, max_lateness=slack, min_fallbacks=args.reminders)
+
+        state["mode"] = "ok"
+        await asyncio.sleep(args.reset)
+        report, fb = await _tick(pipeline, chat, args.reminders)
+        check("recovered, probing", report, fb, max_lateness=args.budget + slack, state_is=CLOSED)
+        report, fb = await _tick(pipeline, chat, args.reminders)
+        check("recovered", report, fb, max_lateness=args.budget + slack, state_is=CLOSED, max_fallbacks=0)
+
+        state["mode"] = "slow"
+        ai.max_pending = 4
+        report, fb = await _tick(pipeline, chat, args.reminders)
+        check("slow server, max_pending=4", report, fb, max_lateness=args.budget + slack, min_fallbacks=1)
+    finally:
+        await ai.close()
+        await runner.cleanup()
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print("OK" if not failures else f"{len(failures)} failure(s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reminders", type=int, default=100)
+    parser.add_argument("--budget", type=float, default=2.0, help="render budget (seconds)")
+    parser.add_argument("--reset", type=float, default=1.5, help="breaker reset (seconds)")
+    sys.exit(asyncio.run(main(parser.parse_args())))
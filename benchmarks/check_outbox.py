@@ -0,0 +1,136 @@
+"""
+Outbox check: dispatches through the real manager, pipeline and SQLite outbox
+against a fake chat client that fails in the ways Discord does.
+
+- a transient failure (HTTP 5xx-style) is retried with backoff until delivered
+- a user with DMs closed is recorded as undeliverable, then skipped on later
+  ticks (no API call) until they create a reminder again
+- a crash after the claim but before the send: a fresh process resumes the
+  claimed reminders on startup and delivers them
+- every (reminder, fire minute) is delivered exactly once
+
+    python -m benchmarks.check_outbox --users 200
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+from collections import Counter
+
+from benchmarks._common import BenchConfig
+from src.dao.outbox_dao import OutboxDAO
+from src.dao.reminders_dao import RemindersDAO
+from src.services.database_manager import DatabaseManager
+from src.services.dispatch_pipeline import DispatchPipeline
+from src.services.outbox import Outbox
+from src.services.reminders_manager import RemindersManager
+from src.utils.timezones import minute_to_utc, now_minute
+from src.utils.types import UndeliverableError
+
+
+class _FlakyChat:
+    """user "closed-*" has DMs disabled; "flaky-*" fails its first `failures` attempts."""
+
+    def __init__(self, failures: int = 2):
+        self.failures = failures
+        self.attempts: Counter = Counter()
+        self.delivered: Counter = Counter()
+
+    async def send_dm(self, user_id: str, text: str) -> None:
+        self.attempts[user_id] += 1
+        if user_id.startswith("closed-"):
+            raise UndeliverableError(user_id, "DMs disabled")
+        if user_id.startswith("flaky-") and self.attempts[user_id] <= self.failures:
+            raise RuntimeError("503 Service Unavailable")
+        self.delivered[(user_id, text.splitlines()[0])] += 1
+
+
+def _boot(path: str, chat: _FlakyChat):
+    """One process: DB, manager with outbox, pipeline. Retries are fast here."""
+    db = DatabaseManager(BenchConfig(path))
+    dao = RemindersDAO(db)
+    outbox = Outbox(OutboxDAO(db), chat, backoff_seconds=0.05, max_backoff_seconds=0.2, hold_seconds=60)
+    manager = RemindersManager(dao, default_tz="UTC", outbox=outbox, max_catchup_minutes=15)
+    pipeline = DispatchPipeline(manager, chat, outbox=outbox)
+    return db, dao, manager, pipeline
+
+
+async def main(args) -> int:
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "reminders.db")
+        chat = _FlakyChat()
+        db, dao, manager, pipeline = _boot(path, chat)
+
+        start = now_minute()
+        users = [f"ok-{i}" for i in range(args.users)] + ["flaky-1", "flaky-2", "closed-1"]
+        for minute in (start, start + 1, start + 2):
+            hhmm = minute_to_utc(minute).strftime("%H:%M")
+            for user in users:
+                await dao.create_reminder(user, hhmm, f"med {minute - start}", "batman")
+
+        # Tick 1: normal dispatch; flaky users fail, closed user becomes undeliverable
+        report = await pipeline.run(await manager.take_due(start))
+        pending = await manager.outbox.dao.pending_count()
+        print(f"tick 1: sent={report.sent} failed={report.failed} pending={pending} blocked={sorted(manager.outbox.blocked)}")
+        if pending != 2:
+            failures.append(f"tick 1: expected the 2 flaky users pending, got {pending}")
+        if manager.outbox.blocked != {"closed-1"}:
+            failures.append(f"tick 1: blocked users {manager.outbox.blocked}")
+
+        for _ in range(20):
+            await asyncio.sleep(0.1)
+            await manager.outbox.drain()
+            if not await manager.outbox.dao.pending_count():
+                break
+        print(f"retries: pending={await manager.outbox.dao.pending_count()} stats={manager.outbox.stats()}")
+
+        # Tick 2 is claimed, then the process "crashes" before sending anything
+        claimed = await manager.take_due(start + 1)
+        print(f"tick 2: claimed {len(claimed)}, crashing before the send")
+        if any(d.user_id == "closed-1" for d in claimed):
+            failures.append("tick 2: undeliverable user was claimed again")
+        closed_attempts = chat.attempts["closed-1"]
+        db.close()
+
+        # Restart: the claimed tick-2 reminders are resumed from the outbox
+        db, dao, manager, pipeline = _boot(path, chat)
+        released = await manager.outbox.load()
+        delivered = await manager.outbox.drain()
+        print(f"restart: released={released} delivered={delivered}")
+        if delivered != len(claimed):
+            failures.append(f"restart: resumed {delivered} of {len(claimed)} claimed reminders")
+
+        # Tick 3: the closed user is still skipped; creating a reminder unblocks them
+        await pipeline.run(await manager.take_due(start + 2))
+        if chat.attempts["closed-1"] != closed_attempts:
+            failures.append("tick 3: undeliverable user was sent to again")
+        await manager.create_reminder("closed-1", persona="batman", time_str="00:00", label="water")
+        if manager.outbox.is_blocked("closed-1") or "closed-1" in await manager.outbox.dao.undeliverable_users():
+            failures.append("closed-1 still blocked after creating a reminder")
+        db.close()
+
+    dupes = {k: n for k, n in chat.delivered.items() if n > 1}
+    expected = (len(users) - 1) * 3
+    total = sum(chat.delivered.values())
+    print(f"delivered {total} DMs (expected {expected}), duplicates={len(dupes)}")
+    if total != expected:
+        failures.append(f"delivered {total} DMs, expected {expected}")
+    if dupes:
+        failures.append(f"{len(dupes)} reminders delivered more than once, e.g. {next(iter(dupes))}")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print("OK" if not failures else f"{len(failures)} failure(s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    logging.basicConfig(level=logging.ERROR, format="%(levelname)s %(message)s")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,109 @@
+"""
+Startup check: boots the bot's cogs twice against one SQLite file, without
+connecting to Discord (tree.sync is replaced by a counter).
+
+- first boot: migrations run and the command tree is synced
+- restart: no schema work, the unchanged tree is not synced again
+- reconnect (on_ready again): nothing happens
+- a changed tree (new command) is synced on the next boot
+
+Prints each boot's phase timings; exits 1 if any expectation fails.
+
+    python -m benchmarks.check_startup
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from src.database.migrations import LATEST_VERSION
+from src.infra import startup
+from src.infra.startup import StartupTimer
+
+
+async def _boot(db_path: str, extra_command: bool = False):
+    """One simulated process start. Returns (timer, sync calls, schema version, bot)."""
+    os.environ["SQLITE_DB_PATH"] = db_path
+    timer = StartupTimer()
+    startup.STARTUP = timer
+    # Modules bound STARTUP at import; point them at this boot's timer
+    import src.cogs.events_cog as events_cog
+    import src.cogs.reminders_cog as reminders_cog
+    import src.services.database_manager as database_manager
+    for module in (events_cog, reminders_cog, database_manager):
+        module.STARTUP = timer
+
+    from src.utils.config_loader import ConfigLoader
+
+    with timer.phase("config"):
+        config = ConfigLoader()
+    intents = discord.Intents.default()
+    intents.message_content = True
+    bot = commands.Bot(command_prefix="!", intents=intents)
+    bot.config = config
+    bot.chat = None
+
+    calls = []
+
+    async def fake_sync(*, guild=None):
+        calls.append(guild)
+        return []
+
+    bot.tree.sync = fake_sync
+    with timer.phase("cogs"):
+        await bot.load_extension("src.cogs.events_cog")
+        await bot.load_extension("src.cogs.reminders_cog")
+    if extra_command:
+        @bot.tree.command(name="ping", description="check")
+        async def ping(interaction: discord.Interaction):
+            await interaction.response.send_message("pong")
+
+    events = bot.get_cog("EventsCog")
+    await events.on_ready()
+    await events.on_ready()          # a gateway reconnect fires on_ready again
+    reminders = bot.get_cog("RemindersCog")
+    version = reminders.manager.dao.db.execute(lambda conn: conn.execute("PRAGMA user_version").fetchone()[0])
+    return timer, len(calls), version, bot
+
+
+async def _shutdown(bot) -> None:
+    await bot.unload_extension("src.cogs.reminders_cog")
+    await bot.unload_extension("src.cogs.events_cog")
+
+
+async def main() -> int:
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(message)s")
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "reminders.db")
+        runs = [("first boot", False, 1), ("restart", False, 0), ("restart, new command", True, 1)]
+        for label, extra, expected_syncs in runs:
+            started = time.perf_counter()
+            timer, syncs, version, bot = await _boot(db_path, extra_command=extra)
+            elapsed = time.perf_counter() - started
+            await _shutdown(bot)
+            phases = " ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in timer.phases)
+            print(f"{label:<22} ready={elapsed * 1000:7.1f}ms  syncs={syncs}  schema=v{version}  [{phases}]")
+            if syncs != expected_syncs:
+                failures.append(f"{label}: expected {expected_syncs} tree.sync call(s), got {syncs}")
+            if version != LATEST_VERSION:
+                failures.append(f"{label}: schema v{version}, expected v{LATEST_VERSION}")
+            if timer.ready_seconds is None:
+                failures.append(f"{label}: STARTUP.ready() was never reached")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print("OK" if not failures else f"{len(failures)} failure(s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,204 @@
+"""
+Micro-benchmark suite for the DAO, manager and AI rendering hot paths.
+
+Seeds a temporary SQLite database, times each path, prints a table and can write
+the results as JSON and compare them against a stored baseline. With --baseline the
+exit status is 1 when any path's p50 regressed by more than --threshold.
+
+    python -m benchmarks.run --json bench.json
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --threshold 0.25
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from benchmarks._common import LABELS, PERSONAS, BenchConfig, seed
+from src.dao.reminders_dao import RemindersDAO
+from src.services.ai_manager import AIManager
+from src.services.database_manager import DatabaseManager
+from src.services.reminders_manager import RemindersManager
+from src.utils.timezones import now_minute
+
+# Bump when a benchmark changes meaning so old baselines aren't compared against it
+SCHEMA = 1
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    """Seconds in, microseconds out."""
+    s = sorted(samples)
+
+    def pct(p: float) -> float:
+        return s[min(len(s) - 1, max(0, int(round(len(s) * p)) - 1))] * 1e6
+
+    mean = statistics.fmean(s)
+    return {
+        "n": len(s),
+        "mean_us": round(mean * 1e6, 2),
+        "p50_us": round(statistics.median(s) * 1e6, 2),
+        "p95_us": round(pct(0.95), 2),
+        "p99_us": round(pct(0.99), 2),
+        "max_us": round(s[-1] * 1e6, 2),
+        "ops_per_s": round(1 / mean, 1) if mean else 0.0,
+    }
+
+
+async def _time(fn: Callable[[int], Awaitable], iterations: int, warmup: int) -> List[float]:
+    for i in range(warmup):
+        await fn(i)
+    samples = []
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        await fn(warmup + i)
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+async def run_suite(reminders: int, users: int, iterations: int, warmup: int) -> Dict[str, Dict[str, float]]:
+    rnd = random.Random(1)
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(BenchConfig(os.path.join(tmp, "bench.db")))
+        dao = RemindersDAO(db)
+        seed(db, reminders, users)
+
+        minutes = [f"{m // 60:02d}:{m % 60:02d}" for m in range(24 * 60)]
+        user_ids = [str(u) for u in range(users)]
+
+        async def due_at_minute(i):
+            await dao.due_at_minute(minutes[i % len(minutes)])
+
+        async def list_reminders(_):
+            await dao.list_reminders(rnd.choice(user_ids))
+
+        results["dao.due_at_minute"] = _summary(await _time(due_at_minute, iterations, warmup))
+        results["dao.list_reminders"] = _summary(await _time(list_reminders, iterations, warmup))
+
+        # add/delete are timed separately but always paired, so the table size stays put
+        add_samples, delete_samples = [], []
+        for i in range(warmup + iterations):
+            row = (rnd.choice(user_ids), rnd.choice(minutes), f"bench {i}", rnd.choice(PERSONAS))
+            t0 = time.perf_counter()
+            await dao.add_reminder(*row)
+            t1 = time.perf_counter()
+            await dao.delete_reminder(row[0], row[1], row[2])
+            t2 = time.perf_counter()
+            if i >= warmup:
+                add_samples.append(t1 - t0)
+                delete_samples.append(t2 - t1)
+        results["dao.add_reminder"] = _summary(add_samples)
+        results["dao.delete_reminder"] = _summary(delete_samples)
+
+        # Manager: the index lookahead used by pre-render and the dispatcher's per-tick claim
+        manager = RemindersManager(dao, "America/New_York", max_catchup_minutes=iterations + warmup)
+        start = now_minute()
+        t0 = time.perf_counter()
+        await manager.load_schedule(now=start)
+        results["manager.load_schedule"] = _summary([time.perf_counter() - t0])
+
+        async def peek_due(i):
+            manager.peek_due(start + 1 + i % len(minutes))
+
+        async def take_due(i):
+            await manager.take_due(start + i)
+
+        results["manager.peek_due"] = _summary(await _time(peek_due, iterations, warmup))
+        results["manager.take_due"] = _summary(await _time(take_due, min(iterations, len(minutes) - warmup), warmup))
+
+        # AI rendering with the model disabled: prompt building + fallback + finalize
+        ai = AIManager(enabled=False)
+
+        async def generate(i):
+            await ai.generate(PERSONAS[i % len(PERSONAS)], LABELS[i % len(LABELS)], "Sam")
+
+        results["ai.generate_fallback"] = _summary(await _time(generate, iterations, warmup))
+        db.close()
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """Prints a p50 comparison; returns the names of benchmarks that regressed beyond threshold."""
+    regressed = []
+    print(f"\n{'benchmark':<24} {'baseline p50':>14} {'p50':>12} {'change':>9}")
+    for name, cur in results.items():
+        base = baseline.get(name)
+        if not base or not base.get("p50_us"):
+            print(f"{name:<24} {'-':>14} {cur['p50_us']:>10.1f}us {'new':>9}")
+            continue
+        change = cur["p50_us"] / base["p50_us"] - 1
+        flag = ""
+        if change > threshold:
+            regressed.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<24} {base['p50_us']:>12.1f}us {cur['p50_us']:>10.1f}us {change:>+8.0%}{flag}")
+    return regressed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reminders", type=int, default=50_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write results as the new baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against this baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed p50 slowdown (0.25 = +25%%)")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_suite(args.reminders, args.users, args.iterations, args.warmup))
+    doc = {
+        "schema": SCHEMA,
+        "created_at": int(time.time()),
+        "params": {
+            "reminders": args.reminders, "users": args.users,
+            "iterations": args.iterations, "warmup": args.warmup,
+        },
+        "env": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+    print(f"{'benchmark':<24} {'p50':>10} {'p95':>10} {'p99':>10} {'ops/s':>10}")
+    for name, r in results.items():
+        print(f"{name:<24} {r['p50_us']:>8.1f}us {r['p95_us']:>8.1f}us {r['p99_us']:>8.1f}us {r['ops_per_s']:>10.0f}")
+
+    for path in filter(None, (args.json, args.save_baseline)):
+        with open(path, "w") as f:
+            json.dump(doc, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"wrote {path}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("schema") != SCHEMA:
+        print(f"baseline schema {baseline.get('schema')} != {SCHEMA}; re-record it with --save-baseline")
+        return 1
+    if baseline.get("params") != doc["params"]:
+        print(f"warning: baseline params {baseline.get('params')} differ from this run")
+    regressed = compare(results, baseline.get("results", {}), args.threshold)
+    if regressed:
+        print(f"\n{len(regressed)} regression(s) over {args.threshold:.0%}: {', '.join(regressed)}")
+        return 1
+    print("\nno regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderTransport:
+    """
+    One long-lived HTTP transport for AI providers (Ollama today).
+
+    - Lazily creates a single aiohttp.ClientSession on first use (needs a running loop)
+    - Pooled keep-alive connections, capped per host
+    - close() on cog unload / shutdown
+    """
+
+    def __init__(
+        self,
+        *,
+        limit_per_host: int = 8,
+        keepalive_timeout: float = 60.0,
+        timeout_seconds: float = 60.0,
+    ):
+        self.limit_per_host = max(1, limit_per_host)
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout_seconds = timeout_seconds
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=0,  # total is bounded by per-host limit × provider hosts
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout_seconds),
+            )
+            logger.info(
+                "ProviderTransport: session opened (limit_per_host=%d keepalive=%.0fs)",
+                self.limit_per_host, self.keepalive_timeout,
+            )
+        return self._session
+
+    def post(self, url: str, *, json: Dict[str, Any], timeout: Optional[float] = None):
+        """Return the session.post(...) context manager (caller reads/streams the body)."""
+        kwargs = {"json": json}
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+        return self.session.post(url, **kwargs)
+
+    async def post_json(self, url: str, *, json: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        async with self.post(url, json=json, timeout=timeout) as resp:
+            if resp.status != 200:
+                text = await resp.text()
+                raise RuntimeError(f"HTTP {resp.status} from {url}: {text}")
+            return await resp.json()
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("ProviderTransport: session closed")
+        self._session = None
@@ -1,17 +1,28 @@
 import logging
+import time
+from typing import Optional
 import discord
-from src.utils.types import ChatClient
+from src.adapters.chat.discord_user_cache import DiscordUserCache
+from src.infra import metrics
+from src.utils.types import ChatClient, RateLimitedError, UndeliverableError
 
 logger = logging.getLogger(__name__)
 
+_SENDS = metrics.counter("chat_sends_total", "DM attempts by outcome", ("platform", "result"))
+_SEND_SECONDS = metrics.histogram("chat_send_seconds", "Platform API latency of one DM", ("platform",))
+
 class DiscordChatClient(ChatClient):
     """
     Discord adapter that implements the generic ChatClient interface.
     Responsible for sending DMs or messages via the discord.py API.
+
+    Failures are raised, not swallowed: UndeliverableError when the user can't be
+    DMed at all, RateLimitedError on a 429, anything else as-is (the outbox retries it).
     """
 
-    def __init__(self, bot: discord.Client):
+    def __init__(self, bot: discord.Client, users: Optional[DiscordUserCache] = None):
         self.bot = bot
+        self.users = users or DiscordUserCache(bot)
 
     async def send_dm(self, user_id: str, text: str) -> None:
         """
@@ -19,20 +30,61 @@ class DiscordChatClient(ChatClient):
         :param user_id: The user's Discord ID (string or int)
         :param text: The message to send
         """
+        started = time.perf_counter()
+        result = "failed"
         try:
-            user = await self.bot.fetch_user(int(user_id))
-            if user is None:
+            channel = await self.users.get_dm_channel(user_id)
+            if channel is None:
+                result = "unknown_user"
                 logger.warning("DiscordChatClient: Could not fetch user %s", user_id)
-                return
+                raise UndeliverableError(user_id, "unknown user")
 
-            await user.send(text)
+            await channel.send(text)
+            result = "ok"
             logger.info("Sent DM to user %s", user_id)
 
-        except discord.Forbidden:
+        except discord.Forbidden as e:
+            result = "forbidden"
+            self.users.invalidate(user_id)
             logger.warning("DiscordChatClient: Cannot DM user %s (DMs disabled)", user_id)
+            raise UndeliverableError(user_id, "DMs disabled") from e
+
+        except discord.NotFound as e:
+            result = "unknown_user"
+            self.users.invalidate(user_id)
+            raise UndeliverableError(user_id, "unknown user") from e
+
+        except discord.RateLimited as e:
+            result = "rate_limited"
+            raise RateLimitedError(e.retry_after) from e
 
         except discord.HTTPException as e:
+            if e.status == 429:
+                result = "rate_limited"
+                raise RateLimitedError(_retry_after(e), is_global=_is_global(e)) from e
             logger.error("DiscordChatClient: Failed to send DM to %s: %s", user_id, e)
+            raise
+
+        except UndeliverableError:
+            raise
 
         except Exception as e:
             logger.exception("DiscordChatClient: Unexpected error sending to %s: %s", user_id, e)
+            raise
+
+        finally:
+            _SENDS.labels("discord", result).inc()
+            _SEND_SECONDS.labels("discord").observe(time.perf_counter() - started)
+
+
+def _retry_after(e: discord.HTTPException) -> float:
+    headers = getattr(e.response, "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After") or headers.get("X-RateLimit-Reset-After") or 1.0)
+    except (TypeError, ValueError):
+        return 1.0
+
+
+def _is_global(e: discord.HTTPException) -> bool:
+    headers = getattr(e.response, "headers", None) or {}
+    return str(headers.get("X-RateLimit-Global", "")).lower() == "true"
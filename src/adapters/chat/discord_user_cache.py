@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+
+class DiscordUserCache:
+    """
+    Bounded user + DM-channel cache shared by RemindersCog and DiscordChatClient.
+
+    - Prefers the gateway cache (bot.get_user), which costs nothing
+    - Falls back to REST (fetch_user / create_dm) only on a miss; concurrent misses
+      for one user share a single in-flight fetch_user
+    - Entries expire after ttl_seconds; least-recently-used entries are evicted past max_size
+    - stats() exposes hit/miss counters for sizing
+    """
+
+    def __init__(self, bot: discord.Client, *, max_size: int = 10_000, ttl_seconds: float = 3600.0):
+        self.bot = bot
+        self.max_size = max(1, max_size)
+        self.ttl_seconds = ttl_seconds
+        # user_id -> (expires_at, user, dm_channel or None)
+        self._entries: "OrderedDict[int, Tuple[float, discord.abc.User, Optional[discord.DMChannel]]]" = OrderedDict()
+        self._inflight: "Dict[int, asyncio.Task]" = {}   # user_id -> pending fetch_user
+        self._counters: Dict[str, int] = {
+            "gateway_hits": 0,
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "expired": 0,
+            "evictions": 0,
+            "dm_channel_hits": 0,
+            "dm_channel_creates": 0,
+        }
+
+    # ---------- public API ----------
+    async def get_user(self, user_id: str) -> Optional[discord.abc.User]:
+        uid = int(user_id)
+
+        entry = self._lookup(uid)
+        if entry is not None:
+            self._counters["hits"] += 1
+            return entry[1]
+
+        user = self.bot.get_user(uid)
+        if user is not None:
+            self._counters["gateway_hits"] += 1
+            self._store(uid, user, None)
+            return user
+
+        pending = self._inflight.get(uid)
+        if pending is not None:
+            self._counters["coalesced"] += 1
+        else:
+            self._counters["misses"] += 1
+            pending = asyncio.ensure_future(self._fetch(uid))
+            self._inflight[uid] = pending
+            pending.add_done_callback(lambda task: self._fetched(uid, task))
+        # shield: one caller giving up must not cancel the fetch the others wait on
+        return await asyncio.shield(pending)
+
+    async def get_dm_channel(self, user_id: str) -> Optional[discord.DMChannel]:
+        uid = int(user_id)
+        entry = self._lookup(uid)
+        if entry is not None and entry[2] is not None:
+            self._counters["dm_channel_hits"] += 1
+            return entry[2]
+
+        user = await self.get_user(user_id)
+        if user is None:
+            return None
+        channel = user.dm_channel
+        if channel is None:
+            self._counters["dm_channel_creates"] += 1
+            channel = await user.create_dm()
+        self._store(uid, user, channel)
+        return channel
+
+    async def get_display_name(self, user_id: str) -> Optional[str]:
+        user = await self.get_user(user_id)
+        return user.name if user and user.name else None
+
+    def invalidate(self, user_id: str) -> None:
+        self._entries.pop(int(user_id), None)
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._counters, "size": len(self._entries), "max_size": self.max_size}
+
+    # ---------- internals ----------
+    async def _fetch(self, uid: int) -> Optional[discord.abc.User]:
+        user = await self.bot.fetch_user(uid)
+        if user is not None:
+            self._store(uid, user, None)
+        return user
+
+    def _fetched(self, uid: int, task: asyncio.Task) -> None:
+        if self._inflight.get(uid) is task:
+            del self._inflight[uid]
+        if not task.cancelled():
+            task.exception()   # every waiter may have gone; don't warn "never retrieved"
+
+    def _lookup(self, uid: int):
+        entry = self._entries.get(uid)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            self._counters["expired"] += 1
+            del self._entries[uid]
+            return None
+        self._entries.move_to_end(uid)
+        return entry
+
+    def _store(self, uid: int, user: discord.abc.User, channel: Optional[discord.DMChannel]) -> None:
+        self._entries[uid] = (time.monotonic() + self.ttl_seconds, user, channel)
+        self._entries.move_to_end(uid)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
@@ -1,11 +1,13 @@
 import asyncio
 import logging
+from src.infra.startup import STARTUP  # first, so time-to-ready includes the imports below
 import discord
 from discord.ext import commands
 from src.utils.config_loader import ConfigLoader
 from src.infra.cron_http import start_http_server
 from src.services.chat_manager import ChatManager
 from src.adapters.chat.discord_client import DiscordChatClient
+from src.adapters.chat.discord_user_cache import DiscordUserCache
 
 logging.basicConfig(
     level=logging.INFO,
@@ -17,31 +19,51 @@ logger = logging.getLogger(__name__)
 def create_bot() -> commands.Bot:
     intents = discord.Intents.default()
     intents.message_content = True
-    return commands.Bot(command_prefix="!", intents=intents)
+    # Surface long per-route waits as discord.RateLimited so ChatManager schedules the retry
+    # (30s is the minimum discord.py accepts).
+    return commands.Bot(command_prefix="!", intents=intents, max_ratelimit_timeout=30.0)
 
 async def main():
     # --- Load configuration ---
-    config = ConfigLoader()
-    token = config.get_discord_token()
+    with STARTUP.phase("config"):
+        config = ConfigLoader()
+        token = config.get_discord_token()
 
     # --- Initialize the bot ---
     bot = create_bot()
     bot.config = config
 
     # --- NEW: Register chat manager (Discord adapter only for now) ---
-    chat = ChatManager(default="discord")
-    chat.register("discord", DiscordChatClient(bot))
+    # One user/DM-channel cache shared by the adapter and the cogs
+    bot.user_cache = DiscordUserCache(
+        bot,
+        max_size=config.get_user_cache_size(),
+        ttl_seconds=config.get_user_cache_ttl_seconds(),
+    )
+
+    chat = ChatManager(
+        default="discord",
+        queue_size=config.get_chat_send_queue_size(),
+        workers=config.get_chat_send_workers(),
+        global_rate=config.get_chat_global_rate(),
+        route_rate=config.get_chat_route_rate(),
+    )
+    chat.register("discord", DiscordChatClient(bot, bot.user_cache))
     bot.chat = chat  # attach to bot instance so cogs can call self.bot.chat
 
     # --- Load all cogs ---
-    await bot.load_extension("src.cogs.events_cog")
-    await bot.load_extension("src.cogs.reminders_cog")
+    with STARTUP.phase("cogs"):
+        await bot.load_extension("src.cogs.events_cog")
+        await bot.load_extension("src.cogs.reminders_cog")
 
     # --- Optional: start internal HTTP server for cron pings ---
     asyncio.create_task(start_http_server(bot, host="127.0.0.1", port=8088))
 
     # --- Run the bot ---
-    await bot.start(token)
+    try:
+        await bot.start(token)
+    finally:
+        await chat.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
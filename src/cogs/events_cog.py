@@ -1,25 +1,51 @@
 import logging
 from discord.ext import commands
 
+from src.infra.startup import STARTUP, command_tree_hash, read_synced_hash, write_synced_hash
+
 logger = logging.getLogger(__name__)
 
 class EventsCog(commands.Cog):
-    """General bot events & one-time slash command sync."""
+    """
+    General bot events & slash command sync.
+
+    tree.sync() is a rate-limited REST call, so it only runs when the command
+    tree's fingerprint differs from the one recorded after the last successful
+    sync (or FORCE_COMMAND_SYNC is set). on_ready after a reconnect does nothing.
+    """
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self._synced = False
 
+    async def _sync_commands(self) -> str:
+        config = getattr(self.bot, "config", None)
+        state_path = config.get_command_sync_state_path() if config else None
+        force = config.get_force_command_sync() if config else True
+        digest = command_tree_hash(self.bot.tree, self.bot.application_id)
+        if not force and state_path and read_synced_hash(state_path) == digest:
+            return "unchanged, sync skipped"
+        await self.bot.tree.sync()
+        if state_path:
+            try:
+                write_synced_hash(state_path, digest)
+            except OSError as e:
+                logger.warning("Could not record the synced command tree at %s: %s", state_path, e)
+        return "synced"
+
     @commands.Cog.listener()
     async def on_ready(self):
         if not self._synced:
+            STARTUP.mark("gateway")
             try:
-                await self.bot.tree.sync()
+                with STARTUP.phase("command_sync"):
+                    outcome = await self._sync_commands()
                 self._synced = True
                 user = getattr(self.bot, "user", None)
-                logger.info("App commands synced. Bot is ready%s", f" as {user.name}" if user else "")
+                logger.info("App commands %s. Bot is ready%s", outcome, f" as {user.name}" if user else "")
             except Exception as e:
                 logger.exception("Failed to sync app commands: %s", e)
+            STARTUP.ready()
         else:
             logger.info("Bot ready (already synced).")
 
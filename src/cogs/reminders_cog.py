@@ -1,14 +1,34 @@
 from __future__ import annotations
 import asyncio
+import io
 import logging
-from datetime import datetime
-from typing import List, Tuple, Optional
+import time
+from datetime import timedelta
+from typing import Optional
 
-import pytz
+import discord
+from discord import app_commands
 from discord.ext import commands, tasks
 
+from src.infra import metrics
+from src.infra.startup import STARTUP
+from src.infra.tracing import TRACER, annotate, span
+from src.utils.timezones import minute_to_utc, now_minute
+
 logger = logging.getLogger(__name__)
 
+_TICK_SECONDS = metrics.histogram("dispatch_tick_seconds", "Wall time of one dispatch run (claim + render + send)")
+_DUE_PER_TICK = metrics.histogram("dispatch_due_per_tick", "Reminders claimed per dispatch run", buckets=metrics.COUNT_BUCKETS)
+_LATENESS = metrics.histogram("dispatch_lateness_seconds", "Seconds between a reminder's fire time and its send completing")
+_RESULTS = metrics.counter("dispatch_results_total", "Dispatched reminders by outcome", ("result", "fallback"))
+
+# How long answered message / interaction ids are kept for workers sharing a bot token
+_EVENT_CLAIM_RETENTION = timedelta(hours=1)
+
+
+class HandledElsewhere(commands.CheckFailure):
+    """Another worker on the same bot token claimed this command first."""
+
 
 class RemindersCog(commands.Cog):
     """
@@ -24,26 +44,77 @@ class RemindersCog(commands.Cog):
         self.bot = bot
         self.manager = None
         self.controller = None
+        self.pipeline = None
+        self.prerenderer = None
+        self.leases = None
         self._init_error: Optional[str] = None
+        self._dispatch_lock = asyncio.Lock()   # loop, !runbatch and /cron/dispatch take turns
 
         logger.info("RemindersCog: initializing...")
         try:
             # Lazy imports so command registration isn't blocked if init fails
             from src.services.database_manager import DatabaseManager
             from src.dao.reminders_dao import RemindersDAO
+            from src.dao.ai_cache_dao import AICacheDAO
             from src.services.reminders_manager import RemindersManager
             from src.controllers.reminders_controller import RemindersController
+            from src.services.dispatch_pipeline import DispatchPipeline
+            from src.services.prerender import PrerenderStore, Prerenderer
+            from src.dao.shard_lease_dao import ShardLeaseDAO
+            from src.dao.ack_dao import AckDAO
+            from src.services.ack_log import AckLog
+            from src.services.listing_cache import ListingCache
+            from src.dao.outbox_dao import OutboxDAO
+            from src.services.outbox import Outbox
+            from src.services.shard_leases import LeaseManager
+
+            TRACER.configure(
+                capacity=self.bot.config.get_trace_buffer_ticks(),
+                slow_tick_seconds=self.bot.config.get_slow_tick_seconds(),
+            )
 
             # Build DB/DAO/Manager with config from bot
-            db = DatabaseManager(self.bot.config)
+            with STARTUP.phase("database"):
+                db = DatabaseManager(self.bot.config)
             dao = RemindersDAO(db)
             self.manager = RemindersManager(
                 dao,
                 default_tz=self.bot.config.get_default_timezone(),
                 chat_id=1,                  # 'discord' seeded as id=1 in chats table
                 config=self.bot.config,     # pass through AI/paths config
+                ai_cache=AICacheDAO(db),    # persistent variant pools for generated lines
+                max_catchup_minutes=self.bot.config.get_dispatch_catchup_minutes(),
+                shard_count=self.bot.config.get_shard_count(),
+                ack_log=AckLog(                     # sent / taken history, written in batches
+                    AckDAO(db),
+                    flush_size=self.bot.config.get_ack_flush_size(),
+                    retention_days=self.bot.config.get_ack_retention_days(),
+                ),
+                listing_cache=ListingCache(         # `!l` results, invalidated on add/delete
+                    max_size=self.bot.config.get_listing_cache_size(),
+                    ttl_seconds=self.bot.config.get_listing_cache_ttl_seconds(),
+                ),
+                outbox=Outbox(                      # durable delivery: retries, restart recovery
+                    OutboxDAO(db),
+                    getattr(self.bot, "chat", None),
+                    workers=self.bot.config.get_outbox_workers(),
+                    max_attempts=self.bot.config.get_outbox_max_attempts(),
+                    backoff_seconds=self.bot.config.get_outbox_backoff_seconds(),
+                    max_backoff_seconds=self.bot.config.get_outbox_max_backoff_seconds(),
+                    max_age_seconds=self.bot.config.get_outbox_max_age_minutes() * 60,
+                    hold_seconds=self.bot.config.get_outbox_hold_seconds(),
+                ),
             )
 
+            # Multi-process dispatch: lease a share of the shards (SHARD_COUNT > 1)
+            if self.manager.shard_count > 1:
+                self.leases = LeaseManager(
+                    ShardLeaseDAO(db),
+                    self.manager.shard_count,
+                    worker_id=self.bot.config.get_shard_worker_id() or None,
+                    lease_seconds=self.bot.config.get_shard_lease_seconds(),
+                )
+
             # Controller (prefer signature with bot; fall back if not present)
             try:
                 self.controller = RemindersController(self.manager, self.bot)
@@ -51,87 +122,278 @@ class RemindersCog(commands.Cog):
                 self.controller = RemindersController(self.manager)
                 setattr(self.controller, "bot", self.bot)
 
+            # Lookahead pre-rendering (disabled with PRERENDER_LOOKAHEAD_MINUTES=0)
+            lookahead = self.bot.config.get_prerender_lookahead_minutes()
+            store = None
+            if lookahead > 0:
+                store = PrerenderStore(self.bot.config.get_prerender_max_entries())
+                self.prerenderer = Prerenderer(
+                    self.manager,
+                    store,
+                    self._resolve_user_name,
+                    lookahead_minutes=lookahead,
+                    concurrency=self.bot.config.get_dispatch_concurrency(),
+                )
+
+            # Bounded lookup → render → send fan-out for each tick
+            self.pipeline = DispatchPipeline(
+                self.manager,
+                getattr(self.bot, "chat", None),
+                self._resolve_user_name,
+                concurrency=self.bot.config.get_dispatch_concurrency(),
+                deadline_seconds=self.bot.config.get_dispatch_deadline_seconds(),
+                render_budget_seconds=self.bot.config.get_dispatch_render_budget_seconds(),
+                store=store,
+                batch_size=self.bot.config.get_ai_batch_size(),
+                outbox=self.manager.outbox,
+            )
+
             logger.info("RemindersCog: init complete")
 
         except Exception as e:
             self._init_error = f"{type(e).__name__}: {e}"
             logger.exception("RemindersCog: init failed: %s", self._init_error)
 
+        self.bot.add_check(self._claim_command, call_once=True)
+
     # ---------- lifecycle: start/stop the every-minute dispatcher ----------
     async def cog_load(self):
+        if self.manager:
+            try:
+                with STARTUP.phase("schedule_load"):
+                    count = await self.manager.load_schedule()
+                logger.info("RemindersCog: schedule index loaded (%d reminders)", count)
+            except Exception as e:
+                logger.exception("RemindersCog: schedule index load failed, using DB per tick: %s", e)
+        if self.manager and self.manager.outbox:
+            try:
+                # Sharded workers leave held rows to their hold timeout: another live worker may be sending them
+                await self.manager.outbox.load(release=self.manager.shard_count == 1)
+            except Exception as e:
+                logger.exception("RemindersCog: outbox load failed: %s", e)
+            if not self.outbox_loop.is_running():
+                self.outbox_loop.change_interval(seconds=self.bot.config.get_outbox_poll_seconds())
+                self.outbox_loop.start()
+        if self.leases and not self.lease_loop.is_running():
+            self.lease_loop.change_interval(seconds=self.leases.lease_seconds / 3)
+            self.lease_loop.start()
+            logger.info("RemindersCog: lease_loop started (worker %s, %d shards)", self.leases.worker_id, self.leases.shard_count)
         if not self.auto_dispatch.is_running():
             self.auto_dispatch.start()
             logger.info("RemindersCog: auto_dispatch started (every 1 minute)")
+        if not self.ack_flush_loop.is_running():
+            self.ack_flush_loop.change_interval(seconds=self.bot.config.get_ack_flush_seconds())
+            self.ack_flush_loop.start()
+        if not self.ack_compact_loop.is_running():
+            self.ack_compact_loop.start()
+        if self.prerenderer and not self.prerender_loop.is_running():
+            self.prerender_loop.start()
+            logger.info("RemindersCog: prerender_loop started (%d min lookahead)", self.prerenderer.lookahead_minutes)
 
     async def cog_unload(self):
+        self.bot.remove_check(self._claim_command, call_once=True)
         if self.auto_dispatch.is_running():
             self.auto_dispatch.cancel()
             logger.info("RemindersCog: auto_dispatch stopped")
+        if self.prerender_loop.is_running():
+            self.prerender_loop.cancel()
+            logger.info("RemindersCog: prerender_loop stopped")
+        if self.lease_loop.is_running():
+            self.lease_loop.cancel()
+        for loop in (self.ack_flush_loop, self.ack_compact_loop, self.outbox_loop):
+            if loop.is_running():
+                loop.cancel()
+        if self.leases:
+            try:
+                await self.leases.release()
+                logger.info("RemindersCog: shard leases released")
+            except Exception as e:
+                logger.warning("RemindersCog: releasing shard leases failed: %s", e)
+        if self.manager:
+            if self.manager.outbox:
+                await self.manager.outbox.flush()
+            if self.manager.acks:
+                await self.manager.acks.flush()
+            await self.manager.ai.close()
+            self.manager.dao.db.close()
 
     # ---------- internal helpers ----------
     def _check_ready(self) -> Optional[str]:
         if self._init_error:
             return f"Init error: {self._init_error}"
-        if not self.manager or not self.controller:
+        if not self.manager or not self.controller or not self.pipeline:
             return "Reminders system not ready."
         if not hasattr(self.bot, "chat"):
             return "Chat manager not available on bot."
         return None
 
-    async def _send_after_delay(self, user_id: str, text: str, delay: float):
-        try:
-            if delay > 0:
-                await asyncio.sleep(delay)
-            await self.bot.chat.send_dm(user_id, text)
-            logger.info("Sent reminder to %s", user_id)
-        except Exception as e:
-            logger.exception("Send failed to %s: %s", user_id, e)
+    async def _first_to_handle(self, event_id: int) -> bool:
+        """
+        Sharded workers may share one bot token, and then every one of them receives
+        every command. The first to claim the message / interaction id answers it.
+        """
+        return self.leases is None or await self.leases.claim_event(event_id)
+
+    async def _claim_command(self, ctx: commands.Context) -> bool:
+        if ctx.cog is self and not await self._first_to_handle(ctx.message.id):
+            raise HandledElsewhere()
+        return True
+
+    async def cog_command_error(self, ctx: commands.Context, error: commands.CommandError):
+        if isinstance(error, HandledElsewhere):
+            return
+        # Having this handler turns off discord.py's default logging for the cog's commands
+        logger.error("Ignoring exception in command %s", ctx.command, exc_info=error)
+
+    async def _resolve_user_name(self, user_id: str) -> Optional[str]:
+        users = getattr(self.bot, "user_cache", None)
+        if users is not None:
+            return await users.get_display_name(user_id)
+        user = await self.bot.fetch_user(int(user_id))
+        return user.name if user and user.name else None
+
+    # ---------- windowed dispatch (minute precision, no dupes) ----------
+    async def run_batch(self, window_minutes: Optional[int] = None):
+        """
+        Send everything due between the stored high-water mark and now.
+        window_minutes caps how far back missed minutes are still sent
+        (default DISPATCH_CATCHUP_MINUTES). Returns the DispatchReport, or None
+        if nothing was due or the cog isn't ready.
+        """
+        err = self._check_ready()
+        if err:
+            logger.warning("run_batch blocked: %s", err)
+            return None
+
+        async with self._dispatch_lock, TRACER.tick("dispatch"):
+            started = time.perf_counter()
+            try:
+                return await self._run_batch_locked(window_minutes)
+            finally:
+                _TICK_SECONDS.observe(time.perf_counter() - started)
+
+    async def _run_batch_locked(self, window_minutes: Optional[int]):
+        now = now_minute()
+        if self.leases:
+            # owned() is empty once our leases may have lapsed
+            await self.manager.set_owned_shards(self.leases.owned(), now)
+        hhmm = minute_to_utc(now).strftime("%H:%M UTC")
+        logger.info("Dispatch check at %s", hhmm)
+
+        # Manager returns: List[DueReminder], already claimed in the ledger
+        with span("claim"):
+            due = await self.manager.take_due(now, window_minutes)
+        _DUE_PER_TICK.observe(len(due))
+        annotate(due=len(due))
+        if not due:
+            logger.info("No reminders due at %s", hhmm)
+            return None
+
+        report = await self.pipeline.run(due)
+        annotate(sent=report.sent, failed=report.failed, fallback=report.fallbacks)
+        self.manager.record_sent(report.results)
+        for r in report.results:
+            _LATENESS.observe(max(0.0, r.lateness))
+            _RESULTS.labels("sent" if r.sent else "failed", "true" if r.fallback else "false").inc()
+        if report.elapsed > 60:
+            logger.warning("Dispatch at %s overran the minute (%.1fs)", hhmm, report.elapsed)
+        return report
 
-    # ---------- every-minute loop (minute precision, no dupes) ----------
     @tasks.loop(minutes=1)
     async def auto_dispatch(self):
         try:
-            err = self._check_ready()
-            if err:
-                logger.warning("auto_dispatch blocked: %s", err)
-                return
+            await self.run_batch()
+        except Exception as e:
+            logger.exception("auto_dispatch failed: %s", e)
 
-            tz = pytz.timezone(self.bot.config.get_default_timezone())
-            now = datetime.now(tz).replace(second=0, microsecond=0)
-            hhmm = now.strftime("%H:%M")
-            logger.info("Dispatch check at %s", hhmm)
+    # ---------- shard leases (SHARD_COUNT > 1) ----------
+    @tasks.loop(seconds=10)
+    async def lease_loop(self):
+        try:
+            owned = await self.leases.renew()
+            async with self._dispatch_lock:
+                await self.manager.set_owned_shards(owned)
+            await self.leases.dao.prune_events(
+                discord.utils.time_snowflake(discord.utils.utcnow() - _EVENT_CLAIM_RETENTION)
+            )
+        except Exception as e:
+            logger.exception("lease_loop: renewal failed: %s", e)
 
-            # Manager returns: List[(user_id, persona, label, send_at_dt)]
-            due: List[Tuple[str, str, str, datetime]] = await self.manager.get_due_at_minute(hhmm)
-            if not due:
-                logger.info("No reminders due at %s", hhmm)
-                return
+    # ---------- acknowledgement log upkeep ----------
+    @tasks.loop(seconds=5)
+    async def ack_flush_loop(self):
+        try:
+            if self.manager and self.manager.acks:
+                await self.manager.acks.flush()
+        except Exception as e:
+            logger.exception("ack_flush_loop failed: %s", e)
 
-            for user_id, persona, label, send_at in due:
-                # Optional username enrichment
-                user_name: Optional[str] = None
-                try:
-                    user = await self.bot.fetch_user(int(user_id))
-                    if user and user.name:
-                        user_name = user.name
-                except Exception:
-                    pass
+    @tasks.loop(hours=1)
+    async def ack_compact_loop(self):
+        try:
+            if self.manager and self.manager.acks:
+                await self.manager.acks.compact()
+        except Exception as e:
+            logger.exception("ack_compact_loop failed: %s", e)
 
-                text = await self.manager.render_message(persona, label, user_name=user_name)
-                delay = max(0.0, (send_at - now).total_seconds())  # usually 0s
-                self.bot.loop.create_task(self._send_after_delay(user_id, text, delay))
+    # ---------- outbox: retry failed deliveries, resume after a restart ----------
+    @tasks.loop(seconds=10)
+    async def outbox_loop(self):
+        try:
+            if self._check_ready():
+                return
+            async with TRACER.tick("outbox"):
+                annotate(delivered=await self.manager.outbox.drain())
+        except Exception as e:
+            logger.exception("outbox_loop failed: %s", e)
+
+    @outbox_loop.before_loop
+    async def _outbox_wait_ready(self):
+        # Resumed deliveries would just fail (and burn attempts) before the gateway login
+        await self.bot.wait_until_ready()
 
+    # ---------- lookahead: render upcoming reminders before they are due ----------
+    @tasks.loop(minutes=1)
+    async def prerender_loop(self):
+        try:
+            if self._check_ready():
+                return
+            async with TRACER.tick("prerender"):
+                annotate(staged=await self.prerenderer.run(now_minute()))
         except Exception as e:
-            logger.exception("auto_dispatch failed: %s", e)
+            logger.exception("prerender_loop failed: %s", e)
 
     # ---------- commands ----------
     @commands.command(name="r")
-    async def create_reminder_cmd(self, ctx: commands.Context):
+    async def create_reminder_cmd(self, ctx: commands.Context, *, args: Optional[str] = None):
+        """`!r HH:MM <persona> | <label>`, or bare `!r` to be prompted for each field."""
         err = self._check_ready()
         if err:
             await ctx.send(f"❌ {err}")
             return
-        await self.controller.handle_create_reminder(ctx)
+        await self.controller.handle_create_reminder(ctx, args)
+
+    @app_commands.command(name="remind", description="Add a reminder in one step")
+    @app_commands.rename(time_str="time")
+    @app_commands.describe(
+        persona="Who should remind you (ex: batman, gremlin best friend)",
+        time_str="24-hour HH:MM, in your timezone (ex: 08:00, 21:30)",
+        label="What to remind you about (ex: Take Adderall)",
+    )
+    async def remind_slash(
+        self,
+        interaction: discord.Interaction,
+        persona: app_commands.Range[str, 1, 100],
+        time_str: app_commands.Range[str, 1, 5],
+        label: app_commands.Range[str, 1, 200],
+    ):
+        if not await self._first_to_handle(interaction.id):
+            return
+        err = self._check_ready()
+        if err:
+            await interaction.response.send_message(f"❌ {err}", ephemeral=True)
+            return
+        await self.controller.handle_remind_interaction(interaction, persona, time_str, label)
 
     @commands.command(name="l")
     async def list_reminders_cmd(self, ctx: commands.Context):
@@ -149,22 +411,147 @@ class RemindersCog(commands.Cog):
             return
         await self.controller.handle_delete_reminder(ctx, time, label)
 
+    @commands.command(name="taken")
+    async def taken_cmd(self, ctx: commands.Context, *, label: Optional[str] = None):
+        """Confirm your latest reminder (or `!taken <label>`) as taken."""
+        err = self._check_ready()
+        if err:
+            await ctx.send(f"❌ {err}")
+            return
+        await self.controller.handle_taken(ctx, label)
+
+    @commands.command(name="last")
+    async def last_taken_cmd(self, ctx: commands.Context):
+        """Show when you last took each of your reminders."""
+        err = self._check_ready()
+        if err:
+            await ctx.send(f"❌ {err}")
+            return
+        await self.controller.handle_last_taken(ctx)
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        # Plain "taken" reply in DMs (the reminder arrives as a DM)
+        if message.guild is not None or message.author.bot:
+            return
+        if message.content.strip().lower() not in ("taken", "took it"):
+            return
+        if self._check_ready() or not await self._first_to_handle(message.id):
+            return
+        ctx = await self.bot.get_context(message)
+        await self.controller.handle_taken(ctx, None)
+
+    @commands.command(name="tz")
+    async def timezone_cmd(self, ctx: commands.Context, tz_name: Optional[str] = None):
+        """Show or set your timezone (IANA name, e.g. `!tz Europe/Berlin`; `!tz default` resets)."""
+        err = self._check_ready()
+        if err:
+            await ctx.send(f"❌ {err}")
+            return
+        await self.controller.handle_timezone(ctx, tz_name)
+
     @commands.command(name="helpme")
     async def helpme(self, ctx: commands.Context):
         await ctx.send(
             "Commands:\n"
-            "`!r`                - interactively add a new reminder\n"
+            "`!r HH:MM <persona> | <label>` - add a reminder (or `/remind`; bare `!r` asks step by step)\n"
             "`!l`                - list your reminders\n"
             "`!dr HH:MM <label>` - delete a reminder\n"
+            "`!tz [Area/City]`   - show or set your timezone\n"
+            "`!taken [label]`    - confirm your latest reminder (or reply `taken` in DMs)\n"
+            "`!last`             - when you last took each reminder\n"
             "`!helpme`           - show this help message\n"
         )
 
     @commands.command(name="runbatch")
-    async def runbatch_cmd(self, ctx: commands.Context):
-        """Manual trigger for testing: run minute-precision dispatch now."""
-        await ctx.send("Running minute-precision dispatch for the current time…")
-        await self.auto_dispatch()  # run once immediately
-        await ctx.send("Dispatch attempt complete.")
+    async def runbatch_cmd(self, ctx: commands.Context, window_minutes: Optional[int] = None):
+        """Manual trigger: dispatch everything due since the last run (optionally `!runbatch <minutes>`)."""
+        await ctx.send("Running dispatch for everything due since the last run…")
+        try:
+            report = await self.run_batch(window_minutes=window_minutes)
+        except Exception as e:
+            logger.exception("runbatch failed: %s", e)
+            await ctx.send("❌ Dispatch failed. Check logs.")
+            return
+        if report is None:
+            await ctx.send("Dispatch complete: nothing due.")
+        else:
+            await ctx.send(f"Dispatch complete: sent={report.sent} failed={report.failed} fallback={report.fallbacks}.")
+
+    @commands.command(name="traces")
+    async def traces_cmd(self, ctx: commands.Context, n: int = 5):
+        """Per-stage time breakdown of the last n ticks (`!traces 10`)."""
+        lines = TRACER.recent_summaries(max(1, min(n, 20)))
+        if not lines:
+            await ctx.send("No ticks traced yet.")
+            return
+        await ctx.send("```\n" + "\n".join(lines)[-1900:] + "\n```")
+
+    @commands.command(name="profile")
+    @commands.is_owner()
+    async def profile_cmd(self, ctx: commands.Context, ticks: int = 1):
+        """cProfile the next N dispatch ticks and post the report (`!profile 3`; `!profile 0` cancels)."""
+        if ticks <= 0:
+            await ctx.send("Profiling cancelled." if TRACER.cancel_profile() else "No profiling session running.")
+            return
+        try:
+            fut = TRACER.start_profile(min(ticks, 60))
+        except RuntimeError as e:
+            await ctx.send(f"❌ {e}")
+            return
+        await ctx.send(f"Profiling the next {min(ticks, 60)} dispatch tick(s); the report will be posted here.")
+        try:
+            report = await fut
+        except asyncio.CancelledError:
+            if not fut.cancelled():
+                raise
+            return
+        await ctx.send(
+            "Profile finished.",
+            file=discord.File(io.BytesIO(report.encode("utf-8")), filename="dispatch-profile.txt"),
+        )
+
+    @commands.command(name="schedcheck")
+    async def schedcheck_cmd(self, ctx: commands.Context):
+        """Compare the in-memory schedule index with the reminders table."""
+        err = self._check_ready()
+        if err:
+            await ctx.send(f"❌ {err}")
+            return
+        if not self.manager.schedule.loaded:
+            await ctx.send("Schedule index not loaded; dispatch is querying the DB each tick.")
+            return
+        missing, extra = await self.manager.check_schedule()
+        if missing or extra:
+            await ctx.send(f"⚠️ Schedule index drift: {missing} missing, {extra} extra. Reloading.")
+            await self.manager.load_schedule()
+        else:
+            await ctx.send(f"✅ Schedule index consistent ({len(self.manager.schedule)} reminders).")
+
+    @commands.command(name="cachestats")
+    async def cachestats_cmd(self, ctx: commands.Context):
+        """Show Discord user/DM-channel cache and `!l` listing cache counters."""
+        users = getattr(self.bot, "user_cache", None)
+        lines = [
+            "users: " + (", ".join(f"{k}={v}" for k, v in users.stats().items()) if users else "not configured")
+        ]
+        if self.manager:
+            lines.append("listings: " + ", ".join(f"{k}={v}" for k, v in self.manager.listings.stats().items()))
+        await ctx.send("\n".join(lines))
+
+    @commands.command(name="sendstats")
+    async def sendstats_cmd(self, ctx: commands.Context):
+        """Show outbound send queue depth, wait time and 429 counters, plus outbox retries."""
+        chat = getattr(self.bot, "chat", None)
+        if chat is None:
+            await ctx.send("Chat manager not available on bot.")
+            return
+        lines = [", ".join(f"{k}={v}" for k, v in chat.stats().items())]
+        if self.manager and self.manager.outbox:
+            outbox = self.manager.outbox
+            pending = await outbox.dao.pending_count(outbox.chat_id)
+            lines.append("outbox: " + ", ".join(f"{k}={v}" for k, v in {"pending": pending, **outbox.stats()}.items()))
+        await ctx.send("\n".join(lines))
 
     @commands.command(name="aistatus")
     async def aistatus(self, ctx: commands.Context):
@@ -173,8 +560,12 @@ class RemindersCog(commands.Cog):
             await ctx.send(f"❌ {err}")
             return
         ai = self.manager.ai
+        status = ai.status()
         await ctx.send(
-            f"AI provider={ai.provider}, model={ai.model}, enabled={ai.enabled}, host={ai.ollama_host}"
+            f"AI provider={ai.provider}, model={ai.model}, enabled={ai.enabled}, host={ai.ollama_host}\n"
+            f"breaker={status['state']} (failures in a row={status['consecutive_failures']}, opened={status['opened']}x), "
+            f"pending={status['pending']}/{status['max_pending']}, "
+            f"shed: breaker_open={status['shed']['breaker_open']} queue_full={status['shed']['queue_full']}"
         )
 
 
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import logging
+from typing import List, Optional
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+
+class ReminderPagesView(discord.ui.View):
+    """
+    Prev/next buttons over pages that were rendered once when `!l` ran.
+    Page turns edit the message in place; nothing is re-queried. Only the user
+    who ran the command can turn pages, and the buttons go inert after `timeout`.
+    """
+
+    def __init__(self, pages: List[str], author_id: int, *, total: int, timeout: float = 180.0):
+        super().__init__(timeout=timeout)
+        self.pages = pages
+        self.author_id = author_id
+        self.total = total
+        self.index = 0
+        self.message: Optional[discord.Message] = None
+        self._sync_buttons()
+
+    def embed(self) -> discord.Embed:
+        embed = discord.Embed(title="Your reminders", description=self.pages[self.index])
+        embed.set_footer(text=f"Page {self.index + 1}/{len(self.pages)} · {self.total} reminders")
+        return embed
+
+    def _sync_buttons(self) -> None:
+        self.prev_page.disabled = self.index == 0
+        self.next_page.disabled = self.index >= len(self.pages) - 1
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("These aren't your reminders.", ephemeral=True)
+            return False
+        return True
+
+    async def _show(self, interaction: discord.Interaction, index: int) -> None:
+        self.index = max(0, min(index, len(self.pages) - 1))
+        self._sync_buttons()
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+    @discord.ui.button(label="◀ Prev", style=discord.ButtonStyle.secondary)
+    async def prev_page(self, interaction: discord.Interaction, _button: discord.ui.Button):
+        await self._show(interaction, self.index - 1)
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, _button: discord.ui.Button):
+        await self._show(interaction, self.index + 1)
+
+    async def on_timeout(self) -> None:
+        if self.message is None:
+            return
+        for item in self.children:
+            item.disabled = True
+        try:
+            await self.message.edit(view=self)
+        except discord.HTTPException as e:
+            logger.debug("ReminderPagesView: could not disable buttons: %s", e)
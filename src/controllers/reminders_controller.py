@@ -1,10 +1,31 @@
 import asyncio
 import discord
 import logging
+from typing import Optional, Tuple
+
 from discord.ext import commands
 
+from src.controllers.reminder_pages import ReminderPagesView
+
 logger = logging.getLogger(__name__)
 
+INLINE_USAGE = (
+    "Usage: `!r HH:MM <persona> | <label>` (ex: `!r 08:00 batman | Take Adderall`), "
+    "or just `!r` to be asked step by step."
+)
+
+# Quote pairs users wrap a persona or label in (Discord's mobile keyboards send the curly ones)
+_QUOTES = (('"', '"'), ("'", "'"), ("\u201c", "\u201d"))
+
+
+def _unquote(text: str) -> str:
+    text = text.strip()
+    for left, right in _QUOTES:
+        if len(text) >= 2 and text.startswith(left) and text.endswith(right):
+            return text[1:-1].strip()
+    return text
+
+
 class RemindersController:
     def __init__(self, manager, bot=None):
         self.reminders_manager = manager
@@ -24,43 +45,97 @@ class RemindersController:
             logger.warning("User %s timed out: %s", ctx.author.id, prompt_text)
             return None
 
-    async def handle_create_reminder(self, ctx: commands.Context) -> None:
-        try:
-            persona = await self._prompt_user(ctx, "Who should remind you? (ex: batman, gremlin best friend, soft voice)")
-            if persona is None:
-                return
+    @staticmethod
+    def parse_inline(args: str) -> Optional[Tuple[str, str, str]]:
+        """
+        `HH:MM <persona> | <label>` -> (time_str, persona, label), or None if a part is missing.
+        The persona may contain spaces; persona and label may be quoted, and only the
+        first `|` splits, so the label may contain more. The time is validated by the manager.
+        """
+        head, sep, label = (args or "").partition("|")
+        if not sep:
+            return None
+        time_str, _, persona = head.strip().partition(" ")
+        persona, label = _unquote(persona), _unquote(label)
+        if not time_str or not persona or not label:
+            return None
+        return time_str, persona, label
 
-            time_str = await self._prompt_user(ctx, "What time should I remind you? (24-hour HH:MM, ex: 08:00, 14:30)")
-            if time_str is None:
-                return
+    async def _create(self, user_id: str, persona: str, time_str: str, label: str) -> Tuple[bool, str]:
+        success, message = await self.reminders_manager.create_reminder(
+            user_id=user_id,
+            persona=persona,
+            time_str=time_str,
+            label=label,
+        )
+        logger.info("User %s create_reminder result (success=%s): %s", user_id, success, message)
+        return success, message
 
-            label = await self._prompt_user(ctx, "What do you want to be reminded to do? (ex: Take Adderall, Drink water, Do stretches)")
-            if label is None:
-                return
+    async def handle_create_reminder(self, ctx: commands.Context, args: Optional[str] = None) -> None:
+        """
+        `!r HH:MM <persona> | <label>` creates the reminder from the one message.
+        Bare `!r` falls back to asking for each field.
+        """
+        try:
+            if args:
+                parsed = self.parse_inline(args)
+                if parsed is None:
+                    await ctx.send(INLINE_USAGE)
+                    return
+                time_str, persona, label = parsed
+            else:
+                persona = await self._prompt_user(ctx, "Who should remind you? (ex: batman, gremlin best friend, soft voice)")
+                if persona is None:
+                    return
 
-            user_id = str(ctx.author.id)
+                time_str = await self._prompt_user(ctx, "What time should I remind you? (24-hour HH:MM, ex: 08:00, 14:30)")
+                if time_str is None:
+                    return
 
-            # ✅ IMPORTANT: await the manager call
-            success, message = await self.reminders_manager.create_reminder(
-                user_id=user_id,
-                persona=persona,
-                time_str=time_str,
-                label=label,
-            )
+                label = await self._prompt_user(ctx, "What do you want to be reminded to do? (ex: Take Adderall, Drink water, Do stretches)")
+                if label is None:
+                    return
 
+            success, message = await self._create(str(ctx.author.id), persona, time_str, label)
             await ctx.send(message)
-            logger.info("User %s create_reminder result (success=%s): %s", user_id, success, message)
 
         except Exception as e:
             logger.exception("handle_create_reminder failed: %s", e)
             await ctx.send("❌ Something went wrong creating the reminder. Check logs.")
             return
 
+    async def handle_remind_interaction(
+        self, interaction: discord.Interaction, persona: str, time_str: str, label: str
+    ) -> None:
+        """`/remind`: every field arrives with the interaction, so this is one write and one reply."""
+        try:
+            persona, label = _unquote(persona), _unquote(label)
+            if not persona or not label:
+                await interaction.response.send_message("Persona and label can't be blank.", ephemeral=True)
+                return
+            success, message = await self._create(str(interaction.user.id), persona, time_str, label)
+            await interaction.response.send_message(message, ephemeral=not success)
+        except Exception as e:
+            logger.exception("handle_remind_interaction failed: %s", e)
+            send = interaction.followup.send if interaction.response.is_done() else interaction.response.send_message
+            await send("❌ Something went wrong creating the reminder. Check logs.", ephemeral=True)
+
     async def handle_list_reminders(self, ctx: commands.Context) -> None:
         try:
             user_id = str(ctx.author.id)
-            success, message = await self.reminders_manager.get_reminders(user_id)  # ✅ await
-            await ctx.send(message)
+            config = getattr(self.bot, "config", None)
+            page_size = config.get_listing_page_size() if config else 10
+            pages = await self.reminders_manager.get_reminder_pages(user_id, page_size)
+            if not pages:
+                await ctx.send("You have no reminders yet. Use `!r` to create one.")
+                return
+            total = sum(page.count("\n") + 1 for page in pages)
+            view = ReminderPagesView(pages, ctx.author.id, total=total)
+            if len(pages) == 1:
+                await ctx.send(embed=view.embed())
+                view.stop()
+                return
+            view.message = await ctx.send(embed=view.embed(), view=view)
         except Exception as e:
             logger.exception("handle_list_reminders failed: %s", e)
             await ctx.send("❌ Couldn’t list reminders. Check logs.")
@@ -73,3 +148,35 @@ class RemindersController:
         except Exception as e:
             logger.exception("handle_delete_reminder failed: %s", e)
             await ctx.send("❌ Couldn’t delete that reminder. Check logs.")
+
+    async def handle_timezone(self, ctx: commands.Context, tz_name=None) -> None:
+        try:
+            user_id = str(ctx.author.id)
+            if tz_name is None:
+                tz = await self.reminders_manager.get_timezone(user_id)
+                await ctx.send(f"Your reminders fire in `{tz}`. Change it with `!tz Area/City`.")
+                return
+            success, message = await self.reminders_manager.set_timezone(user_id, tz_name)
+            await ctx.send(message)
+            logger.info("User %s set_timezone result (success=%s): %s", user_id, success, message)
+        except Exception as e:
+            logger.exception("handle_timezone failed: %s", e)
+            await ctx.send("❌ Couldn’t update your timezone. Check logs.")
+
+    async def handle_taken(self, ctx: commands.Context, label=None) -> None:
+        try:
+            user_id = str(ctx.author.id)
+            success, message = await self.reminders_manager.mark_taken(user_id, label)
+            await ctx.send(message)
+            logger.info("User %s mark_taken result (success=%s): %s", user_id, success, message)
+        except Exception as e:
+            logger.exception("handle_taken failed: %s", e)
+            await ctx.send("❌ Couldn’t record that. Check logs.")
+
+    async def handle_last_taken(self, ctx: commands.Context) -> None:
+        try:
+            success, message = await self.reminders_manager.get_last_taken(str(ctx.author.id))
+            await ctx.send(message)
+        except Exception as e:
+            logger.exception("handle_last_taken failed: %s", e)
+            await ctx.send("❌ Couldn’t load your history. Check logs.")
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+SENT = 0
+TAKEN = 1
+
+# (user_id, reminder_id, kind, at)
+AckEvent = Tuple[str, int, int, int]
+
+
+class AckDAO:
+    """
+    SQLite DAO for acknowledgements (tables ack_events, reminder_ack_state, ack_daily).
+
+    ack_events is append-only; reminder_ack_state holds the latest sent/taken
+    time per reminder and is kept current in the same transaction as each
+    append, so reads never have to scan the log.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    async def append(self, events: Sequence[AckEvent]) -> int:
+        """
+        Insert a batch of events and fold them into reminder_ack_state.
+        Returns the number of events written.
+        """
+        if not events:
+            return 0
+
+        # One state upsert per reminder, however many events it has in the batch
+        latest: Dict[int, List] = {}
+        for user_id, reminder_id, kind, at in events:
+            state = latest.setdefault(reminder_id, [user_id, None, None])
+            slot = 1 if kind == SENT else 2
+            state[slot] = at if state[slot] is None else max(state[slot], at)
+
+        def work(conn):
+            conn.executemany(
+                "INSERT INTO ack_events(user_id, reminder_id, kind, at) VALUES(?,?,?,?)",
+                events,
+            )
+            conn.executemany(
+                """
+                INSERT INTO reminder_ack_state(reminder_id, user_id, last_sent_at, last_taken_at)
+                VALUES(?,?,?,?)
+                ON CONFLICT(reminder_id) DO UPDATE SET
+                    last_sent_at = CASE
+                        WHEN excluded.last_sent_at IS NULL THEN last_sent_at
+                        ELSE MAX(COALESCE(last_sent_at, 0), excluded.last_sent_at)
+                    END,
+                    last_taken_at = CASE
+                        WHEN excluded.last_taken_at IS NULL THEN last_taken_at
+                        ELSE MAX(COALESCE(last_taken_at, 0), excluded.last_taken_at)
+                    END
+                """,
+                [(rid, uid, sent, taken) for rid, (uid, sent, taken) in latest.items()],
+            )
+            return len(events)
+
+        return await self.db.run_write(work)
+
+    async def state(self, reminder_id: int) -> Optional[Tuple[Optional[int], Optional[int]]]:
+        """
+        Returns (last_sent_at, last_taken_at) for one reminder, or None if it has no acks yet.
+        """
+        def work(conn):
+            row = conn.execute(
+                "SELECT last_sent_at, last_taken_at FROM reminder_ack_state WHERE reminder_id=?",
+                (reminder_id,),
+            ).fetchone()
+            return (row["last_sent_at"], row["last_taken_at"]) if row else None
+
+        return await self.db.run_read(work)
+
+    async def latest_for_user(
+        self,
+        user_id: str,
+        label: Optional[str] = None,
+        chat_id: int = 1,
+    ) -> Optional[Tuple[int, str, Optional[int], Optional[int]]]:
+        """
+        The user's most recently sent active reminder (optionally with this label).
+        Returns (reminder_id, label, last_sent_at, last_taken_at) or None.
+        """
+        def work(conn):
+            row = conn.execute(
+                f"""
+                SELECT r.id, r.label, s.last_sent_at, s.last_taken_at
+                FROM reminders r
+                LEFT JOIN reminder_ack_state s ON s.reminder_id = r.id
+                WHERE r.user_id=? AND r.chat_id=? AND r.active=1 {"AND r.label=?" if label else ""}
+                ORDER BY COALESCE(s.last_sent_at, 0) DESC, r.id DESC
+                LIMIT 1
+                """,
+                (user_id, chat_id, label) if label else (user_id, chat_id),
+            ).fetchone()
+            if not row:
+                return None
+            return row["id"], row["label"], row["last_sent_at"], row["last_taken_at"]
+
+        return await self.db.run_read(work)
+
+    async def last_taken(
+        self,
+        user_id: str,
+        chat_id: int = 1,
+    ) -> List[Tuple[str, str, Optional[int], Optional[int]]]:
+        """
+        Returns: [(time_hhmm, label, last_sent_at, last_taken_at), ...] for the user's active reminders.
+        """
+        def work(conn):
+            cur = conn.execute(
+                """
+                SELECT r.time_hhmm, r.label, s.last_sent_at, s.last_taken_at
+                FROM reminders r
+                LEFT JOIN reminder_ack_state s ON s.reminder_id = r.id
+                WHERE r.user_id=? AND r.chat_id=? AND r.active=1
+                ORDER BY r.time_hhmm, r.label
+                """,
+                (user_id, chat_id),
+            )
+            return [(r["time_hhmm"], r["label"], r["last_sent_at"], r["last_taken_at"]) for r in cur.fetchall()]
+
+        return await self.db.run_read(work)
+
+    async def compact(self, before: int, batch_size: int = 5000) -> int:
+        """
+        Fold events older than `before` (unix seconds) into ack_daily and delete them,
+        oldest first in rowid order, one batch per transaction.
+        Also drops state rows of reminders that no longer exist.
+        Returns the number of events compacted.
+        """
+        def work(conn):
+            rows = conn.execute(
+                "SELECT id, reminder_id, kind, at FROM ack_events ORDER BY id LIMIT ?",
+                (batch_size,),
+            ).fetchall()
+            old = []
+            for r in rows:
+                if r["at"] >= before:
+                    break
+                old.append(r)
+            if not old:
+                return 0
+            counts: Dict[Tuple[int, int], List[int]] = {}
+            for r in old:
+                c = counts.setdefault((r["reminder_id"], r["at"] // 86400), [0, 0])
+                c[r["kind"]] += 1
+            conn.executemany(
+                """
+                INSERT INTO ack_daily(reminder_id, day, sent, taken) VALUES(?,?,?,?)
+                ON CONFLICT(reminder_id, day) DO UPDATE SET
+                    sent = sent + excluded.sent, taken = taken + excluded.taken
+                """,
+                [(rid, day, sent, taken) for (rid, day), (sent, taken) in counts.items()],
+            )
+            # `old` is a rowid prefix, so a range delete removes exactly those rows
+            conn.execute("DELETE FROM ack_events WHERE id <= ?", (old[-1]["id"],))
+            return len(old)
+
+        total = 0
+        while True:
+            n = await self.db.run_write(work)
+            total += n
+            if n < batch_size:     # reached a recent event (or the end of the log)
+                break
+
+        def prune_state(conn):
+            conn.execute(
+                "DELETE FROM reminder_ack_state WHERE reminder_id NOT IN (SELECT id FROM reminders)"
+            )
+
+        await self.db.run_write(prune_state)
+        return total
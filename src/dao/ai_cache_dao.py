@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import time
+from typing import List, Tuple
+
+
+class AICacheDAO:
+    """
+    SQLite DAO for the AI response cache (table ai_variants).
+
+    Each cache_key owns a pool of up to `pool_size` generated lines.
+    Rows carry last_used_at/uses so callers can rotate least-recently-used
+    and evict stale keys.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    async def variants(self, cache_key: str) -> List[Tuple[int, str, float]]:
+        """
+        Returns: [(id, line, last_used_at), ...] least recently used first.
+        """
+        def work(conn):
+            cur = conn.execute(
+                """
+                SELECT id, line, last_used_at
+                FROM ai_variants
+                WHERE cache_key=?
+                ORDER BY last_used_at, id
+                """,
+                (cache_key,),
+            )
+            return [(r["id"], r["line"], r["last_used_at"]) for r in cur.fetchall()]
+
+        return await self.db.run_read(work)
+
+    async def touch(self, variant_id: int) -> None:
+        def work(conn):
+            conn.execute(
+                "UPDATE ai_variants SET last_used_at=?, uses=uses+1 WHERE id=?",
+                (time.time(), variant_id),
+            )
+
+        await self.db.run_write(work)
+
+    async def add_variant(self, cache_key: str, line: str, pool_size: int) -> None:
+        """
+        Insert a freshly generated line (marked as just used) and trim the pool
+        back to pool_size by dropping the least recently used variants.
+        """
+        def work(conn):
+            now = time.time()
+            conn.execute(
+                """
+                INSERT INTO ai_variants(cache_key, line, created_at, last_used_at, uses)
+                VALUES(?,?,?,?,1)
+                ON CONFLICT(cache_key, line) DO UPDATE SET last_used_at=excluded.last_used_at, uses=uses+1
+                """,
+                (cache_key, line, now, now),
+            )
+            conn.execute(
+                """
+                DELETE FROM ai_variants
+                WHERE cache_key=? AND id NOT IN (
+                    SELECT id FROM ai_variants WHERE cache_key=?
+                    ORDER BY last_used_at DESC, id DESC LIMIT ?
+                )
+                """,
+                (cache_key, cache_key, pool_size),
+            )
+
+        await self.db.run_write(work)
+
+    async def evict(self, ttl_seconds: float, max_keys: int) -> int:
+        """
+        Drop keys unused for ttl_seconds, then the least recently used keys beyond max_keys.
+        Returns number of rows deleted.
+        """
+        def work(conn):
+            cutoff = time.time() - ttl_seconds
+            deleted = conn.execute(
+                """
+                DELETE FROM ai_variants WHERE cache_key IN (
+                    SELECT cache_key FROM ai_variants
+                    GROUP BY cache_key HAVING MAX(last_used_at) < ?
+                )
+                """,
+                (cutoff,),
+            ).rowcount
+            deleted += conn.execute(
+                """
+                DELETE FROM ai_variants WHERE cache_key IN (
+                    SELECT cache_key FROM ai_variants
+                    GROUP BY cache_key ORDER BY MAX(last_used_at) DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (max_keys,),
+            ).rowcount
+            return deleted
+
+        return await self.db.run_write(work)
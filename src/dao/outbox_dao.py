@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import time
+from typing import Collection, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+
+class OutboxRow(NamedTuple):
+    reminder_id: int
+    fire_minute: int
+    user_id: str
+    persona: str
+    label: str
+    text: Optional[str]         # None == never rendered (the claiming run died first)
+    attempts: int
+
+
+class OutboxDAO:
+    """
+    SQLite DAO for the delivery outbox (tables outbox, undeliverable_users).
+
+    Rows are inserted by RemindersDAO.claim_fires in the claim transaction and
+    deleted once delivered, so anything left over is a DM that still has to go out.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    async def due(
+        self,
+        now: float,
+        chat_id: int = 1,
+        limit: int = 100,
+        shards: Optional[Collection[int]] = None,
+        shard_count: int = 1,
+    ) -> List[OutboxRow]:
+        """
+        Rows whose next attempt is due by `now` (unix seconds), oldest first.
+        With shards, only users in those shards (of shard_count), filtered before
+        the LIMIT so other workers' rows can't crowd this worker's out.
+        """
+        shard_filter, shard_params = "", ()
+        if shards is not None and shard_count > 1:
+            if not shards:
+                return []
+            shard_filter = f"AND shard_of(user_id, ?) IN ({', '.join('?' * len(shards))})"
+            shard_params = (shard_count, *sorted(shards))
+
+        def work(conn):
+            cur = conn.execute(
+                f"""
+                SELECT reminder_id, fire_minute, user_id, persona, label, text, attempts
+                FROM outbox
+                WHERE chat_id=? AND next_attempt_at <= ? {shard_filter}
+                ORDER BY next_attempt_at
+                LIMIT ?
+                """,
+                (chat_id, now, *shard_params, limit),
+            )
+            return [OutboxRow(*r) for r in cur.fetchall()]
+
+        return await self.db.run_read(work)
+
+    async def delete(self, keys: Sequence[Tuple[int, int]]) -> int:
+        """Remove delivered / abandoned rows by (reminder_id, fire_minute). Returns rows deleted."""
+        if not keys:
+            return 0
+
+        def work(conn):
+            cur = conn.executemany("DELETE FROM outbox WHERE reminder_id=? AND fire_minute=?", keys)
+            return cur.rowcount
+
+        return await self.db.run_write(work)
+
+    async def reschedule(
+        self, key: Tuple[int, int], text: Optional[str], attempts: int, next_attempt_at: float, error: str
+    ) -> None:
+        def work(conn):
+            conn.execute(
+                """
+                UPDATE outbox SET text=COALESCE(?, text), attempts=?, next_attempt_at=?, last_error=?, held_until=NULL
+                WHERE reminder_id=? AND fire_minute=?
+                """,
+                (text, attempts, next_attempt_at, error[:500], *key),
+            )
+
+        await self.db.run_write(work)
+
+    async def extend_hold(self, keys: Sequence[Tuple[int, int]], until: float) -> None:
+        """
+        Push held rows' next attempt out to `until` (a dispatch run is still working
+        on them). Rows already rescheduled with a backoff are left alone.
+        """
+        if not keys:
+            return
+
+        def work(conn):
+            conn.executemany(
+                """
+                UPDATE outbox SET next_attempt_at=?, held_until=?
+                WHERE reminder_id=? AND fire_minute=? AND held_until IS NOT NULL AND next_attempt_at < ?
+                """,
+                [(until, until, *key, until) for key in keys],
+            )
+
+        await self.db.run_write(work)
+
+    async def release(self, chat_id: int = 1, now: Optional[float] = None) -> int:
+        """
+        Make every held row due now (startup: rows held by a run that died are
+        not being delivered by anyone). Rows waiting out a retry backoff keep it.
+        Returns the number of rows released.
+        """
+        now = time.time() if now is None else now
+
+        def work(conn):
+            return conn.execute(
+                "UPDATE outbox SET next_attempt_at=?, held_until=NULL WHERE chat_id=? AND held_until > ?",
+                (now, chat_id, now),
+            ).rowcount
+
+        return await self.db.run_write(work)
+
+    async def pending_count(self, chat_id: int = 1) -> int:
+        def work(conn):
+            return conn.execute("SELECT COUNT(*) FROM outbox WHERE chat_id=?", (chat_id,)).fetchone()[0]
+
+        return await self.db.run_read(work)
+
+    # ---------------- undeliverable users ----------------
+
+    async def mark_undeliverable(self, user_id: str, reason: str, chat_id: int = 1) -> int:
+        """
+        Record that the platform refused to DM user_id and drop their queued
+        messages, in one transaction. Returns the number of outbox rows dropped.
+        """
+        def work(conn):
+            conn.execute(
+                """
+                INSERT INTO undeliverable_users(user_id, chat_id, reason, failed_at) VALUES(?, ?, ?, ?)
+                ON CONFLICT(user_id, chat_id) DO UPDATE SET reason=excluded.reason, failed_at=excluded.failed_at
+                """,
+                (user_id, chat_id, reason[:200], int(time.time())),
+            )
+            return conn.execute("DELETE FROM outbox WHERE user_id=? AND chat_id=?", (user_id, chat_id)).rowcount
+
+        return await self.db.run_write(work)
+
+    async def clear_undeliverable(self, user_id: str, chat_id: int = 1) -> bool:
+        def work(conn):
+            cur = conn.execute("DELETE FROM undeliverable_users WHERE user_id=? AND chat_id=?", (user_id, chat_id))
+            return cur.rowcount > 0
+
+        return await self.db.run_write(work)
+
+    async def undeliverable_users(self, chat_id: int = 1) -> Set[str]:
+        def work(conn):
+            cur = conn.execute("SELECT user_id FROM undeliverable_users WHERE chat_id=?", (chat_id,))
+            return {r[0] for r in cur.fetchall()}
+
+        return await self.db.run_read(work)
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
-import asyncio
-from typing import List, Tuple
+import sqlite3
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, TypeVar
+
+T = TypeVar("T")
 
 
 class RemindersDAO:
@@ -9,27 +12,84 @@ class RemindersDAO:
     SQLite DAO for reminders.
 
     Expects DatabaseManager to expose:
-      - connection() -> sqlite3.Connection
+      - run_write(fn) -> runs fn(conn) on the single writer thread and commits
+      - run_read(fn)  -> runs fn(conn) on a pooled read-only connection
     and to have row_factory set to sqlite3.Row so dict-style access works.
     """
 
     def __init__(self, db):
         self.db = db
 
+    # -------------------- unit of work ---------------------
+
+    async def unit_of_work(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """
+        Run fn(conn) as one atomic unit: every statement in fn commits together or
+        not at all. Concurrent units are group-committed by DatabaseManager.
+        fn must not call commit()/rollback() itself.
+        """
+        return await self.db.run_write(fn)
+
     # ------------------------- users -------------------------
 
+    @staticmethod
+    def _ensure_user(conn: sqlite3.Connection, user_id: str) -> None:
+        conn.execute(
+            "INSERT OR IGNORE INTO users(user_id) VALUES(?)",
+            (user_id,),
+        )
+
     async def ensure_user(self, user_id: str) -> None:
+        await self.unit_of_work(lambda conn: self._ensure_user(conn, user_id))
+
+    async def set_user_timezone(self, user_id: str, tz_name: Optional[str]) -> None:
+        """
+        Store the user's IANA timezone (None resets to DEFAULT_TIMEZONE).
+        """
         def work(conn):
             conn.execute(
-                "INSERT OR IGNORE INTO users(user_id) VALUES(?)",
-                (user_id,),
+                """
+                INSERT INTO users(user_id, timezone) VALUES(?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET timezone=excluded.timezone
+                """,
+                (user_id, tz_name),
             )
-            conn.commit()
 
-        await asyncio.to_thread(lambda: work(self.db.connection()))
+        await self.unit_of_work(work)
+
+    async def get_user_timezone(self, user_id: str) -> Optional[str]:
+        """
+        Returns the stored timezone name, or None if the user uses the default.
+        """
+        def work(conn):
+            row = conn.execute("SELECT timezone FROM users WHERE user_id=?", (user_id,)).fetchone()
+            return row["timezone"] if row else None
+
+        return await self.db.run_read(work)
+
+    async def list_timezones(self) -> List[str]:
+        """Every distinct non-default timezone stored for a user (reads all of users: degraded dispatch only)."""
+        def work(conn):
+            cur = conn.execute("SELECT DISTINCT timezone FROM users WHERE timezone IS NOT NULL")
+            return [r["timezone"] for r in cur.fetchall()]
+
+        return await self.db.run_read(work)
 
     # ----------------------- reminders -----------------------
 
+    @staticmethod
+    def _insert_reminder(
+        conn: sqlite3.Connection, user_id: str, time_hhmm: str, label: str, persona: str, chat_id: int
+    ) -> int:
+        cur = conn.execute(
+            """
+            INSERT INTO reminders(user_id, chat_id, label, persona, time_hhmm, active)
+            VALUES(?,?,?,?,?,1)
+            """,
+            (user_id, chat_id, label, persona, time_hhmm),
+        )
+        return cur.lastrowid
+
     async def add_reminder(
         self,
         user_id: str,
@@ -37,18 +97,31 @@ class RemindersDAO:
         label: str,
         persona: str,
         chat_id: int = 1,
-    ) -> None:
+    ) -> int:
+        """
+        Returns the new reminder id.
+        """
+        return await self.unit_of_work(
+            lambda conn: self._insert_reminder(conn, user_id, time_hhmm, label, persona, chat_id)
+        )
+
+    async def create_reminder(
+        self,
+        user_id: str,
+        time_hhmm: str,
+        label: str,
+        persona: str,
+        chat_id: int = 1,
+    ) -> int:
+        """
+        ensure_user + add_reminder in a single transaction (one commit instead of two).
+        Returns the new reminder id.
+        """
         def work(conn):
-            conn.execute(
-                """
-                INSERT INTO reminders(user_id, chat_id, label, persona, time_hhmm, active)
-                VALUES(?,?,?,?,?,1)
-                """,
-                (user_id, chat_id, label, persona, time_hhmm),
-            )
-            conn.commit()
+            self._ensure_user(conn, user_id)
+            return self._insert_reminder(conn, user_id, time_hhmm, label, persona, chat_id)
 
-        await asyncio.to_thread(lambda: work(self.db.connection()))
+        return await self.unit_of_work(work)
 
     async def list_reminders(
         self,
@@ -70,7 +143,7 @@ class RemindersDAO:
             )
             return [(r["time_hhmm"], r["label"], r["persona"]) for r in cur.fetchall()]
 
-        return await asyncio.to_thread(lambda: work(self.db.connection()))
+        return await self.db.run_read(work)
 
     async def delete_reminder(
         self,
@@ -90,10 +163,9 @@ class RemindersDAO:
                 """,
                 (user_id, chat_id, time_hhmm, label),
             )
-            conn.commit()
             return cur.rowcount
 
-        return await asyncio.to_thread(lambda: work(self.db.connection()))
+        return await self.db.run_write(work)
 
     async def due_at_minute(
         self,
@@ -115,4 +187,297 @@ class RemindersDAO:
             )
             return [(r["user_id"], r["persona"], r["label"]) for r in cur.fetchall()]
 
-        return await asyncio.to_thread(lambda: work(self.db.connection()))
+        return await self.db.run_read(work)
+
+    async def list_active_schedule(
+        self,
+        chat_id: int = 1,
+    ) -> List[Tuple[int, str, str, str, str, Optional[str]]]:
+        """
+        Every active reminder for chat_id with its owner's timezone,
+        used to build the in-memory ScheduleIndex.
+        Output: [(id, user_id, persona, label, time_hhmm, timezone or None), ...]
+        """
+        def work(conn):
+            cur = conn.execute(
+                """
+                SELECT r.id, r.user_id, r.persona, r.label, r.time_hhmm, u.timezone
+                FROM reminders r
+                LEFT JOIN users u ON u.user_id = r.user_id
+                WHERE r.active=1 AND r.chat_id=?
+                """,
+                (chat_id,),
+            )
+            return [
+                (r["id"], r["user_id"], r["persona"], r["label"], r["time_hhmm"], r["timezone"])
+                for r in cur.fetchall()
+            ]
+
+        return await self.db.run_read(work)
+
+    async def list_user_schedule(
+        self,
+        user_ids: List[str],
+        chat_id: int = 1,
+    ) -> List[Tuple[int, str, str, str, str, Optional[str]]]:
+        """
+        list_active_schedule restricted to user_ids (500 per query).
+        Output: [(id, user_id, persona, label, time_hhmm, timezone or None), ...]
+        """
+        def work(conn):
+            out = []
+            for i in range(0, len(user_ids), 500):
+                part = user_ids[i:i + 500]
+                cur = conn.execute(
+                    f"""
+                    SELECT r.id, r.user_id, r.persona, r.label, r.time_hhmm, u.timezone
+                    FROM reminders r
+                    LEFT JOIN users u ON u.user_id = r.user_id
+                    WHERE r.user_id IN ({','.join('?' * len(part))}) AND r.chat_id=? AND r.active=1
+                    """,
+                    (*part, chat_id),
+                )
+                out.extend(
+                    (r["id"], r["user_id"], r["persona"], r["label"], r["time_hhmm"], r["timezone"])
+                    for r in cur.fetchall()
+                )
+            return out
+
+        return await self.db.run_read(work)
+
+    # ----------------------- schedule change feed -----------------------
+
+    async def latest_change_seq(self) -> int:
+        """Newest reminder_changes seq (0 if empty); read before loading the schedule."""
+        def work(conn):
+            return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM reminder_changes").fetchone()[0]
+
+        return await self.db.run_read(work)
+
+    async def changes_since(self, after_seq: int, limit: int = 5000) -> Tuple[int, List[str]]:
+        """
+        Users whose reminders or timezone changed after after_seq (the triggers
+        from migration 9 record every write). Returns (last seq read, distinct user ids).
+        """
+        def work(conn):
+            cur = conn.execute(
+                "SELECT seq, user_id FROM reminder_changes WHERE seq > ? ORDER BY seq LIMIT ?",
+                (after_seq, limit),
+            )
+            seq, users = after_seq, {}
+            for r in cur.fetchall():
+                seq = r["seq"]
+                users[r["user_id"]] = None
+            return seq, list(users)
+
+        return await self.db.run_read(work)
+
+    async def prune_changes(self, before: float) -> int:
+        """Drop change-feed rows written before `before` (unix seconds). Returns rows deleted."""
+        def work(conn):
+            return conn.execute("DELETE FROM reminder_changes WHERE changed_at < ?", (before,)).rowcount
+
+        return await self.unit_of_work(work)
+
+    async def due_between(
+        self,
+        start_hhmm: str,
+        end_hhmm: str,
+        chat_id: int = 1,
+    ) -> List[Tuple[int, str, str, str, str, Optional[str]]]:
+        """
+        Reminders whose time_hhmm is in [start_hhmm, end_hhmm] (one range scan on ix_reminders_due),
+        with their owner's timezone.
+        Output: [(id, user_id, persona, label, time_hhmm, timezone or None), ...]
+        """
+        def work(conn):
+            cur = conn.execute(
+                """
+                SELECT r.id, r.user_id, r.persona, r.label, r.time_hhmm, u.timezone
+                FROM reminders r LEFT JOIN users u ON u.user_id = r.user_id
+                WHERE r.active=1 AND r.chat_id=? AND r.time_hhmm BETWEEN ? AND ?
+                """,
+                (chat_id, start_hhmm, end_hhmm),
+            )
+            return [
+                (r["id"], r["user_id"], r["persona"], r["label"], r["time_hhmm"], r["timezone"])
+                for r in cur.fetchall()
+            ]
+
+        return await self.db.run_read(work)
+
+    # ----------------------- bulk import / export -----------------------
+
+    async def bulk_insert_reminders(
+        self,
+        rows: List[Tuple[str, str, str, str, Optional[str]]],
+        chat_id: int = 1,
+        skip_existing: bool = True,
+    ) -> int:
+        """
+        Insert one chunk of (user_id, time_hhmm, label, persona, timezone or None) rows
+        in a single transaction, creating users as needed (a non-NULL timezone
+        overwrites the user's). With skip_existing, rows matching an existing
+        (user, time, label) are skipped, so re-running an import is harmless.
+        Returns the number of reminders inserted.
+        """
+        users: Dict[str, Optional[str]] = {}
+        for user_id, _, _, _, tz_name in rows:
+            if tz_name or user_id not in users:
+                users[user_id] = tz_name
+
+        def work(conn):
+            conn.executemany(
+                """
+                INSERT INTO users(user_id, timezone) VALUES(?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET timezone=COALESCE(excluded.timezone, users.timezone)
+                """,
+                users.items(),
+            )
+            params = [(u, chat_id, label, persona, t) for u, t, label, persona, _ in rows]
+            if skip_existing:
+                # One indexed lookup per 500 users instead of a NOT EXISTS per row
+                # (INSERT ... SELECT from the same table goes through a temp table)
+                existing: Set[Tuple[str, str, str]] = set()
+                user_ids = list(users)
+                for i in range(0, len(user_ids), 500):
+                    part = user_ids[i:i + 500]
+                    cur = conn.execute(
+                        f"SELECT user_id, time_hhmm, label FROM reminders "
+                        f"WHERE user_id IN ({','.join('?' * len(part))}) AND chat_id=?",
+                        (*part, chat_id),
+                    )
+                    existing.update(tuple(r) for r in cur)
+                fresh = []
+                for p in params:
+                    key = (p[0], p[4], p[2])
+                    if key not in existing:
+                        existing.add(key)
+                        fresh.append(p)
+                params = fresh
+            conn.executemany(
+                "INSERT INTO reminders(user_id, chat_id, label, persona, time_hhmm, active) VALUES(?,?,?,?,?,1)",
+                params,
+            )
+            return len(params)
+
+        return await self.unit_of_work(work)
+
+    async def export_reminders(
+        self,
+        sink: Callable[[List[Tuple[str, str, str, str, Optional[str]]]], None],
+        chat_id: int = 1,
+        batch_size: int = 5000,
+    ) -> int:
+        """
+        Stream every active reminder for chat_id, in id order, to sink() in batches of
+        (user_id, time_hhmm, label, persona, timezone or None). Runs on one read
+        connection (a consistent snapshot); sink is called from the reader thread.
+        Returns the number of rows exported.
+        """
+        def work(conn):
+            cur = conn.execute(
+                """
+                SELECT r.user_id, r.time_hhmm, r.label, r.persona, u.timezone
+                FROM reminders r
+                LEFT JOIN users u ON u.user_id = r.user_id
+                WHERE r.chat_id=? AND r.active=1
+                ORDER BY r.id
+                """,
+                (chat_id,),
+            )
+            total = 0
+            while True:
+                batch = cur.fetchmany(batch_size)
+                if not batch:
+                    return total
+                sink([tuple(r) for r in batch])
+                total += len(batch)
+
+        return await self.db.run_read(work)
+
+    # ----------------------- dispatch state -----------------------
+
+    async def get_high_water_marks(self, chat_id: int = 1) -> Dict[int, int]:
+        """
+        Last UTC epoch minute fully dispatched, per shard, for chat_id.
+        Shards that were never dispatched are absent.
+        """
+        prefix = f"hwm:{chat_id}:"
+
+        def work(conn):
+            cur = conn.execute(
+                "SELECT name, value FROM dispatch_state WHERE name >= ? AND name < ?",
+                (prefix, prefix + "\uffff"),
+            )
+            return {int(r["name"][len(prefix):]): r["value"] for r in cur.fetchall()}
+
+        return await self.db.run_read(work)
+
+    async def claim_fires(
+        self,
+        fires: Iterable[Tuple[int, int]],
+        high_water_marks: Dict[int, int],
+        chat_id: int = 1,
+        outbox: Optional[Dict[Tuple[int, int], Tuple[str, str, str]]] = None,
+        hold_seconds: float = 0.0,
+    ) -> Set[Tuple[int, int]]:
+        """
+        Record (reminder_id, fire_minute) pairs in the ledger and advance the
+        per-shard high-water marks ({shard: minute}), in one transaction.
+        Returns the pairs that were newly claimed; pairs already in the ledger
+        were handled by an earlier run (or another worker) and must not be sent again.
+        Fires of reminders that are gone or inactive are never claimed (another
+        process may have deleted them after our schedule was built).
+
+        outbox ({(reminder_id, fire_minute): (user_id, persona, label)}) also enqueues
+        every newly claimed fire in the outbox, unrendered, in the same transaction;
+        the retry worker leaves those rows alone for hold_seconds while this run delivers them.
+        """
+        fires = list(fires)
+        hold_until = time.time() + hold_seconds
+
+        def work(conn):
+            claimed = set()
+            for reminder_id, fire_minute in fires:
+                cur = conn.execute(
+                    """
+                    INSERT OR IGNORE INTO dispatch_ledger(reminder_id, fire_minute)
+                    SELECT id, ? FROM reminders WHERE id=? AND active=1
+                    """,
+                    (fire_minute, reminder_id),
+                )
+                if cur.rowcount:
+                    claimed.add((reminder_id, fire_minute))
+            conn.executemany(
+                """
+                INSERT INTO dispatch_state(name, value) VALUES(?, ?)
+                ON CONFLICT(name) DO UPDATE SET value=MAX(value, excluded.value)
+                """,
+                [(f"hwm:{chat_id}:{shard}", minute) for shard, minute in high_water_marks.items()],
+            )
+            if outbox:
+                conn.executemany(
+                    """
+                    INSERT OR IGNORE INTO outbox(
+                        reminder_id, fire_minute, chat_id, user_id, persona, label, next_attempt_at, held_until
+                    )
+                    VALUES(?,?,?,?,?,?,?,?)
+                    """,
+                    [
+                        (rid, minute, chat_id, *outbox[(rid, minute)], hold_until, hold_until)
+                        for rid, minute in claimed if (rid, minute) in outbox
+                    ],
+                )
+            return claimed
+
+        return await self.unit_of_work(work)
+
+    async def prune_ledger(self, before_minute: int) -> int:
+        """
+        Drop ledger rows for fires older than before_minute. Returns rows deleted.
+        """
+        def work(conn):
+            return conn.execute("DELETE FROM dispatch_ledger WHERE fire_minute < ?", (before_minute,)).rowcount
+
+        return await self.unit_of_work(work)
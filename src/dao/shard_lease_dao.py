@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import math
+from typing import List, Tuple
+
+
+class ShardLeaseDAO:
+    """
+    SQLite DAO for dispatch shard ownership (tables shard_leases, shard_workers)
+    and for claiming gateway events between workers (handled_events).
+
+    Every worker calls renew() periodically; one call heartbeats the worker,
+    extends its leases, hands back shards above its fair share and picks up
+    free or expired ones, all in a single transaction.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    async def renew(
+        self,
+        owner: str,
+        shard_count: int,
+        lease_seconds: float,
+        now: float,
+    ) -> Tuple[List[int], List[int]]:
+        """
+        Returns (owned shards after renewal, shards released to rebalance).
+        Fair share = ceil(shard_count / live workers), live == heartbeat within one lease.
+        """
+        expires = now + lease_seconds
+
+        def work(conn):
+            conn.executemany(
+                "INSERT OR IGNORE INTO shard_leases(shard, owner, expires_at) VALUES(?, NULL, 0)",
+                [(s,) for s in range(shard_count)],
+            )
+            conn.execute(
+                """
+                INSERT INTO shard_workers(owner, seen_at) VALUES(?, ?)
+                ON CONFLICT(owner) DO UPDATE SET seen_at=excluded.seen_at
+                """,
+                (owner, now),
+            )
+            conn.execute("DELETE FROM shard_workers WHERE seen_at <= ?", (now - lease_seconds,))
+            live = conn.execute("SELECT COUNT(*) FROM shard_workers").fetchone()[0]
+            share = math.ceil(shard_count / max(1, live))
+
+            # Keep what we still hold (an expired lease nobody took is still ours to renew)
+            conn.execute(
+                "UPDATE shard_leases SET expires_at=? WHERE owner=? AND shard < ?",
+                (expires, owner, shard_count),
+            )
+            owned = [
+                r[0] for r in conn.execute(
+                    "SELECT shard FROM shard_leases WHERE owner=? AND shard < ? ORDER BY shard",
+                    (owner, shard_count),
+                )
+            ]
+
+            released: List[int] = []
+            if len(owned) > share:
+                released = owned[share:]
+                owned = owned[:share]
+                conn.executemany(
+                    "UPDATE shard_leases SET owner=NULL, expires_at=0 WHERE shard=? AND owner=?",
+                    [(s, owner) for s in released],
+                )
+            elif len(owned) < share:
+                free = [
+                    r[0] for r in conn.execute(
+                        """
+                        SELECT shard FROM shard_leases
+                        WHERE shard < ? AND (owner IS NULL OR expires_at <= ?)
+                        ORDER BY shard LIMIT ?
+                        """,
+                        (shard_count, now, share - len(owned)),
+                    )
+                ]
+                conn.executemany(
+                    "UPDATE shard_leases SET owner=?, expires_at=? WHERE shard=?",
+                    [(owner, expires, s) for s in free],
+                )
+                owned = sorted(owned + free)
+            return owned, released
+
+        return await self.db.run_write(work)
+
+    async def release_all(self, owner: str) -> None:
+        """Give up every shard (clean shutdown) so another worker can take over at once."""
+        def work(conn):
+            conn.execute("UPDATE shard_leases SET owner=NULL, expires_at=0 WHERE owner=?", (owner,))
+            conn.execute("DELETE FROM shard_workers WHERE owner=?", (owner,))
+
+        await self.db.run_write(work)
+
+    async def claim_event(self, event_id: int) -> bool:
+        """Record a gateway event (message / interaction id) as handled. False if a worker already had."""
+        def work(conn):
+            return conn.execute("INSERT OR IGNORE INTO handled_events(event_id) VALUES(?)", (event_id,)).rowcount == 1
+
+        return await self.db.run_write(work)
+
+    async def prune_events(self, before_id: int) -> int:
+        """Drop claimed event ids below before_id (snowflakes sort by time). Returns rows deleted."""
+        def work(conn):
+            return conn.execute("DELETE FROM handled_events WHERE event_id < ?", (before_id,)).rowcount
+
+        return await self.db.run_write(work)
+
+    async def leases(self) -> List[Tuple[int, str, float]]:
+        """Returns: [(shard, owner or None, expires_at), ...] for status output."""
+        def work(conn):
+            cur = conn.execute("SELECT shard, owner, expires_at FROM shard_leases ORDER BY shard")
+            return [(r["shard"], r["owner"], r["expires_at"]) for r in cur.fetchall()]
+
+        return await self.db.run_read(work)
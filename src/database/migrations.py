@@ -0,0 +1,418 @@
+# src/database/migrations.py
+"""
+Bundled, versioned SQLite schema.
+
+PRAGMA user_version records the last applied migration; migrate() only does
+schema work when the database is behind LATEST_VERSION. Append new migrations
+to MIGRATIONS — never edit one that has shipped.
+
+    python -m src.database.migrations path/to/reminders.db   # migrate + check query plans
+"""
+from __future__ import annotations
+
+import logging
+import sqlite3
+import sys
+from typing import List, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (version, name, DDL)
+MIGRATIONS: List[Tuple[int, str, str]] = [
+    (
+        1,
+        "base schema",
+        """
+        -- Base lookup for multi-chat/platform support
+        CREATE TABLE IF NOT EXISTS chats (
+            id   INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE          -- e.g., 'discord', 'slack'
+        );
+
+        -- Default chat: Discord = 1
+        INSERT OR IGNORE INTO chats (id, name) VALUES (1, 'discord');
+
+        -- Users keyed by platform user id (Discord user id as text)
+        CREATE TABLE IF NOT EXISTS users (
+            user_id TEXT PRIMARY KEY
+        );
+
+        -- Reminders with FK to users and chat
+        CREATE TABLE IF NOT EXISTS reminders (
+            id         INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id    TEXT    NOT NULL,
+            chat_id    INTEGER NOT NULL DEFAULT 1,
+            label      TEXT    NOT NULL,
+            persona    TEXT    NOT NULL,
+            time_hhmm  TEXT    NOT NULL,      -- 'HH:MM' 24h
+            active     INTEGER NOT NULL DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(user_id),
+            FOREIGN KEY (chat_id) REFERENCES chats(id)
+        );
+
+        CREATE INDEX IF NOT EXISTS ix_reminders_user_time
+        ON reminders(user_id, time_hhmm);
+        """,
+    ),
+    (
+        2,
+        "ai response cache",
+        """
+        -- AI response cache: a small pool of generated lines per prompt-input key
+        CREATE TABLE IF NOT EXISTS ai_variants (
+            id           INTEGER PRIMARY KEY AUTOINCREMENT,
+            cache_key    TEXT    NOT NULL,        -- sha1 of persona/label/tone/flags/model
+            line         TEXT    NOT NULL,        -- raw sentence, before name + signature
+            created_at   REAL    NOT NULL,        -- unix seconds
+            last_used_at REAL    NOT NULL DEFAULT 0,
+            uses         INTEGER NOT NULL DEFAULT 0,
+            UNIQUE (cache_key, line)
+        );
+
+        CREATE INDEX IF NOT EXISTS ix_ai_variants_key_used
+        ON ai_variants(cache_key, last_used_at);
+        """,
+    ),
+    (
+        3,
+        "covering indexes for the hot reminder queries",
+        """
+        -- due_at_minute / list_active_schedule: WHERE chat_id=? AND active=1 [AND time_hhmm=?]
+        CREATE INDEX IF NOT EXISTS ix_reminders_due
+        ON reminders(chat_id, active, time_hhmm, user_id, persona, label);
+
+        -- list_reminders (ordered, covering) and delete_reminder (user, chat, time, label)
+        CREATE INDEX IF NOT EXISTS ix_reminders_user_chat
+        ON reminders(user_id, chat_id, time_hhmm, label, active, persona);
+
+        -- superseded by ix_reminders_user_chat
+        DROP INDEX IF EXISTS ix_reminders_user_time;
+        """,
+    ),
+    (
+        4,
+        "per-user timezone",
+        """
+        -- IANA zone name (e.g. 'Europe/Berlin'); NULL == DEFAULT_TIMEZONE
+        ALTER TABLE users ADD COLUMN timezone TEXT;
+        """,
+    ),
+    (
+        5,
+        "dispatch high-water mark and idempotency ledger",
+        """
+        -- Small key/value state for the dispatcher (e.g. 'hwm:1' = last dispatched UTC epoch minute)
+        CREATE TABLE IF NOT EXISTS dispatch_state (
+            name  TEXT    PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+
+        -- One row per (reminder, fire minute) ever claimed; INSERT OR IGNORE makes sends idempotent
+        CREATE TABLE IF NOT EXISTS dispatch_ledger (
+            reminder_id INTEGER NOT NULL,
+            fire_minute INTEGER NOT NULL,     -- UTC epoch minutes
+            PRIMARY KEY (reminder_id, fire_minute)
+        ) WITHOUT ROWID;
+
+        -- prune_ledger: DELETE ... WHERE fire_minute < ?
+        CREATE INDEX IF NOT EXISTS ix_dispatch_ledger_minute
+        ON dispatch_ledger(fire_minute);
+        """,
+    ),
+    (
+        6,
+        "shard leases for multi-process dispatch",
+        """
+        -- One row per dispatch shard (crc32(user_id) % SHARD_COUNT); owner NULL == free
+        CREATE TABLE IF NOT EXISTS shard_leases (
+            shard      INTEGER PRIMARY KEY,
+            owner      TEXT,
+            expires_at REAL    NOT NULL DEFAULT 0   -- unix seconds
+        );
+
+        -- Heartbeats of live dispatch workers, used to compute each worker's fair share
+        CREATE TABLE IF NOT EXISTS shard_workers (
+            owner   TEXT PRIMARY KEY,
+            seen_at REAL NOT NULL                    -- unix seconds
+        );
+
+        -- High-water marks are per shard now: 'hwm:<chat>' -> 'hwm:<chat>:0'
+        UPDATE dispatch_state SET name = name || ':0'
+        WHERE name LIKE 'hwm:%' AND name NOT LIKE 'hwm:%:%';
+        """,
+    ),
+    (
+        7,
+        "acknowledgement event log",
+        """
+        -- Append-only: one row per reminder sent / confirmed taken
+        CREATE TABLE IF NOT EXISTS ack_events (
+            id          INTEGER PRIMARY KEY,       -- rowid; insertion order == time order
+            user_id     TEXT    NOT NULL,
+            reminder_id INTEGER NOT NULL,
+            kind        INTEGER NOT NULL,          -- 0 = sent, 1 = taken
+            at          INTEGER NOT NULL           -- unix seconds
+        );
+
+        CREATE INDEX IF NOT EXISTS ix_ack_events_user_reminder
+        ON ack_events(user_id, reminder_id, at);
+
+        -- Materialized latest state per reminder ("did I already take it" is one PK lookup)
+        CREATE TABLE IF NOT EXISTS reminder_ack_state (
+            reminder_id   INTEGER PRIMARY KEY,
+            user_id       TEXT    NOT NULL,
+            last_sent_at  INTEGER,
+            last_taken_at INTEGER
+        );
+
+        CREATE INDEX IF NOT EXISTS ix_reminder_ack_state_user
+        ON reminder_ack_state(user_id, last_sent_at);
+
+        -- Compacted history: events older than ACK_RETENTION_DAYS folded into daily counts
+        CREATE TABLE IF NOT EXISTS ack_daily (
+            reminder_id INTEGER NOT NULL,
+            day         INTEGER NOT NULL,          -- unix day number (at / 86400)
+            sent        INTEGER NOT NULL DEFAULT 0,
+            taken       INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (reminder_id, day)
+        ) WITHOUT ROWID;
+        """,
+    ),
+    (
+        8,
+        "delivery outbox and undeliverable users",
+        """
+        -- One row per claimed fire until its DM is delivered; written in the claim transaction
+        CREATE TABLE IF NOT EXISTS outbox (
+            reminder_id     INTEGER NOT NULL,
+            fire_minute     INTEGER NOT NULL,      -- UTC epoch minute
+            chat_id         INTEGER NOT NULL,
+            user_id         TEXT    NOT NULL,
+            persona         TEXT    NOT NULL,
+            label           TEXT    NOT NULL,
+            text            TEXT,                  -- NULL until rendered
+            attempts        INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL    NOT NULL,      -- unix seconds; retry worker picks rows due by now
+            last_error      TEXT,
+            PRIMARY KEY (reminder_id, fire_minute)
+        ) WITHOUT ROWID;
+
+        CREATE INDEX IF NOT EXISTS ix_outbox_due
+        ON outbox(chat_id, next_attempt_at);
+
+        -- Users the platform refused to DM (blocked the bot, DMs closed, account gone)
+        CREATE TABLE IF NOT EXISTS undeliverable_users (
+            user_id   TEXT    NOT NULL,
+            chat_id   INTEGER NOT NULL,
+            reason    TEXT    NOT NULL,
+            failed_at INTEGER NOT NULL,            -- unix seconds
+            PRIMARY KEY (user_id, chat_id)
+        ) WITHOUT ROWID;
+        """,
+    ),
+    (
+        9,
+        "schedule change feed and command claims for multi-process workers",
+        """
+        -- One row per user whose schedule changed; every process re-reads those users'
+        -- reminders into its ScheduleIndex (RemindersManager.sync_schedule)
+        CREATE TABLE IF NOT EXISTS reminder_changes (
+            seq        INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id    TEXT    NOT NULL,
+            changed_at REAL    NOT NULL DEFAULT ((julianday('now') - 2440587.5) * 86400.0)  -- unix seconds
+        );
+
+        -- prune_changes: DELETE ... WHERE changed_at < ?
+        CREATE INDEX IF NOT EXISTS ix_reminder_changes_at
+        ON reminder_changes(changed_at);
+
+        -- Triggers, so every writer (commands, bulk import, manual SQL) feeds it
+        CREATE TRIGGER IF NOT EXISTS tr_reminders_insert_change AFTER INSERT ON reminders
+        BEGIN
+            INSERT INTO reminder_changes(user_id) VALUES (NEW.user_id);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS tr_reminders_delete_change AFTER DELETE ON reminders
+        BEGIN
+            INSERT INTO reminder_changes(user_id) VALUES (OLD.user_id);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS tr_reminders_update_change
+        AFTER UPDATE OF user_id, chat_id, label, persona, time_hhmm, active ON reminders
+        BEGIN
+            INSERT INTO reminder_changes(user_id) VALUES (NEW.user_id);
+            INSERT INTO reminder_changes(user_id) SELECT OLD.user_id WHERE OLD.user_id <> NEW.user_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS tr_users_timezone_change AFTER UPDATE OF timezone ON users
+        WHEN OLD.timezone IS NOT NEW.timezone
+        BEGIN
+            INSERT INTO reminder_changes(user_id) VALUES (NEW.user_id);
+        END;
+
+        -- Message / interaction ids already answered: processes sharing one bot token
+        -- all receive every command, and only the first to claim it replies
+        CREATE TABLE IF NOT EXISTS handled_events (
+            event_id INTEGER PRIMARY KEY           -- Discord snowflake (its high bits are a timestamp)
+        );
+        """,
+    ),
+    (
+        10,
+        "outbox holds tracked apart from retry backoff",
+        """
+        -- unix seconds; set while a dispatch run holds the row, NULL once it has been
+        -- rescheduled, so a restart releases holds without touching retry backoff
+        ALTER TABLE outbox ADD COLUMN held_until REAL;
+
+        -- Rows never attempted yet are still in their claim-time hold
+        UPDATE outbox SET held_until = next_attempt_at WHERE attempts = 0;
+        """,
+    ),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+# Queries that run per tick / per command. Keep in sync with the DAOs;
+# check_query_plans() asserts none of them scans a table or a whole index.
+HOT_QUERIES: List[Tuple[str, str, tuple]] = [
+    (
+        "RemindersDAO.due_at_minute",
+        "SELECT user_id, persona, label FROM reminders WHERE active=1 AND chat_id=? AND time_hhmm=?",
+        (1, "08:00"),
+    ),
+    (
+        "RemindersDAO.due_between",
+        "SELECT r.id, r.user_id, r.persona, r.label, r.time_hhmm, u.timezone "
+        "FROM reminders r LEFT JOIN users u ON u.user_id = r.user_id "
+        "WHERE r.active=1 AND r.chat_id=? AND r.time_hhmm BETWEEN ? AND ?",
+        (1, "08:00", "08:15"),
+    ),
+    (
+        "RemindersDAO.prune_ledger",
+        "DELETE FROM dispatch_ledger WHERE fire_minute < ?",
+        (0,),
+    ),
+    (
+        "RemindersDAO.list_active_schedule",
+        "SELECT r.id, r.user_id, r.persona, r.label, r.time_hhmm, u.timezone "
+        "FROM reminders r LEFT JOIN users u ON u.user_id = r.user_id WHERE r.active=1 AND r.chat_id=?",
+        (1,),
+    ),
+    (
+        "RemindersDAO.list_user_schedule",
+        "SELECT r.id, r.user_id, r.persona, r.label, r.time_hhmm, u.timezone "
+        "FROM reminders r LEFT JOIN users u ON u.user_id = r.user_id "
+        "WHERE r.user_id IN (?) AND r.chat_id=? AND r.active=1",
+        ("1", 1),
+    ),
+    (
+        "RemindersDAO.changes_since",
+        "SELECT seq, user_id FROM reminder_changes WHERE seq > ? ORDER BY seq LIMIT ?",
+        (0, 5000),
+    ),
+    (
+        "RemindersDAO.claim_fires",
+        "INSERT OR IGNORE INTO dispatch_ledger(reminder_id, fire_minute) "
+        "SELECT id, ? FROM reminders WHERE id=? AND active=1",
+        (0, 1),
+    ),
+    (
+        "RemindersDAO.get_user_timezone",
+        "SELECT timezone FROM users WHERE user_id=?",
+        ("1",),
+    ),
+    (
+        "RemindersDAO.list_reminders",
+        "SELECT time_hhmm, label, persona FROM reminders WHERE user_id=? AND chat_id=? AND active=1 "
+        "ORDER BY time_hhmm, label",
+        ("1", 1),
+    ),
+    (
+        "RemindersDAO.delete_reminder",
+        "DELETE FROM reminders WHERE user_id=? AND chat_id=? AND time_hhmm=? AND label=?",
+        ("1", 1, "08:00", "x"),
+    ),
+    (
+        "AckDAO.latest_for_user",
+        "SELECT r.id, r.label, s.last_sent_at, s.last_taken_at FROM reminders r "
+        "LEFT JOIN reminder_ack_state s ON s.reminder_id = r.id "
+        "WHERE r.user_id=? AND r.chat_id=? AND r.active=1 AND r.label=? "
+        "ORDER BY COALESCE(s.last_sent_at, 0) DESC, r.id DESC LIMIT 1",
+        ("1", 1, "x"),
+    ),
+    (
+        "OutboxDAO.due",
+        "SELECT reminder_id, fire_minute, user_id, persona, label, text, attempts FROM outbox "
+        "WHERE chat_id=? AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+        (1, 0.0, 100),
+    ),
+    (
+        "AICacheDAO.variants",
+        "SELECT id, line, last_used_at FROM ai_variants WHERE cache_key=? ORDER BY last_used_at, id",
+        ("k",),
+    ),
+]
+
+
+# (query name, table) pairs that may SCAN; every hot query is expected to SEARCH
+SCAN_ALLOWED: Set[Tuple[str, str]] = set()
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Apply pending migrations, each in its own transaction together with its
+    user_version bump. Returns the number applied (0 == schema already current).
+    """
+    current = schema_version(conn)
+    if current >= LATEST_VERSION:
+        return 0
+
+    applied = 0
+    for version, name, ddl in MIGRATIONS:
+        if version <= current:
+            continue
+        try:
+            conn.executescript(f"BEGIN IMMEDIATE;\n{ddl}\nPRAGMA user_version = {version};\nCOMMIT;")
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logger.exception("Migration %d (%s) failed", version, name)
+            raise
+        logger.info("Applied migration %d: %s", version, name)
+        applied += 1
+    return applied
+
+
+def check_query_plans(
+    conn: sqlite3.Connection, queries: Sequence[Tuple[str, str, tuple]] = HOT_QUERIES
+) -> List[str]:
+    """
+    Returns 'query: plan step' for every SCAN step of the given queries, unless
+    (query, table) is in SCAN_ALLOWED. "SCAN t USING COVERING INDEX" counts:
+    it reads the whole index.
+    """
+    problems: List[str] = []
+    for name, sql, params in queries:
+        for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params):
+            detail = row[3]
+            if detail.startswith("SCAN") and (name, detail.split()[1]) not in SCAN_ALLOWED:
+                problems.append(f"{name}: {detail}")
+    return problems
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    target = sys.argv[1] if len(sys.argv) > 1 else ":memory:"
+    connection = sqlite3.connect(target, isolation_level=None)
+    migrate(connection)
+    scans = check_query_plans(connection)
+    for problem in scans:
+        print(f"SCAN  {problem}")
+    print(f"schema v{schema_version(connection)}; {len(scans)} hot query steps scan a table or index")
+    sys.exit(1 if scans else 0)
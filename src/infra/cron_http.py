@@ -1,7 +1,11 @@
+import asyncio
 import logging
 
 from aiohttp import web
 
+from src.infra import metrics
+from src.infra.tracing import TRACER
+
 logger = logging.getLogger(__name__)
 
 async def make_app(bot) -> web.Application:
@@ -14,10 +18,57 @@ async def make_app(bot) -> web.Application:
         cog = bot.get_cog("RemindersCog")
         if not cog:
             return web.json_response({"ok": False, "error": "RemindersCog not loaded"}, status=500)
-        await cog.run_batch(window_minutes=15)
-        return web.json_response({"ok": True})
+        try:
+            report = await cog.run_batch(window_minutes=15)
+        except Exception as e:
+            logger.exception("cron dispatch failed: %s", e)
+            return web.json_response({"ok": False, "error": f"{type(e).__name__}: {e}"}, status=500)
+        if report is None:
+            return web.json_response({"ok": True, "sent": 0, "failed": 0})
+        return web.json_response({"ok": True, "sent": report.sent, "failed": report.failed})
+
+    async def metrics_text(_request):
+        # Rendered on demand; nothing is aggregated between scrapes
+        return web.Response(body=metrics.render().encode("utf-8"), headers={"Content-Type": metrics.CONTENT_TYPE})
+
+    async def traces(request):
+        try:
+            n = int(request.query.get("n", "20"))
+        except ValueError:
+            return web.json_response({"ok": False, "error": "n must be an integer"}, status=400)
+        return web.json_response({"ok": True, "ticks": TRACER.recent(n)})
+
+    async def start_profile(request):
+        # POST /debug/profile?ticks=N[&wait=1]: without wait, fetch the report later with GET
+        try:
+            ticks = max(1, min(int(request.query.get("ticks", "1")), 60))
+        except ValueError:
+            return web.json_response({"ok": False, "error": "ticks must be an integer"}, status=400)
+        try:
+            fut = TRACER.start_profile(ticks)
+        except RuntimeError as e:
+            return web.json_response({"ok": False, "error": str(e)}, status=409)
+        if request.query.get("wait") not in ("1", "true"):
+            return web.json_response({"ok": True, "profiling_ticks": ticks}, status=202)
+        try:
+            report = await asyncio.shield(fut)
+        except asyncio.CancelledError:
+            if not fut.cancelled():
+                raise       # the request itself went away
+            return web.json_response({"ok": False, "error": "profiling cancelled"}, status=409)
+        return web.Response(text=report)
+
+    async def last_profile(_request):
+        if TRACER.last_profile is None:
+            status = "running" if TRACER.profiling else "none"
+            return web.json_response({"ok": False, "status": status}, status=404)
+        return web.Response(text=TRACER.last_profile)
 
     app.router.add_get("/health", health)
+    app.router.add_get("/debug/traces", traces)
+    app.router.add_post("/debug/profile", start_profile)
+    app.router.add_get("/debug/profile", last_profile)
+    app.router.add_get("/metrics", metrics_text)
     app.router.add_post("/cron/dispatch", dispatch)
     return app
 
@@ -0,0 +1,89 @@
+# src/infra/startup.py
+"""
+Startup phase timings and the app-command tree fingerprint.
+
+- STARTUP.phase(name) times one boot step (config, DB open, schema, schedule
+  load, command sync, ...); mark(name) records the gap since the previous step
+  (e.g. the gateway login). ready() logs the breakdown once, with the total
+  time-to-ready since the process imported this module.
+- command_tree_hash(tree) fingerprints the global app commands exactly as
+  tree.sync() would upload them, so an unchanged tree can skip the rate-limited
+  sync on the next boot.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from src.infra import metrics
+
+logger = logging.getLogger(__name__)
+
+_PHASE_SECONDS = metrics.gauge("startup_phase_seconds", "Duration of each startup phase on the last boot", ("phase",))
+_READY_SECONDS = metrics.gauge("startup_ready_seconds", "Process start to first on_ready on the last boot")
+
+
+class StartupTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+        self.ready_seconds: Optional[float] = None
+        self._last = self.started
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases.append((name, seconds))
+        self._last = time.perf_counter()
+        _PHASE_SECONDS.labels(name).set(seconds)
+        logger.info("Startup: %s %.3fs", name, seconds)
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def mark(self, name: str) -> None:
+        """Record the time since the previous phase ended as `name`."""
+        self.record(name, time.perf_counter() - self._last)
+
+    def ready(self) -> Optional[float]:
+        """Log the breakdown the first time the bot is ready; later calls (reconnects) return None."""
+        if self.ready_seconds is not None:
+            return None
+        self.ready_seconds = time.perf_counter() - self.started
+        _READY_SECONDS.set(self.ready_seconds)
+        breakdown = ", ".join(f"{name}={seconds:.2f}s" for name, seconds in self.phases)
+        logger.info("Startup: ready in %.2fs [%s]", self.ready_seconds, breakdown)
+        return self.ready_seconds
+
+
+STARTUP = StartupTimer()
+
+
+# ---------- app-command tree fingerprint ----------
+def command_tree_hash(tree, application_id: Optional[int] = None) -> str:
+    payload = sorted((cmd.to_dict(tree) for cmd in tree.get_commands()), key=lambda c: (c.get("type", 1), c["name"]))
+    blob = json.dumps({"application_id": application_id, "commands": payload}, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def read_synced_hash(path: str) -> Optional[str]:
+    try:
+        return Path(path).read_text(encoding="utf-8").strip() or None
+    except OSError:
+        return None
+
+
+def write_synced_hash(path: str, digest: str) -> None:
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix(target.suffix + ".tmp")
+    tmp.write_text(digest + "\n", encoding="utf-8")
+    tmp.replace(target)
@@ -0,0 +1,205 @@
+# src/infra/tracing.py
+"""
+Per-tick trace spans and on-demand cProfile sessions for the dispatcher.
+
+- Tracer.tick() wraps one dispatch run; span(stage) / record(stage, seconds)
+  anywhere below it (DB calls, user lookups, renders, sends) add to that tick's
+  breakdown via a ContextVar, so nothing has to be passed down. Outside a tick
+  they are a single ContextVar lookup.
+- Finished ticks go into a ring buffer (recent()); a tick slower than
+  slow_tick_seconds logs its breakdown at WARNING.
+- start_profile(n) runs cProfile across the next n ticks with that name and
+  resolves the returned future with the pstats text (also kept as last_profile). Other coroutines that run while a tick
+  is awaiting are included too (cProfile sees the whole thread).
+"""
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import io
+import logging
+import pstats
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TickTrace:
+    """
+    Spans of one tick, aggregated per stage. Stages run concurrently (16 sends
+    at once), so a stage's total can exceed the tick's wall time.
+    """
+
+    __slots__ = ("name", "started_at", "duration", "stages", "meta", "closed")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.stages: Dict[str, List[float]] = {}    # stage -> [count, total seconds, max seconds]
+        self.meta: Dict[str, object] = {}
+        self.closed = False
+
+    def add(self, stage: str, seconds: float) -> None:
+        if self.closed:
+            # A task spawned during the tick (e.g. a background flush) outlived it
+            return
+        s = self.stages.get(stage)
+        if s is None:
+            self.stages[stage] = [1, seconds, seconds]
+        else:
+            s[0] += 1
+            s[1] += seconds
+            if seconds > s[2]:
+                s[2] = seconds
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration": round(self.duration, 4),
+            "meta": dict(self.meta),
+            "stages": {
+                stage: {"count": int(n), "total": round(total, 4), "max": round(mx, 4)}
+                for stage, (n, total, mx) in sorted(self.stages.items(), key=lambda kv: -kv[1][1])
+            },
+        }
+
+    def summary(self) -> str:
+        parts = [
+            f"{stage}={total:.2f}s/{int(n)}" for stage, (n, total, _) in sorted(self.stages.items(), key=lambda kv: -kv[1][1])
+        ]
+        meta = " ".join(f"{k}={v}" for k, v in self.meta.items())
+        return f"{self.name} {self.duration:.2f}s {meta} [{', '.join(parts) or 'no spans'}]"
+
+
+_current: ContextVar[Optional[TickTrace]] = ContextVar("tick_trace", default=None)
+
+
+def record(stage: str, seconds: float) -> None:
+    """Add an already-measured duration to the current tick (no-op outside one)."""
+    trace = _current.get()
+    if trace is not None:
+        trace.add(stage, seconds)
+
+
+@contextmanager
+def span(stage: str):
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(stage, time.perf_counter() - started)
+
+
+def annotate(**meta) -> None:
+    """Attach counters (e.g. due=123) to the current tick."""
+    trace = _current.get()
+    if trace is not None:
+        trace.meta.update(meta)
+
+
+class _ProfileSession:
+    def __init__(self, ticks: int, name: str, future: asyncio.Future):
+        self.remaining = ticks
+        self.ticks = ticks
+        self.name = name
+        self.future = future
+        self.profiler = cProfile.Profile()
+
+
+class Tracer:
+    def __init__(self, capacity: int = 200, slow_tick_seconds: float = 30.0, profile_lines: int = 40):
+        self.slow_tick_seconds = slow_tick_seconds
+        self.profile_lines = profile_lines
+        self._ticks: Deque[TickTrace] = deque(maxlen=max(1, capacity))
+        self._profile: Optional[_ProfileSession] = None
+        self.last_profile: Optional[str] = None
+
+    def configure(self, *, capacity: Optional[int] = None, slow_tick_seconds: Optional[float] = None) -> None:
+        if capacity is not None and capacity != self._ticks.maxlen:
+            self._ticks = deque(self._ticks, maxlen=max(1, capacity))
+        if slow_tick_seconds is not None:
+            self.slow_tick_seconds = slow_tick_seconds
+
+    @asynccontextmanager
+    async def tick(self, name: str = "dispatch"):
+        trace = TickTrace(name)
+        token = _current.set(trace)
+        session = self._profile
+        if session is not None and session.name != name:
+            session = None
+        if session is not None:
+            session.profiler.enable()
+        started = time.perf_counter()
+        try:
+            yield trace
+        finally:
+            trace.duration = time.perf_counter() - started
+            trace.closed = True
+            if session is not None:
+                session.profiler.disable()
+                self._finish_profile_tick(session)
+            _current.reset(token)
+            self._ticks.append(trace)
+            if self.slow_tick_seconds and trace.duration >= self.slow_tick_seconds:
+                logger.warning("Slow tick (>= %.1fs): %s", self.slow_tick_seconds, trace.summary())
+
+    def recent(self, n: Optional[int] = None) -> List[Dict[str, object]]:
+        ticks = list(self._ticks)
+        if n is not None:
+            ticks = ticks[-n:] if n > 0 else []
+        return [t.as_dict() for t in ticks]
+
+    def recent_summaries(self, n: int = 5) -> List[str]:
+        return [t.summary() for t in list(self._ticks)[-n:]] if n > 0 else []
+
+    # ---------- profiling ----------
+    @property
+    def profiling(self) -> bool:
+        return self._profile is not None
+
+    def start_profile(self, ticks: int = 1, name: str = "dispatch") -> asyncio.Future:
+        """
+        Profile the next `ticks` ticks called `name`. The future resolves to the
+        pstats report (cumulative time, top profile_lines entries). One session at a time.
+        """
+        if self._profile is not None:
+            raise RuntimeError(f"a profiling session is already running ({self._profile.remaining} ticks left)")
+        fut = asyncio.get_running_loop().create_future()
+        self._profile = _ProfileSession(max(1, ticks), name, fut)
+        logger.info("Tracer: profiling the next %d %s ticks", self._profile.ticks, name)
+        return fut
+
+    def cancel_profile(self) -> bool:
+        session, self._profile = self._profile, None
+        if session is None:
+            return False
+        if not session.future.done():
+            session.future.cancel()
+        return True
+
+    def _finish_profile_tick(self, session: _ProfileSession) -> None:
+        session.remaining -= 1
+        if session.remaining > 0 or self._profile is not session:
+            return
+        self._profile = None
+        out = io.StringIO()
+        stats = pstats.Stats(session.profiler, stream=out)
+        stats.sort_stats("cumulative").print_stats(self.profile_lines)
+        report = f"cProfile over {session.ticks} {session.name} tick(s)\n{out.getvalue()}"
+        self.last_profile = report
+        if not session.future.done():
+            session.future.set_result(report)
+        logger.info("Tracer: profiling session finished (%d ticks)", session.ticks)
+
+
+TRACER = Tracer()
@@ -0,0 +1,108 @@
+# src/services/ack_log.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.dao.ack_dao import SENT, TAKEN, AckEvent
+
+logger = logging.getLogger(__name__)
+
+# A "taken" with no send since is still current for this long (e.g. taken before the reminder fired)
+TAKEN_GRACE_SECONDS = 12 * 3600
+
+
+class AckLog:
+    """
+    Write-behind buffer in front of AckDAO.
+
+    - record() is synchronous and just appends; the buffer is written as one
+      batch when it reaches flush_size or when flush() runs (the cog calls it
+      every few seconds), so a tick with thousands of sends costs one commit
+    - a failed flush keeps the events for the next attempt, but at most
+      max_buffered of them: during a long outage the oldest are dropped
+      (and counted) rather than growing the buffer and every retry's batch
+    - mark_taken() flushes first so it sees the latest send, then writes
+      the "taken" event immediately
+    - compact() folds events older than retention_days into daily counts
+    """
+
+    def __init__(self, dao, *, flush_size: int = 500, retention_days: int = 30, max_buffered: int = 50_000):
+        self.dao = dao
+        self.flush_size = max(1, flush_size)
+        self.retention_days = max(1, retention_days)
+        self.max_buffered = max(self.flush_size, max_buffered)
+        self._buffer: List[AckEvent] = []
+        self._flush_lock = asyncio.Lock()
+        self._pending_flush: Optional[asyncio.Task] = None
+        self._counters: Dict[str, int] = {
+            "recorded": 0, "written": 0, "flushes": 0, "taken": 0, "compacted": 0, "dropped": 0,
+        }
+
+    def record(self, user_id: str, reminder_id: int, kind: int = SENT, at: Optional[int] = None) -> None:
+        self._buffer.append((user_id, reminder_id, kind, int(time.time()) if at is None else at))
+        self._counters["recorded"] += 1
+        self._trim()
+        if len(self._buffer) >= self.flush_size and (self._pending_flush is None or self._pending_flush.done()):
+            self._pending_flush = asyncio.get_running_loop().create_task(self.flush())
+
+    async def flush(self) -> int:
+        """Write everything buffered so far in one transaction. Returns the number of events written."""
+        async with self._flush_lock:
+            batch, self._buffer = self._buffer, []
+            if not batch:
+                return 0
+            try:
+                written = await self.dao.append(batch)
+            except Exception:
+                # Keep the events (in order) for the next attempt
+                self._buffer[:0] = batch
+                self._trim()
+                logger.exception(
+                    "AckLog: flush of %d events failed; will retry (%d dropped so far, buffer capped at %d)",
+                    len(batch), self._counters["dropped"], self.max_buffered,
+                )
+                return 0
+            self._counters["written"] += written
+            self._counters["flushes"] += 1
+            return written
+
+    async def mark_taken(
+        self, user_id: str, label: Optional[str] = None, now: Optional[int] = None
+    ) -> Tuple[str, Optional[str], Optional[int]]:
+        """
+        Confirm the user's most recently sent reminder (or the one with `label`).
+        Returns (status, label, at): status is "taken", "already" (at = when it was
+        taken) or "none" (no matching reminder).
+        """
+        now = int(time.time()) if now is None else now
+        await self.flush()
+        row = await self.dao.latest_for_user(user_id, label)
+        if row is None:
+            return "none", label, None
+        reminder_id, found_label, last_sent, last_taken = row
+        if last_taken is not None and last_taken >= (last_sent or now - TAKEN_GRACE_SECONDS):
+            return "already", found_label, last_taken
+        await self.dao.append([(user_id, reminder_id, TAKEN, now)])
+        self._counters["taken"] += 1
+        return "taken", found_label, now
+
+    async def compact(self, now: Optional[int] = None) -> int:
+        now = int(time.time()) if now is None else now
+        await self.flush()
+        n = await self.dao.compact(now - self.retention_days * 86400)
+        self._counters["compacted"] += n
+        if n:
+            logger.info("AckLog: compacted %d events older than %d days", n, self.retention_days)
+        return n
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._counters, "buffered": len(self._buffer)}
+
+    def _trim(self) -> None:
+        excess = len(self._buffer) - self.max_buffered
+        if excess > 0:
+            del self._buffer[:excess]
+            self._counters["dropped"] += excess
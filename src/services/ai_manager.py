@@ -1,15 +1,47 @@
 from __future__ import annotations
+import asyncio
+import hashlib
+import json
 import logging
-from typing import Optional
-import aiohttp
+import random
+import re
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+from src.adapters.ai.http_transport import ProviderTransport
+from src.infra import metrics, tracing
+from src.services.circuit_breaker import STATE_VALUES, CircuitBreaker
 
 logger = logging.getLogger(__name__)
 
+# What _generate_with_ollama returns when the provider fails; never cached.
+OLLAMA_FAILURE_LINE = "Remember to take care of yourself."
+
+# (persona, label, user_name) for generate_batch
+BatchItem = Tuple[str, str, Optional[str]]
+# (message, fallback): fallback is True when the model was asked but failed or was
+# shed, and the line is a spare variant or the `Remember to ...` sentence instead
+Rendered = Tuple[str, bool]
+
+_NUMBERED_LINE = re.compile(r"^\s*(\d+)[.):]\s*(.+?)\s*$", re.M)
+# End of the first sentence: terminator(s), optional closing quote/bracket, then whitespace
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*(?=\s)")
+
+_PROVIDER_SECONDS = metrics.histogram("ai_provider_seconds", "Model API call latency", ("provider", "outcome"))
+# source: model (fresh line), cache (pooled variant), fallback (deterministic "Remember to ..." line)
+_LINES = metrics.counter("ai_lines_total", "Reminder lines produced, by where they came from", ("source",))
+# reason: breaker_open (model server failing/slow), queue_full (too many calls already in flight)
+_SHED = metrics.counter("ai_shed_total", "Model calls skipped in favour of the fallback line", ("reason",))
+
 class AIManager:
     """
     Provider-agnostic generator for persona reminders.
     - enabled == True  → actually call the model
     - enabled == False → deterministic fallback (no network)
+    - cache (AICacheDAO) → reuse a rotating pool of generated lines per input key,
+      refreshing one only occasionally
+    - breaker / max_pending → model calls are skipped (fallback line) while the
+      server keeps failing or answering slowly, or when max_pending calls are
+      already in flight; half-open probes close the breaker again on recovery
     """
 
     def __init__(
@@ -20,6 +52,8 @@ class AIManager:
         model: Optional[str] = None,
         ollama_host: Optional[str] = None,
         enabled: bool | None = None,
+        cache=None,
+        transport: Optional[ProviderTransport] = None,
     ):
         if config:
             self.provider = (provider or config.get_ai_provider()).lower()
@@ -32,6 +66,29 @@ class AIManager:
             self.tone = config.get_ai_tone()  # "PG" | "PG13" | "R"
             self.allow_slang = config.get_ai_allow_slang()
             self.allow_catchphrases = config.get_ai_allow_catchphrases()
+
+            # Variant-pool cache knobs
+            self.cache_pool_size = config.get_ai_cache_pool_size()
+            self.cache_refresh_probability = config.get_ai_cache_refresh_probability()
+            self.cache_ttl_seconds = config.get_ai_cache_ttl_days() * 86400
+            self.cache_max_keys = config.get_ai_cache_max_keys()
+            self.batch_size = config.get_ai_batch_size()
+            self.stream = config.get_ai_stream()
+            self.max_chars = config.get_ai_max_chars()
+            self.max_pending = config.get_ai_max_pending()
+
+            breaker = CircuitBreaker(
+                "ollama",
+                failure_threshold=config.get_ai_breaker_failures(),
+                slow_call_seconds=config.get_ai_breaker_slow_seconds(),
+                reset_seconds=config.get_ai_breaker_reset_seconds(),
+            )
+
+            transport = transport or ProviderTransport(
+                limit_per_host=config.get_ai_http_limit_per_host(),
+                keepalive_timeout=config.get_ai_http_keepalive_seconds(),
+                timeout_seconds=config.get_ai_http_timeout_seconds(),
+            )
         else:
             self.provider = (provider or "none").lower()
             self.model = model or "mistral"
@@ -40,6 +97,27 @@ class AIManager:
             self.tone = "PG"
             self.allow_slang = False
             self.allow_catchphrases = False
+            self.cache_pool_size = 5
+            self.cache_refresh_probability = 0.1
+            self.cache_ttl_seconds = 30 * 86400
+            self.cache_max_keys = 10_000
+            self.batch_size = 8
+            self.stream = True
+            self.max_chars = 120
+            self.max_pending = 32
+            breaker = CircuitBreaker("ollama")
+
+        self.cache = cache
+        self._cache_writes = 0
+        self.breaker = breaker
+        self._pending = 0
+        self._shed: Dict[str, int] = {"breaker_open": 0, "queue_full": 0}
+        metrics.gauge_callback(
+            "ai_breaker_state", "Model circuit breaker: 0 closed, 1 half-open, 2 open", lambda: STATE_VALUES[self.breaker.state]
+        )
+        metrics.gauge_callback("ai_pending_calls", "Model calls in flight or waiting for a connection", lambda: self._pending)
+        # Pooled keep-alive HTTP session shared by every provider call (see close())
+        self.transport = transport or ProviderTransport()
 
         logger.info(
             "AIManager: provider=%s model=%s enabled=%s host=%s tone=%s slang=%s catchphrases=%s",
@@ -56,7 +134,38 @@ class AIManager:
             "Do NOT include the user's name in the sentence; name will be appended after.",
             "No emojis or hashtags.",
             "No backstory; focus only on the reminder.",
-        ]
+        ] + self._style_rules()
+
+        return (
+            "You are writing a persona-styled reminder.\n"
+            + "\n".join(f"- {r}" for r in rules) + "\n"
+            f"Persona: {persona}\n"
+            f"Task: remind the user to {label}.\n"
+            "Output: only the single sentence (no quotes)."
+        )
+
+    def _build_batch_prompt(self, items: Sequence[Tuple[str, str]]) -> str:
+        rules: list[str] = [
+            "For EACH numbered item write exactly ONE sentence (<120 chars) in that item's persona.",
+            "Goal: a short, motivating reminder for the item's task.",
+            "Do NOT include any user's name; names will be appended after.",
+            "No emojis or hashtags.",
+            "No backstory; focus only on the reminder.",
+        ] + self._style_rules()
+
+        listing = "\n".join(
+            f"{i}. Persona: {persona} | Task: remind the user to {label}."
+            for i, (persona, label) in enumerate(items, start=1)
+        )
+        return (
+            "You are writing persona-styled reminders.\n"
+            + "\n".join(f"- {r}" for r in rules) + "\n"
+            f"Items:\n{listing}\n"
+            f"Output: ONLY a JSON array of exactly {len(items)} strings, one per item, in item order."
+        )
+
+    def _style_rules(self) -> list[str]:
+        rules: list[str] = []
 
         # Tone gate
         if self.tone in ("PG", "PG13"):
@@ -71,32 +180,216 @@ class AIManager:
             if self.allow_catchphrases else
             "Avoid copyrighted catchphrases or verbatim quotes."
         )
-
-        return (
-            "You are writing a persona-styled reminder.\n"
-            + "\n".join(f"- {r}" for r in rules) + "\n"
-            f"Persona: {persona}\n"
-            f"Task: remind the user to {label}.\n"
-            "Output: only the single sentence (no quotes)."
-        )
+        return rules
 
     # ---------- Public API ----------
     async def generate(self, persona: str, label: str, user_name: Optional[str] = None) -> str:
+        return (await self.render(persona, label, user_name))[0]
+
+    async def render(self, persona: str, label: str, user_name: Optional[str] = None) -> Rendered:
+        """generate(), plus whether the model failed to write the line (see Rendered)."""
         prompt = self._build_prompt(persona, label, user_name)
         logger.debug("AI Prompt => %s", prompt)
 
+        fallback = False
         if not self.enabled:
             # Deterministic fallback
-            clean = (label or "").strip().rstrip(".!?")
-            line = f"Remember to {clean}."
+            line = self._fallback_sentence(label)
+            _LINES.labels("fallback").inc()
         else:
             if self.provider == "ollama":
-                line = await self._generate_with_ollama(prompt=prompt)
+                line, fallback = await self._generate_cached(persona, label, prompt)
             else:
                 # Unknown provider => fallback
-                clean = (label or "").strip().rstrip(".!?")
-                line = f"Remember to {clean}."
+                line = self._fallback_sentence(label)
+                _LINES.labels("fallback").inc()
 
+        return self._finalize(line, persona, user_name), fallback
+
+    # ---------- Variant-pool cache ----------
+    def _cache_key(self, persona: str, label: str) -> str:
+        parts = (
+            (persona or "").strip().lower(),
+            (label or "").strip().lower(),
+            self.tone,
+            str(self.allow_slang),
+            str(self.allow_catchphrases),
+            self.provider,
+            self.model,
+        )
+        return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    async def _generate_cached(self, persona: str, label: str, prompt: str) -> Tuple[str, bool]:
+        key = self._cache_key(persona, label)
+        reuse, spare = await self._pick_cached(key)
+        if reuse is not None:
+            _LINES.labels("cache").inc()
+            return reuse, False
+
+        line = await self._generate_with_ollama(prompt=prompt, first_sentence=True)
+        if line == OLLAMA_FAILURE_LINE:
+            # Provider failed or was shed: reuse an existing variant, else the `Remember to ...` line
+            _LINES.labels("cache" if spare else "fallback").inc()
+            return spare or self._fallback_sentence(label), True
+        _LINES.labels("model").inc()
+        await self._remember(key, line)
+        return line, False
+
+    async def _pick_cached(self, key: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Returns (line to reuse now, spare line).
+        reuse is None when the pool is still filling or this send should refresh it;
+        spare is any cached line to fall back on if the provider then fails.
+        """
+        if self.cache is None:
+            return None, None
+        try:
+            pool = await self.cache.variants(key)  # least recently used first
+        except Exception as e:
+            logger.warning("AI cache read failed, calling model: %s", e)
+            return None, None
+        if not pool:
+            return None, None
+
+        variant_id, line, _ = pool[0]
+        if len(pool) < self.cache_pool_size or random.random() < self.cache_refresh_probability:
+            return None, line
+        try:
+            await self.cache.touch(variant_id)
+        except Exception as e:
+            logger.warning("AI cache touch failed: %s", e)
+        return line, line
+
+    async def _remember(self, key: str, line: str) -> None:
+        if self.cache is None:
+            return
+        try:
+            await self.cache.add_variant(key, line, self.cache_pool_size)
+            self._cache_writes += 1
+            if self._cache_writes % 100 == 0:
+                evicted = await self.cache.evict(self.cache_ttl_seconds, self.cache_max_keys)
+                if evicted:
+                    logger.info("AI cache evicted %d variants", evicted)
+        except Exception as e:
+            logger.warning("AI cache write failed: %s", e)
+
+    # ---------- Batched generation ----------
+    async def generate_batch(self, items: Sequence[BatchItem]) -> List[Rendered]:
+        """
+        Render many reminders with as few model calls as possible.
+        items: [(persona, label, user_name), ...] → [(message, fallback), ...] in the same order.
+
+        Cached variants are reused first; the remaining (deduplicated) persona/label
+        pairs go out in prompts of up to batch_size items asking for a JSON array.
+        Entries that come back missing or malformed are generated one by one.
+        """
+        if not items:
+            return []
+        if not self.enabled or self.provider != "ollama":
+            _LINES.labels("fallback").inc(len(items))
+            return [(self.fallback_line(p, l, n), False) for p, l, n in items]
+
+        keys = [self._cache_key(p, l) for p, l, _ in items]
+        lines: List[Optional[str]] = [None] * len(items)
+        spares: Dict[str, Optional[str]] = {}
+        todo: Dict[str, Tuple[str, str]] = {}  # key -> (persona, label), insertion ordered
+        for i, (persona, label, _) in enumerate(items):
+            if keys[i] in todo:
+                continue
+            reuse, spare = await self._pick_cached(keys[i])
+            if reuse is not None:
+                lines[i] = reuse
+                _LINES.labels("cache").inc()
+            else:
+                todo[keys[i]] = (persona, label)
+                spares[keys[i]] = spare
+
+        fresh: Dict[str, Rendered] = {}
+        pending = list(todo.items())
+        for start in range(0, len(pending), self.batch_size):
+            chunk = pending[start:start + self.batch_size]
+            if len(chunk) == 1:
+                parsed: List[Optional[str]] = [None]
+            else:
+                prompt = self._build_batch_prompt([pl for _, pl in chunk])
+                logger.debug("AI Batch Prompt => %s", prompt)
+                raw = await self._generate_with_ollama(prompt=prompt, items=len(chunk))
+                parsed = self._parse_batch(raw, len(chunk)) if raw != OLLAMA_FAILURE_LINE else [None] * len(chunk)
+                misses = sum(1 for p in parsed if p is None)
+                if misses:
+                    logger.warning("AI batch of %d returned %d unusable entries; generating those singly", len(chunk), misses)
+
+            async def one(persona: str, label: str) -> str:
+                return await self._generate_with_ollama(
+                    prompt=self._build_prompt(persona, label, None), first_sentence=True
+                )
+
+            singles = await asyncio.gather(
+                *(one(*pl) for (_, pl), line in zip(chunk, parsed) if line is None)
+            )
+            singles_iter = iter(singles)
+            for (key, (persona, label)), line in zip(chunk, parsed):
+                if line is None:
+                    line = next(singles_iter)
+                if line == OLLAMA_FAILURE_LINE:
+                    _LINES.labels("cache" if spares.get(key) else "fallback").inc()
+                    fresh[key] = (spares.get(key) or self._fallback_sentence(label), True)
+                else:
+                    _LINES.labels("model").inc()
+                    await self._remember(key, line)
+                    fresh[key] = (line, False)
+
+        out: List[Rendered] = []
+        for i, (persona, _, user_name) in enumerate(items):
+            line, fallback = (lines[i], False) if lines[i] is not None else fresh[keys[i]]
+            out.append((self._finalize(line, persona, user_name), fallback))
+        return out
+
+    @staticmethod
+    def _clean_line(entry) -> Optional[str]:
+        if isinstance(entry, dict):
+            entry = entry.get("text") or entry.get("sentence") or entry.get("reminder")
+        if not isinstance(entry, str):
+            return None
+        line = entry.strip().strip('"').strip()
+        if not line or len(line) > 240:
+            return None
+        return line
+
+    @classmethod
+    def _parse_batch(cls, raw: str, n: int) -> List[Optional[str]]:
+        """Parse the model's JSON array (tolerating fences/prose around it); numbered lines as a last resort."""
+        out: List[Optional[str]] = [None] * n
+        text = (raw or "").strip()
+        start, end = text.find("["), text.rfind("]")
+        data = None
+        if start != -1 and end > start:
+            try:
+                data = json.loads(text[start:end + 1])
+            except ValueError:
+                data = None
+        if isinstance(data, list):
+            for i, entry in enumerate(data[:n]):
+                out[i] = cls._clean_line(entry)
+            return out
+        for m in _NUMBERED_LINE.finditer(text):
+            idx = int(m.group(1)) - 1
+            if 0 <= idx < n and out[idx] is None:
+                out[idx] = cls._clean_line(m.group(2))
+        return out
+
+    def fallback_line(self, persona: str, label: str, user_name: Optional[str] = None) -> str:
+        """Deterministic `Remember to ...` message (no network), formatted like generate()."""
+        return self._finalize(self._fallback_sentence(label), persona, user_name)
+
+    # ---------- Formatting ----------
+    @staticmethod
+    def _fallback_sentence(label: str) -> str:
+        clean = (label or "").strip().rstrip(".!?")
+        return f"Remember to {clean}."
+
+    @staticmethod
+    def _finalize(line: str, persona: str, user_name: Optional[str]) -> str:
         # Append user name at the end if not present
         first = (line or "").strip()
         if user_name and user_name.lower() not in first.lower():
@@ -105,9 +398,45 @@ class AIManager:
         # Consistent persona signature
         return f"{first}\n- {persona}"
 
+    async def close(self) -> None:
+        """Release pooled provider connections (cog unload / shutdown)."""
+        await self.transport.close()
+
+    def status(self) -> Dict[str, object]:
+        return {
+            **self.breaker.stats(),
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "shed": dict(self._shed),
+        }
+
+    def _admit(self) -> bool:
+        """Load shedding in front of every model call; True means the caller must record the outcome."""
+        if self._pending >= self.max_pending:
+            reason = "queue_full"
+        elif not self.breaker.allow():
+            reason = "breaker_open"
+        else:
+            return True
+        self._shed[reason] += 1
+        _SHED.labels(reason).inc()
+        return False
+
     # ---------- Provider implementations ----------
-    async def _generate_with_ollama(self, *, prompt: str, temperature: float = 0.7) -> str:
+    async def _generate_with_ollama(
+        self, *, prompt: str, temperature: float = 0.7, first_sentence: bool = False, items: int = 1
+    ) -> str:
+        """
+        first_sentence=True streams the NDJSON response and stops at the first
+        sentence end (or max_chars), closing the request so Ollama stops generating.
+        items is the number of lines a batch prompt asks for; the breaker's slow-call
+        threshold applies per line, so a normal multi-item call isn't counted as slow.
+        Returns OLLAMA_FAILURE_LINE without calling the server when the call is shed.
+        """
+        if not self._admit():
+            return OLLAMA_FAILURE_LINE
         url = f"{self.ollama_host}/api/generate"
+        streaming = first_sentence and self.stream
         payload = {
             "model": self.model,
             "prompt": prompt,
@@ -116,17 +445,71 @@ class AIManager:
                 "top_p": 0.9,
                 "repeat_penalty": 1.1,
             },
-            "stream": False,
+            "stream": streaming,
         }
+        started = time.perf_counter()
+        outcome = "error"
+        self._pending += 1
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload, timeout=60) as resp:
-                    if resp.status != 200:
-                        text = await resp.text()
-                        raise RuntimeError(f"Ollama error {resp.status}: {text}")
+            async with self.transport.post(url, json=payload) as resp:
+                if resp.status != 200:
+                    text = await resp.text()
+                    raise RuntimeError(f"Ollama error {resp.status}: {text}")
+                if streaming:
+                    msg = await self._read_first_sentence(resp)
+                else:
                     data = await resp.json()
                     msg = (data.get("response") or "").strip()
-                    return msg or "Remember to take care of yourself."
+                outcome = "ok" if msg else "empty"
+                return msg or OLLAMA_FAILURE_LINE
+        except asyncio.CancelledError:
+            # The caller's render deadline passed: a slow server, as far as the breaker is concerned
+            outcome = "cancelled"
+            raise
         except Exception as e:
             logger.exception("AIManager._generate_with_ollama failed: %s", e)
-            return "Remember to take care of yourself."
+            return OLLAMA_FAILURE_LINE
+        finally:
+            self._pending -= 1
+            elapsed = time.perf_counter() - started
+            if outcome in ("ok", "empty"):
+                self.breaker.record_success(elapsed / max(1, items))
+            else:
+                self.breaker.record_failure()
+            _PROVIDER_SECONDS.labels("ollama", outcome).observe(elapsed)
+            tracing.record("llm", elapsed)
+
+    async def _read_first_sentence(self, resp) -> str:
+        buf = ""
+        async for raw in resp.content:  # one JSON object per line
+            if not raw.strip():
+                continue
+            chunk = json.loads(raw)
+            buf += chunk.get("response") or ""
+            done = bool(chunk.get("done"))
+            line = self._first_sentence(buf, self.max_chars, final=done)
+            if line is not None:
+                if not done:
+                    # Drop the connection (not back to the pool) so the server stops generating
+                    resp.close()
+                    logger.debug("AI stream cut off after %d chars", len(buf))
+                return line
+        return buf.strip()
+
+    @staticmethod
+    def _first_sentence(buf: str, max_chars: int, *, final: bool = False) -> Optional[str]:
+        """The first complete sentence of buf, buf cut at max_chars, or None if more tokens are needed."""
+        text = buf.lstrip().lstrip('"')
+        for m in _SENTENCE_END.finditer(text):
+            if m.end() > max_chars:
+                break
+            if m.end() >= 15:  # skip "Dr." / "Hey." style openers
+                return text[:m.end()].strip().strip('"')
+        if len(text) >= max_chars:
+            cut = text[:max_chars]
+            if " " in cut:
+                cut = cut[:cut.rfind(" ")]
+            return cut.rstrip(",;:- ") + "."
+        if final:
+            return text.strip().strip('"')
+        return None
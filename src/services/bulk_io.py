@@ -0,0 +1,251 @@
+# src/services/bulk_io.py
+"""
+Streaming bulk import/export of reminders as JSONL or CSV.
+
+Record fields: user_id, time (HH:MM, 24h, the user's local time), label, persona,
+and optionally timezone (IANA name; applies to the user). CSV needs a header row
+with those column names; `time_hhmm` is accepted for `time`.
+
+- import_reminders() reads the file lazily, validates each record and writes
+  chunks of chunk_size rows, one transaction per chunk. Memory use is O(chunk_size).
+- export_reminders() streams rows off one read cursor straight into the file.
+
+A running bot does not see imported rows until its schedule index reloads
+(`!schedcheck`, or a restart).
+
+    python -m src.services.bulk_io import reminders.jsonl
+    python -m src.services.bulk_io export backup.csv --format csv
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import logging
+import sys
+import time
+from typing import Callable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+from src.services.reminders_manager import RemindersManager
+from src.utils.timezones import get_tz, is_valid_timezone
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("user_id", "time", "label", "persona", "timezone")
+FORMATS = ("jsonl", "csv")
+
+# (user_id, time_hhmm, label, persona, timezone or None)
+BulkRow = Tuple[str, str, str, str, Optional[str]]
+Progress = Callable[[int, int, int], None]     # (records read, imported, rejected)
+
+
+class ImportReport(NamedTuple):
+    read: int
+    imported: int
+    skipped: int                 # valid but already present (skip_existing)
+    rejected: int
+    errors: List[str]            # the first max_errors problems, "line N: reason"
+    elapsed: float
+
+
+def guess_format(path: str) -> str:
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def _records(fp: TextIO, fmt: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yields (line number, record or None, parse error or None), one at a time."""
+    if fmt == "csv":
+        reader = csv.DictReader(fp)
+        for record in reader:
+            yield reader.line_num, record, None
+        return
+    for line_no, line in enumerate(fp, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"invalid JSON ({e.msg})"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "expected a JSON object"
+            continue
+        yield line_no, record, None
+
+
+def _validate(record: dict) -> Tuple[Optional[BulkRow], Optional[str]]:
+    user_id = str(record.get("user_id") or "").strip()
+    label = str(record.get("label") or "").strip()
+    persona = str(record.get("persona") or "").strip()
+    if not user_id or not label or not persona:
+        return None, "user_id, label and persona are required"
+    t = RemindersManager._validate_time_hhmm(str(record.get("time") or record.get("time_hhmm") or ""))
+    if not t:
+        return None, "time must be HH:MM (24h)"
+    tz_name = str(record.get("timezone") or "").strip() or None
+    if tz_name:
+        if not is_valid_timezone(tz_name):
+            return None, f"unknown timezone {tz_name!r}"
+        tz_name = get_tz(tz_name).zone
+    return (user_id, t, label, persona, tz_name), None
+
+
+async def import_reminders(
+    dao,
+    fp: TextIO,
+    fmt: str = "jsonl",
+    *,
+    chat_id: int = 1,
+    chunk_size: int = 5000,
+    skip_existing: bool = True,
+    progress: Optional[Progress] = None,
+    max_errors: int = 20,
+) -> ImportReport:
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}")
+    started = time.perf_counter()
+    read = imported = valid = rejected = 0
+    errors: List[str] = []
+    chunk: List[BulkRow] = []
+
+    async def write() -> None:
+        # Parsing waits for the write: sqlite3 re-takes the GIL after every row, so
+        # parsing the next chunk alongside it would stall the writer thread
+        nonlocal chunk, imported
+        imported += await dao.bulk_insert_reminders(chunk, chat_id, skip_existing)
+        chunk = []
+        if progress:
+            progress(read, imported, rejected)
+
+    for line_no, record, error in _records(fp, fmt):
+        read += 1
+        row = None
+        if record is not None:
+            row, error = _validate(record)
+        if row is None:
+            rejected += 1
+            if len(errors) < max_errors:
+                errors.append(f"line {line_no}: {error}")
+            continue
+        valid += 1
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            await write()
+    if chunk:
+        await write()
+
+    return ImportReport(read, imported, valid - imported, rejected, errors, time.perf_counter() - started)
+
+
+async def export_reminders(
+    dao,
+    fp: TextIO,
+    fmt: str = "jsonl",
+    *,
+    chat_id: int = 1,
+    batch_size: int = 5000,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Write every active reminder to fp. Returns the number of rows written."""
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}")
+    written = 0
+
+    if fmt == "csv":
+        writer = csv.writer(fp)
+        writer.writerow(FIELDS)
+
+        def write(batch: List[BulkRow]) -> None:
+            writer.writerows((u, t, label, persona, tz or "") for u, t, label, persona, tz in batch)
+    else:
+        def write(batch: List[BulkRow]) -> None:
+            fp.write("".join(
+                json.dumps(dict(zip(FIELDS, row)) if row[4] else dict(zip(FIELDS[:4], row)), ensure_ascii=False) + "\n"
+                for row in batch
+            ))
+
+    def sink(batch: List[BulkRow]) -> None:
+        nonlocal written
+        write(batch)
+        written += len(batch)
+        if progress:
+            progress(written)
+
+    await dao.export_reminders(sink, chat_id=chat_id, batch_size=batch_size)
+    return written
+
+
+# ---------- CLI ----------
+def _open(path: str, mode: str) -> TextIO:
+    if path == "-":
+        return io.TextIOWrapper((sys.stdin if "r" in mode else sys.stdout).buffer, encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+async def _main(args) -> int:
+    from src.dao.reminders_dao import RemindersDAO
+    from src.services.database_manager import DatabaseManager
+    from src.utils.config_loader import ConfigLoader
+
+    config = ConfigLoader()
+    if args.db:
+        config.get_sqlite_db_path = lambda: args.db
+    db = DatabaseManager(config)
+    dao = RemindersDAO(db)
+    fmt = args.format or guess_format(args.path)
+    last = [0.0]
+
+    def report(line: str, force: bool = False) -> None:
+        now = time.monotonic()
+        if force or now - last[0] >= 1.0:
+            last[0] = now
+            print(line, file=sys.stderr, flush=True)
+
+    try:
+        if args.command == "import":
+            with _open(args.path, "r") as fp:
+                result = await import_reminders(
+                    dao, fp, fmt,
+                    chunk_size=args.chunk_size,
+                    skip_existing=not args.allow_duplicates,
+                    progress=lambda r, i, x: report(f"read {r:,}  imported {i:,}  rejected {x:,}"),
+                )
+            for error in result.errors:
+                print(f"rejected {error}", file=sys.stderr)
+            report(
+                f"done: read {result.read:,}, imported {result.imported:,}, skipped {result.skipped:,} existing, "
+                f"rejected {result.rejected:,} in {result.elapsed:.1f}s "
+                f"({result.read / max(result.elapsed, 1e-9):,.0f} rows/s)",
+                force=True,
+            )
+            return 1 if result.rejected and args.strict else 0
+
+        started = time.perf_counter()
+        with _open(args.path, "w") as fp:
+            n = await export_reminders(
+                dao, fp, fmt, batch_size=args.chunk_size, progress=lambda w: report(f"exported {w:,}")
+            )
+        report(f"done: exported {n:,} reminders in {time.perf_counter() - started:.1f}s", force=True)
+        return 0
+    finally:
+        db.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk import/export reminders (JSONL or CSV).")
+    parser.add_argument("command", choices=("import", "export"))
+    parser.add_argument("path", help="file to read/write, or - for stdin/stdout")
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file extension (.csv, else jsonl)")
+    parser.add_argument("--db", help="SQLite file (default: SQLITE_DB_PATH)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="rows per transaction / fetch")
+    parser.add_argument("--allow-duplicates", action="store_true", help="don't skip rows that already exist (faster)")
+    parser.add_argument("--strict", action="store_true", help="exit 1 if any record was rejected")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(message)s")
+    return asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
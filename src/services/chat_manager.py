@@ -1,16 +1,134 @@
 from __future__ import annotations
-from typing import Dict
-from src.utils.types import ChatClient
+import asyncio
+import logging
+import random
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional
+from src.infra import metrics
+from src.utils.types import ChatClient, RateLimitedError
+
+logger = logging.getLogger(__name__)
+
+_QUEUE_WAIT_SECONDS = metrics.histogram(
+    "chat_queue_wait_seconds", "Time a DM spent queued before its send started, excluding retry backoff"
+)
+_RETRY_DELAY_SECONDS = metrics.histogram("chat_retry_delay_seconds", "Backoff scheduled before retrying a rate-limited DM")
+_RATE_LIMITED = metrics.counter("chat_rate_limited_total", "429s from the platform", ("platform",))
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens/second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def pause(self, seconds: float) -> None:
+        """Hold the bucket empty (e.g. after a 429) for `seconds`."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+    def delay(self) -> float:
+        """Seconds until a token is available (0.0 == take one now)."""
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1.0:
+            return 0.0
+        return (1.0 - self._tokens) / self.rate
+
+    def take(self) -> None:
+        self._tokens -= 1.0
+
+    async def acquire(self) -> None:
+        while True:
+            wait = self.delay()
+            if wait <= 0:
+                self.take()
+                return
+            await asyncio.sleep(wait)
+
+
+class _SendJob:
+    __slots__ = ("platform", "user_id", "text", "future", "enqueued_at", "attempt", "retry_delay")
+
+    def __init__(self, platform: str, user_id: str, text: str, future: asyncio.Future):
+        self.platform = platform
+        self.user_id = user_id
+        self.text = text
+        self.future = future
+        self.enqueued_at = time.monotonic()
+        self.attempt = 0
+        self.retry_delay = 0.0      # backoff time so far, kept out of the queue-wait metric
+
 
 class ChatManager:
     """
     Platform-agnostic chat facade (Discord, Slack, etc).
     Register adapters by name and send via the active one.
+
+    Outbound sends go through a scheduler:
+    - bounded queue (send_dm waits when it is full → backpressure on the dispatcher)
+    - token buckets per platform (global limit) and per route (one DM channel);
+      a message whose route bucket is empty waits in that route's line, in
+      order, instead of holding a worker, so one busy DM channel doesn't stall
+      everyone else's DMs
+    - RateLimitedError from an adapter pauses the matching bucket for retry_after
+      and requeues the message with exponential backoff
     """
-    def __init__(self, default: str = "discord"):
+    def __init__(
+        self,
+        default: str = "discord",
+        *,
+        queue_size: int = 1000,
+        workers: int = 4,
+        global_rate: float = 40.0,
+        route_rate: float = 1.0,
+        route_burst: float = 5.0,
+        max_retries: int = 5,
+        max_routes: int = 10_000,
+    ):
         self._default = default
         self._clients: Dict[str, ChatClient] = {}
 
+        self._queue_size = max(1, queue_size)
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._worker_count = max(1, workers)
+        self._global_rate = global_rate
+        self._route_rate = route_rate
+        self._route_burst = route_burst
+        self._max_retries = max_retries
+        self._max_routes = max_routes
+        self._platform_buckets: Dict[str, TokenBucket] = {}
+        self._route_buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._retrying = 0
+        self._parked: Dict[str, Deque[_SendJob]] = {}   # route -> DMs waiting for its bucket, in order
+        self._deferred = 0
+
+        self._counters: Dict[str, float] = {
+            "sent": 0,
+            "failed": 0,
+            "rate_limited": 0,
+            "retries": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "retry_delay_seconds_total": 0.0,
+        }
+        metrics.gauge_callback(
+            "chat_send_queue_depth", "DMs waiting in the send queue", lambda: self._queue.qsize() if self._queue else 0
+        )
+        metrics.gauge_callback("chat_send_retrying", "DMs waiting out a rate-limit backoff", lambda: self._retrying)
+        metrics.gauge_callback(
+            "chat_send_deferred", "DMs parked until their DM channel's bucket refills", lambda: self._deferred
+        )
+
     def register(self, name: str, client: ChatClient) -> None:
         self._clients[name] = client
 
@@ -23,6 +141,159 @@ class ChatManager:
         return self._default
 
     async def send_dm(self, user_id: str, text: str) -> None:
+        """Queue a DM on the active platform and wait until it has been handed to the adapter."""
         if self._default not in self._clients:
             raise RuntimeError("No chat client registered")
-        await self._clients[self._default].send_dm(user_id, text)
+        self._ensure_workers()
+        job = _SendJob(self._default, user_id, text, asyncio.get_running_loop().create_future())
+        await self._queue.put(job)
+        await job.future
+
+    # ---------- observability ----------
+    def stats(self) -> Dict[str, float]:
+        sent = self._counters["sent"]
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_capacity": self._queue_size,
+            "retrying": self._retrying,
+            "deferred": self._deferred,
+            "sent": sent,
+            "failed": self._counters["failed"],
+            "rate_limited": self._counters["rate_limited"],
+            "retries": self._counters["retries"],
+            "wait_avg_seconds": round(self._counters["wait_seconds_total"] / sent, 4) if sent else 0.0,
+            "wait_max_seconds": round(self._counters["wait_seconds_max"], 4),
+            "retry_delay_seconds_total": round(self._counters["retry_delay_seconds_total"], 4),
+        }
+
+    async def close(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    # ---------- scheduler internals ----------
+    def _ensure_workers(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self._queue_size)
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker(), name=f"chat-send-{i}") for i in range(self._worker_count)
+            ]
+
+    def _platform_bucket(self, platform: str) -> TokenBucket:
+        bucket = self._platform_buckets.get(platform)
+        if bucket is None:
+            bucket = self._platform_buckets[platform] = TokenBucket(self._global_rate, self._global_rate)
+        return bucket
+
+    def _route_bucket(self, route: str) -> TokenBucket:
+        bucket = self._route_buckets.get(route)
+        if bucket is None:
+            bucket = self._route_buckets[route] = TokenBucket(self._route_rate, self._route_burst)
+            while len(self._route_buckets) > self._max_routes:
+                self._route_buckets.popitem(last=False)
+        else:
+            self._route_buckets.move_to_end(route)
+        return bucket
+
+    async def _worker(self) -> None:
+        while True:
+            job: _SendJob = await self._queue.get()
+            try:
+                await self._deliver(job)
+            except asyncio.CancelledError:
+                if not job.future.done():
+                    job.future.cancel()
+                raise
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, job: _SendJob) -> None:
+        route = f"{job.platform}:dm:{job.user_id}"
+        line = self._parked.get(route)
+        if job.future.done():  # caller went away
+            if line and line[0] is job:
+                self._next_in_line(route, line)
+            return
+        platform_bucket = self._platform_bucket(job.platform)
+        route_bucket = self._route_bucket(route)
+
+        # DMs to one channel go out in order: wait behind the ones already parked
+        if line is not None and line[0] is not job:
+            line.append(job)
+            self._deferred += 1
+            return
+        # Take from the route bucket first so one chatty user doesn't drain the global budget.
+        # If it is empty, park the message and free the worker for other users' DMs.
+        route_wait = route_bucket.delay()
+        if route_wait > 0:
+            if line is None:
+                self._parked[route] = deque([job])
+                self._deferred += 1
+            asyncio.get_running_loop().call_later(route_wait, self._unpark, route)
+            return
+        route_bucket.take()
+        if line is not None:
+            self._next_in_line(route, line)
+        await platform_bucket.acquire()
+
+        waited = time.monotonic() - job.enqueued_at - job.retry_delay
+        _QUEUE_WAIT_SECONDS.observe(waited)
+        try:
+            await self._clients[job.platform].send_dm(job.user_id, job.text)
+        except RateLimitedError as e:
+            self._counters["rate_limited"] += 1
+            _RATE_LIMITED.labels(job.platform).inc()
+            (platform_bucket if e.is_global else route_bucket).pause(e.retry_after)
+            if job.attempt >= self._max_retries:
+                self._counters["failed"] += 1
+                if not job.future.done():
+                    job.future.set_exception(e)
+                return
+            job.attempt += 1
+            backoff = max(e.retry_after, 0.5 * 2 ** job.attempt) * (1 + random.random() * 0.1)
+            logger.warning("ChatManager: 429 on %s, retry %d in %.2fs", route, job.attempt, backoff)
+            self._counters["retries"] += 1
+            self._counters["retry_delay_seconds_total"] += backoff
+            _RETRY_DELAY_SECONDS.observe(backoff)
+            job.retry_delay += backoff
+            self._retrying += 1
+            asyncio.get_running_loop().call_later(backoff, self._retry, job)
+            return
+        except Exception as e:
+            self._counters["failed"] += 1
+            if not job.future.done():
+                job.future.set_exception(e)
+            return
+
+        self._counters["sent"] += 1
+        self._counters["wait_seconds_total"] += waited
+        self._counters["wait_seconds_max"] = max(self._counters["wait_seconds_max"], waited)
+        if not job.future.done():
+            job.future.set_result(None)
+
+    def _next_in_line(self, route: str, line: Deque[_SendJob]) -> None:
+        """The head of a route's line got its token (or was cancelled); wake the next one when the bucket refills."""
+        line.popleft()
+        self._deferred -= 1
+        if line:
+            asyncio.get_running_loop().call_later(self._route_bucket(route).delay(), self._unpark, route)
+        else:
+            del self._parked[route]
+
+    def _unpark(self, route: str) -> None:
+        line = self._parked.get(route)
+        if line:
+            self._requeue(line[0])      # stays at the head of the line until it is delivered
+
+    def _retry(self, job: _SendJob) -> None:
+        self._retrying -= 1
+        self._requeue(job)
+
+    def _requeue(self, job: _SendJob) -> None:
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            # Retries must not be dropped; wait for room like any other producer
+            asyncio.get_running_loop().create_task(self._queue.put(job))
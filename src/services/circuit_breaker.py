@@ -0,0 +1,104 @@
+# src/services/circuit_breaker.py
+from __future__ import annotations
+
+import logging
+import time
+from typing import Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# For the ai_breaker_state gauge
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one upstream (the model server).
+
+    - closed: calls go through; failure_threshold failures in a row open it.
+      A call slower than slow_call_seconds counts as a failure, even if it succeeded.
+    - open: allow() is False (callers use their fallback) for reset_seconds
+    - half_open: after reset_seconds, up to half_open_probes calls are let through;
+      a success closes the breaker, a failure re-opens it for another reset_seconds
+
+    Not thread-safe; meant for one event loop. Every allow() that returned True
+    must be followed by exactly one record_success() / record_failure().
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int = 5,
+        slow_call_seconds: float = 5.0,
+        reset_seconds: float = 30.0,
+        half_open_probes: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_seconds = reset_seconds
+        self.half_open_probes = max(1, half_open_probes)
+        self._clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._counters: Dict[str, int] = {"opened": 0, "rejected": 0, "failures": 0, "slow": 0}
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_seconds:
+            return HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN:
+            if self._state == OPEN:
+                self._state = HALF_OPEN
+                self._probes = 0
+                logger.info("CircuitBreaker[%s]: half-open, probing", self.name)
+            if self._probes < self.half_open_probes:
+                self._probes += 1
+                return True
+        self._counters["rejected"] += 1
+        return False
+
+    def record_success(self, seconds: float = 0.0) -> None:
+        if self.slow_call_seconds and seconds > self.slow_call_seconds:
+            self._counters["slow"] += 1
+            self.record_failure()
+            return
+        if self._state == HALF_OPEN:
+            logger.info("CircuitBreaker[%s]: probe succeeded, closed", self.name)
+        self._state = CLOSED
+        self._failures = 0
+        self._probes = 0
+
+    def record_failure(self) -> None:
+        self._counters["failures"] += 1
+        self._failures += 1
+        if self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self.failure_threshold):
+            self._open()
+
+    def _open(self) -> None:
+        if self._state != HALF_OPEN:
+            logger.warning(
+                "CircuitBreaker[%s]: opened after %d consecutive failures; retrying in %.0fs",
+                self.name, self._failures, self.reset_seconds,
+            )
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._probes = 0
+        self._counters["opened"] += 1
+
+    def stats(self) -> Dict[str, object]:
+        return {**self._counters, "state": self.state, "consecutive_failures": self._failures}
@@ -1,70 +1,223 @@
 # src/services/database_manager.py
-import os, sqlite3, threading, logging
+import asyncio, queue, sqlite3, threading, time, logging
+from concurrent.futures import Future
 from pathlib import Path
+from typing import Any, Callable, Dict, List
+from src.database.migrations import LATEST_VERSION, check_query_plans, migrate, schema_version
+from src.infra import metrics, tracing
+from src.infra.startup import STARTUP
+from src.services.shard_leases import shard_of
 from src.utils.config_loader import ConfigLoader
 
 logger = logging.getLogger(__name__)
 
+_STOP = object()
+
+_QUERY_SECONDS = metrics.histogram(
+    "db_query_seconds", "SQLite unit of work latency as seen by the caller (queueing included)", ("method", "kind")
+)
+
+
+def _method_of(fn) -> str:
+    # "RemindersDAO.list_reminders.<locals>.work" -> "RemindersDAO.list_reminders"
+    return getattr(fn, "__qualname__", "unknown").split(".<locals>", 1)[0]
+
+
 class DatabaseManager:
+    """
+    SQLite access with one serialized writer and a small read-only pool.
+
+    - run_write(fn): fn(conn) is one unit of work on the dedicated writer thread.
+      Units that arrive within group_commit_ms share a single transaction (one
+      fsync); each runs under its own SAVEPOINT, so a failing unit is rolled back
+      alone and only its caller sees the error. Writes never race.
+    - run_read(fn): fn(conn) runs in a worker thread on a checked-out read-only
+      connection; WAL lets readers proceed while the writer commits.
+    - execute(fn): blocking run_write for startup code and scripts.
+    """
+
     def __init__(self, config: ConfigLoader):
         self._path = config.get_sqlite_db_path()
         Path(self._path).parent.mkdir(parents=True, exist_ok=True)
 
-        self._conn = sqlite3.connect(self._path, check_same_thread=False)
-        self._conn.row_factory = sqlite3.Row
-        self._lock = threading.Lock()
+        self._readers_count = _cfg(config, "get_sqlite_readers", 4)
+        self._pragmas = {
+            "busy_timeout": _cfg(config, "get_sqlite_busy_timeout_ms", 5000),
+            "synchronous": _cfg(config, "get_sqlite_synchronous", "NORMAL"),
+            "cache_size": -_cfg(config, "get_sqlite_cache_size_kb", 20_000),  # negative == KiB
+            "mmap_size": _cfg(config, "get_sqlite_mmap_size_mb", 256) * 1024 * 1024,
+            "temp_store": "MEMORY",
+        }
+
+        self._group_window = _cfg(config, "get_sqlite_group_commit_ms", 2) / 1000.0
+        self._group_max = _cfg(config, "get_sqlite_group_commit_max", 128)
+        self._write_stats: Dict[str, int] = {"units": 0, "commits": 0, "failed_units": 0, "max_group": 0}
+
+        self._conn = self._connect()
+        self._conn.isolation_level = None  # explicit BEGIN/COMMIT on the writer (group commit)
 
         with self._conn:
             self._conn.execute("PRAGMA foreign_keys = ON;")
             self._conn.execute("PRAGMA journal_mode = WAL;")
 
-        self._apply_schema()
+        with STARTUP.phase("schema"):
+            self._apply_schema()
+
+        # Writer thread owns self._conn from here on
+        self._writes: "queue.Queue" = queue.Queue()
+        self._writer = threading.Thread(target=self._writer_loop, name="sqlite-writer", daemon=True)
+        self._writer.start()
 
-        logger.info("SQLite ready at %s", self._path)
+        # Read-only pool
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._all_readers: List[sqlite3.Connection] = []
+        for _ in range(self._readers_count):
+            conn = self._connect(read_only=True)
+            self._readers.put(conn)
+            self._all_readers.append(conn)
+
+        metrics.gauge_callback(
+            "db_write_queue_depth", "Units of work waiting for the SQLite writer", self._writes.qsize
+        )
+        logger.info("SQLite ready at %s (1 writer, %d readers)", self._path, self._readers_count)
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        if read_only:
+            uri = Path(self._path).resolve().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self._path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for name, value in self._pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value};")
+        # Lets queries filter rows by shard before LIMIT (see OutboxDAO.due)
+        conn.create_function("shard_of", 2, shard_of, deterministic=True)
+        return conn
 
     def _apply_schema(self) -> None:
-        # 1) explicit env override
-        schema_env = os.getenv("SCHEMA_PATH")
-        tried = []
-
-        if schema_env:
-            p = Path(schema_env)
-            if not p.is_absolute():
-                p = Path.cwd() / p
-            tried.append(str(p))
-            if p.is_file():
-                ddl = p.read_text(encoding="utf-8")
-                with self._conn:
-                    self._conn.executescript(ddl)
-                logger.info("✅ Loaded schema from %s", p)
-                return
-
-        # 2) project_root/database/schema.sql
-        project_root = Path(__file__).resolve().parents[2]
-        candidate = project_root / "database" / "schema.sql"
-        tried.append(str(candidate))
-        if candidate.is_file():
-            ddl = candidate.read_text(encoding="utf-8")
-            with self._conn:
-                self._conn.executescript(ddl)
-            logger.info("✅ Loaded schema from %s", candidate)
+        version = schema_version(self._conn)
+        applied = migrate(self._conn)
+        if not applied:
+            logger.info("Schema current (v%d), skipping migrations", version)
             return
+        logger.info("✅ Schema migrated v%d → v%d", version, LATEST_VERSION)
+        for problem in check_query_plans(self._conn):
+            logger.warning("Hot query scans a table or index: %s", problem)
+
+    # ---------- writer ----------
+    def _writer_loop(self) -> None:
+        while True:
+            item = self._writes.get()
+            if item is _STOP:
+                break
+            group = [item]
+            stop = False
+            deadline = time.monotonic() + self._group_window
+            while len(group) < self._group_max:
+                try:
+                    nxt = self._writes.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    stop = True
+                    break
+                group.append(nxt)
+            self._commit_group(group)
+            if stop:
+                break
 
-        # 3) fallback: alongside this module
-        fallback = Path(__file__).resolve().with_name("schema.sql")
-        tried.append(str(fallback))
-        if fallback.is_file():
-            ddl = fallback.read_text(encoding="utf-8")
-            with self._conn:
-                self._conn.executescript(ddl)
-            logger.info("✅ Loaded schema from %s", fallback)
+    def _commit_group(self, group) -> None:
+        conn = self._conn
+        outcomes = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for fn, fut in group:
+                if not fut.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT unit")
+                try:
+                    result = fn(conn)
+                except BaseException as e:
+                    conn.execute("ROLLBACK TO unit")
+                    conn.execute("RELEASE unit")
+                    outcomes.append((fut, False, e))
+                else:
+                    conn.execute("RELEASE unit")
+                    outcomes.append((fut, True, result))
+            conn.execute("COMMIT")
+        except BaseException as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for fn, fut in group:
+                if not fut.done():
+                    fut.set_exception(e)
+            logger.exception("SQLite group commit of %d units failed: %s", len(group), e)
             return
 
-        raise FileNotFoundError(f"schema.sql not found. Tried: {tried}")
+        stats = self._write_stats
+        stats["commits"] += 1
+        stats["units"] += len(outcomes)
+        stats["max_group"] = max(stats["max_group"], len(outcomes))
+        for fut, ok, value in outcomes:
+            if ok:
+                fut.set_result(value)
+            else:
+                stats["failed_units"] += 1
+                fut.set_exception(value)
 
-    def connection(self) -> sqlite3.Connection:
-        return self._conn
+    def submit_write(self, fn: Callable[[sqlite3.Connection], Any]) -> Future:
+        fut: Future = Future()
+        self._writes.put((fn, fut))
+        return fut
+
+    async def run_write(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        started = time.perf_counter()
+        try:
+            return await asyncio.wrap_future(self.submit_write(fn))
+        finally:
+            elapsed = time.perf_counter() - started
+            method = _method_of(fn)
+            _QUERY_SECONDS.labels(method, "write").observe(elapsed)
+            tracing.record(f"db:{method}", elapsed)
 
     def execute(self, fn):
-        with self._lock:
-            return fn(self._conn)
+        return self.submit_write(fn).result()
+
+    def write_stats(self) -> Dict[str, int]:
+        """Units of work vs commits: units/commits is the average group-commit size."""
+        return dict(self._write_stats, queued=self._writes.qsize())
+
+    # ---------- readers ----------
+    def _read_sync(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        conn = self._readers.get()
+        try:
+            return fn(conn)
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    async def run_read(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        started = time.perf_counter()
+        try:
+            return await asyncio.to_thread(self._read_sync, fn)
+        finally:
+            elapsed = time.perf_counter() - started
+            method = _method_of(fn)
+            _QUERY_SECONDS.labels(method, "read").observe(elapsed)
+            tracing.record(f"db:{method}", elapsed)
+
+    # ---------- lifecycle ----------
+    def close(self) -> None:
+        self._writes.put(_STOP)
+        self._writer.join(timeout=5)
+        for conn in self._all_readers:
+            conn.close()
+        self._conn.close()
+        logger.info("SQLite closed at %s", self._path)
+
+
+def _cfg(config, getter: str, default):
+    # Tuning knobs are optional so lightweight configs (benchmarks, scripts) still work
+    fn = getattr(config, getter, None)
+    return fn() if fn else default
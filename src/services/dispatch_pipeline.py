@@ -0,0 +1,268 @@
+# src/services/dispatch_pipeline.py
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from src.infra.tracing import span
+from src.services.prerender import PrerenderStore, stage_key
+
+logger = logging.getLogger(__name__)
+
+NameResolver = Callable[[str], Awaitable[Optional[str]]]
+
+
+class DueReminder(NamedTuple):
+    """One claimed fire, as returned by RemindersManager.take_due."""
+    user_id: str
+    persona: str
+    label: str
+    send_at: datetime       # UTC
+    reminder_id: int = 0
+
+
+class DispatchResult(NamedTuple):
+    user_id: str
+    label: str
+    sent: bool
+    fallback: bool          # True if the model didn't write the text (deadline missed, failed or shed)
+    lateness: float         # seconds between send_at and the send completing
+    error: Optional[str] = None
+    reminder_id: int = 0
+
+
+class DispatchReport(NamedTuple):
+    results: List[DispatchResult]
+    elapsed: float
+
+    @property
+    def sent(self) -> int:
+        return sum(1 for r in self.results if r.sent)
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for r in self.results if not r.sent)
+
+    @property
+    def fallbacks(self) -> int:
+        return sum(1 for r in self.results if r.fallback)
+
+    @property
+    def max_lateness(self) -> float:
+        return max((r.lateness for r in self.results), default=0.0)
+
+
+class DispatchPipeline:
+    """
+    Bounded fan-out for one dispatcher tick.
+
+    - Each due reminder goes through lookup → render → send under a shared semaphore
+    - Each render gets render_budget_seconds past its reminder's due time (or
+      past now, for a reminder that is already late), capped by the tick
+      deadline; late ones use the deterministic fallback line so the DM still
+      goes out on time
+    - With a PrerenderStore, staged text is sent as-is. Reminders the lookahead
+      didn't stage (catch-up fires, reminders created moments before they are
+      due, degraded DB mode) are rendered here like everything else is without one
+    - With batch_size > 1, those renders are grouped by persona into
+      multi-item prompts; staged reminders are sent without waiting for them
+    - With an Outbox, sends go through it: failures are retried later from
+      SQLite instead of being lost; the run holds its rows so the outbox's
+      retry worker leaves them alone however long the tick takes
+    - Returns a DispatchReport with per-reminder lateness
+    """
+
+    def __init__(
+        self,
+        manager,
+        chat,
+        resolve_name: Optional[NameResolver] = None,
+        *,
+        concurrency: int = 16,
+        deadline_seconds: float = 45.0,
+        render_budget_seconds: float = 5.0,
+        store: Optional[PrerenderStore] = None,
+        batch_size: int = 1,
+        outbox=None,
+    ):
+        self.manager = manager
+        self.chat = chat
+        self.resolve_name = resolve_name
+        self.concurrency = max(1, concurrency)
+        self.deadline_seconds = deadline_seconds
+        self.render_budget_seconds = render_budget_seconds
+        self.store = store
+        self.batch_size = max(1, batch_size)
+        self.outbox = outbox
+
+    async def run(self, due: List[DueReminder]) -> DispatchReport:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + self.deadline_seconds
+        sem = asyncio.Semaphore(self.concurrency)
+
+        staged: List[Optional[Tuple[str, bool]]] = [None] * len(due)
+        if self.store is not None:
+            for i, item in enumerate(due):
+                staged[i] = self.store.pop(stage_key(item.send_at, item.user_id, item.persona, item.label))
+        misses = [i for i, hit in enumerate(staged) if hit is None]
+        results: List[Optional[DispatchResult]] = [None] * len(due)
+
+        async def send(i: int, text: Optional[Tuple[str, bool]]) -> None:
+            results[i] = await self._dispatch_one(due[i], sem, deadline, text)
+
+        async def render_misses_then_send() -> None:
+            rendered = await self._render_batched([due[i] for i in misses], sem, deadline)
+            await asyncio.gather(*(send(i, r) for i, r in zip(misses, rendered)))
+
+        held = contextlib.nullcontext()
+        if self.outbox is not None:
+            held = self.outbox.holding([self._outbox_key(item) for item in due if item.reminder_id])
+        async with held:
+            if self.batch_size > 1 and misses:
+                # Misses render in persona batches while the staged reminders go out
+                await asyncio.gather(
+                    *(send(i, hit) for i, hit in enumerate(staged) if hit is not None), render_misses_then_send()
+                )
+            else:
+                # Misses render one at a time inside _dispatch_one
+                await asyncio.gather(*(send(i, hit) for i, hit in enumerate(staged)))
+        if self.outbox is not None:
+            await self.outbox.flush()
+        report = DispatchReport(results, loop.time() - started)
+
+        for r in report.results:
+            logger.debug(
+                "Dispatch %s/%s sent=%s fallback=%s lateness=%.2fs%s",
+                r.user_id, r.label, r.sent, r.fallback, r.lateness, f" error={r.error}" if r.error else "",
+            )
+        logger.info(
+            "Dispatched %d reminders in %.2fs (sent=%d failed=%d fallback=%d max_lateness=%.2fs)",
+            len(report.results), report.elapsed, report.sent, report.failed, report.fallbacks, report.max_lateness,
+        )
+        return report
+
+    @staticmethod
+    def _outbox_key(item: DueReminder) -> Tuple[int, int]:
+        """(reminder_id, fire_minute): the outbox row take_due enqueued for this fire."""
+        return item.reminder_id, int(item.send_at.timestamp()) // 60
+
+    def _render_deadline(self, send_at: datetime, tick_deadline: float) -> float:
+        """Loop-time deadline for rendering a reminder due at send_at."""
+        due_in = max(0.0, send_at.timestamp() - time.time())
+        return min(tick_deadline, asyncio.get_running_loop().time() + due_in + self.render_budget_seconds)
+
+    async def _render_batched(
+        self, due: List[DueReminder], sem: asyncio.Semaphore, deadline: float
+    ) -> List[Optional[Tuple[str, bool]]]:
+        """Render every due reminder via persona-grouped batches. Returns [(text, fallback), ...]."""
+        loop = asyncio.get_running_loop()
+
+        async def name_of(user_id: str) -> Optional[str]:
+            async with sem:
+                return await self._lookup_name(user_id)
+
+        names = await asyncio.gather(*(name_of(item.user_id) for item in due))
+
+        by_persona: Dict[str, List[int]] = {}
+        for i, item in enumerate(due):
+            by_persona.setdefault(item.persona, []).append(i)
+        chunks = [
+            idxs[j:j + self.batch_size]
+            for idxs in by_persona.values()
+            for j in range(0, len(idxs), self.batch_size)
+        ]
+
+        out: List[Optional[Tuple[str, bool]]] = [None] * len(due)
+
+        async def render(chunk: List[int]) -> None:
+            texts: Optional[List[Tuple[str, bool]]] = None
+            async with sem:
+                chunk_deadline = min(self._render_deadline(due[i].send_at, deadline) for i in chunk)
+                remaining = chunk_deadline - loop.time()
+                if remaining > 0:
+                    try:
+                        with span("render_batch"):
+                            texts = await asyncio.wait_for(
+                                self.manager.render_batch([(due[i].persona, due[i].label, names[i]) for i in chunk]),
+                                timeout=remaining,
+                            )
+                    except asyncio.TimeoutError:
+                        logger.warning("Batch render of %d %s reminders missed the render deadline", len(chunk), due[chunk[0]].persona)
+                    except Exception as e:
+                        logger.exception("Batch render of %d reminders failed; using fallback: %s", len(chunk), e)
+            for pos, i in enumerate(chunk):
+                if texts is not None:
+                    out[i] = texts[pos]
+                else:
+                    out[i] = (self.manager.ai.fallback_line(due[i].persona, due[i].label, user_name=names[i]), True)
+
+        await asyncio.gather(*(render(c) for c in chunks))
+        return out
+
+    async def _dispatch_one(
+        self,
+        item: DueReminder,
+        sem: asyncio.Semaphore,
+        deadline: float,
+        staged: Optional[Tuple[str, bool]] = None,
+    ) -> DispatchResult:
+        user_id, persona, label, send_at, reminder_id = item
+        loop = asyncio.get_running_loop()
+        fallback = False
+        async with sem:
+            try:
+                text: Optional[str] = None
+                if staged is not None:
+                    text, fallback = staged
+                user_name = None if text is not None else await self._lookup_name(user_id)
+
+                # Nothing staged or batch-rendered: render now, within this reminder's budget
+                remaining = self._render_deadline(send_at, deadline) - loop.time()
+                if text is None and remaining > 0:
+                    try:
+                        with span("render"):
+                            text, fallback = await asyncio.wait_for(
+                                self.manager.render_message(persona, label, user_name=user_name),
+                                timeout=remaining,
+                            )
+                    except asyncio.TimeoutError:
+                        logger.warning("Render for %s/%s missed the render deadline; using fallback", user_id, label)
+                    except Exception as e:
+                        logger.exception("Render for %s/%s failed; using fallback: %s", user_id, label, e)
+                if text is None:
+                    fallback = True
+                    text = self.manager.ai.fallback_line(persona, label, user_name=user_name)
+
+                delay = send_at.timestamp() - time.time()  # usually <= 0
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                with span("send"):
+                    if self.outbox is not None and reminder_id:
+                        await self.outbox.deliver(self._outbox_key(item), user_id, text)
+                    else:
+                        await self.chat.send_dm(user_id, text)
+                return DispatchResult(
+                    user_id, label, True, fallback, time.time() - send_at.timestamp(), reminder_id=reminder_id
+                )
+
+            except Exception as e:
+                logger.exception("Dispatch to %s failed: %s", user_id, e)
+                return DispatchResult(
+                    user_id, label, False, fallback, time.time() - send_at.timestamp(), f"{type(e).__name__}: {e}",
+                    reminder_id=reminder_id,
+                )
+
+    async def _lookup_name(self, user_id: str) -> Optional[str]:
+        # Optional username enrichment
+        if not self.resolve_name:
+            return None
+        try:
+            with span("lookup"):
+                return await self.resolve_name(user_id)
+        except Exception:
+            return None
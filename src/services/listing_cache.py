@@ -0,0 +1,66 @@
+# src/services/listing_cache.py
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# (time_hhmm, label, persona), as returned by RemindersDAO.list_reminders
+ListingRow = Tuple[str, str, str]
+
+
+class ListingCache:
+    """
+    Per-user cache of `!l` results (RemindersManager.list_reminders).
+
+    - create/delete/import for a user call invalidate(user_id); everything else is a read
+    - invalidate() bumps the user's generation: a reader takes generation() before
+      querying and passes it to put(), which drops rows an edit made stale meanwhile
+    - entries also expire after ttl_seconds, which bounds staleness when another
+      process (sharded deployment) changed the user's reminders
+    - least-recently-used users are evicted past max_size
+    """
+
+    def __init__(self, *, max_size: int = 5000, ttl_seconds: float = 300.0):
+        self.max_size = max(1, max_size)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, List[ListingRow]]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._counters: Dict[str, int] = {
+            "hits": 0, "misses": 0, "invalidations": 0, "evictions": 0, "stale_puts": 0,
+        }
+
+    def get(self, user_id: str) -> Optional[List[ListingRow]]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[user_id]
+            self._counters["misses"] += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self._counters["hits"] += 1
+        return entry[1]
+
+    def generation(self, user_id: str) -> int:
+        return self._generations.get(user_id, 0)
+
+    def put(self, user_id: str, rows: List[ListingRow], generation: Optional[int] = None) -> None:
+        if generation is not None and generation != self.generation(user_id):
+            self._counters["stale_puts"] += 1
+            return
+        self._entries[user_id] = (time.monotonic() + self.ttl_seconds, rows)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def invalidate(self, user_id: str) -> None:
+        self._generations[user_id] = self.generation(user_id) + 1
+        if self._entries.pop(user_id, None) is not None:
+            self._counters["invalidations"] += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._counters, "size": len(self._entries)}
@@ -0,0 +1,265 @@
+# src/services/outbox.py
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import random
+import time
+from typing import AsyncIterator, Callable, Collection, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from src.dao.outbox_dao import OutboxRow
+from src.infra import metrics
+from src.utils.types import RateLimitedError, UndeliverableError
+
+logger = logging.getLogger(__name__)
+
+# event: delivered, retried (first attempt or retry failed, rescheduled), abandoned (out of attempts),
+# expired (too old to still be useful), undeliverable (platform refused the user)
+_EVENTS = metrics.counter("outbox_events_total", "Outbox deliveries by outcome", ("event",))
+
+OutboxKey = Tuple[int, int]     # (reminder_id, fire_minute)
+
+
+class Outbox:
+    """
+    Durable delivery for claimed reminders, on top of OutboxDAO.
+
+    - take_due enqueues every claimed fire (unrendered) in the claim transaction
+      and holds it for hold_seconds; the dispatch pipeline renders it and makes
+      the first attempt through deliver(), inside holding(), which keeps drain()
+      off those rows and extends the hold for as long as the tick runs
+    - a delivered row is deleted right after its send (group commit batches the
+      deletes); a crash in between re-sends that DM: at-least-once, never lost
+    - a failed attempt stores the rendered text and is retried by drain() with
+      exponential backoff, up to max_attempts; rows older than max_age_seconds
+      are dropped instead of delivering a stale reminder
+    - UndeliverableError (DMs closed, user gone) records the user in
+      undeliverable_users; take_due skips them until they use the bot again
+    - load() at startup releases rows held by a run that died, so drain()
+      resumes them right away
+    """
+
+    def __init__(
+        self,
+        dao,
+        chat,
+        *,
+        chat_id: int = 1,
+        workers: int = 4,
+        batch_size: int = 200,
+        max_attempts: int = 6,
+        backoff_seconds: float = 30.0,
+        max_backoff_seconds: float = 1800.0,
+        max_age_seconds: float = 3600.0,
+        hold_seconds: float = 120.0,
+        fallback: Optional[Callable[[str, str], str]] = None,
+    ):
+        self.dao = dao
+        self.chat = chat
+        self.chat_id = chat_id
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.max_age_seconds = max_age_seconds
+        self.hold_seconds = hold_seconds
+        self.fallback = fallback or (lambda persona, label: f"Remember to {label}.")
+        # Wired up by RemindersManager: shard ownership and the "sent" ack for retried deliveries
+        self.shard_count = 1
+        self.owned_shards: Callable[[], FrozenSet[int]] = lambda: frozenset({0})
+        self.on_delivered: Optional[Callable[[str, int], None]] = None
+
+        self.blocked: Set[str] = set()
+        self._held: Set[OutboxKey] = set()          # rows a dispatch run or a send in progress owns
+        self._delivered: List[OutboxKey] = []       # sent, but deleting the row failed; retried by flush()
+        self._counters: Dict[str, int] = {
+            "delivered": 0, "retried": 0, "abandoned": 0, "expired": 0, "undeliverable": 0,
+        }
+
+    # ---------- lifecycle ----------
+    async def load(self, *, release: bool = True) -> int:
+        """
+        Load the undeliverable users and, with release, make rows held by a
+        previous process due now. Returns the number of rows released.
+        """
+        self.blocked = await self.dao.undeliverable_users(self.chat_id)
+        released = await self.dao.release(self.chat_id) if release else 0
+        logger.info("Outbox: %d undeliverable users, %d undelivered reminders resumed", len(self.blocked), released)
+        return released
+
+    def is_blocked(self, user_id: str) -> bool:
+        return user_id in self.blocked
+
+    async def unblock(self, user_id: str) -> None:
+        """The user is talking to the bot again, so DMs may work: stop skipping them."""
+        if user_id in self.blocked:
+            self.blocked.discard(user_id)
+            await self.dao.clear_undeliverable(user_id, self.chat_id)
+            logger.info("Outbox: user %s is deliverable again", user_id)
+
+    # ---------- delivery ----------
+    @contextlib.asynccontextmanager
+    async def holding(self, keys: Collection[OutboxKey]) -> AsyncIterator[None]:
+        """
+        For one dispatch run: drain() skips these rows, and their hold in SQLite is
+        extended every hold_seconds / 2 until the run ends, so a tick that outlasts
+        the hold isn't retried (and sent twice) behind its back.
+        """
+        keys = set(keys)
+        self._held |= keys
+        renew = asyncio.create_task(self._renew_hold(keys)) if keys else None
+        try:
+            yield
+        finally:
+            if renew is not None:
+                renew.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await renew
+            self._held -= keys
+
+    async def deliver(self, key: OutboxKey, user_id: str, text: str, attempts: int = 0) -> None:
+        """
+        One delivery attempt for an outbox row. Raises whatever the send raised,
+        after scheduling the retry or recording the user as undeliverable.
+        """
+        self._held.add(key)
+        try:
+            try:
+                await self.chat.send_dm(user_id, text)
+            except UndeliverableError as e:
+                await self._undeliverable(user_id, e.reason)
+                raise
+            except Exception as e:
+                await self._retry_later(key, text, attempts + 1, e)
+                raise
+            self._count("delivered")
+            try:
+                await self.dao.delete([key])
+            except Exception:
+                self._delivered.append(key)
+                logger.exception("Outbox: deleting delivered reminder %s failed; will retry", key)
+        finally:
+            self._held.discard(key)
+
+    async def flush(self) -> int:
+        """Delete rows whose post-send delete failed, in one transaction. Returns the number deleted."""
+        keys, self._delivered = self._delivered, []
+        if not keys:
+            return 0
+        try:
+            return await self.dao.delete(keys)
+        except Exception:
+            self._delivered[:0] = keys
+            logger.exception("Outbox: deleting %d delivered rows failed; will retry", len(keys))
+            return 0
+
+    async def drain(self, max_batches: int = 50) -> int:
+        """
+        Retry worker: attempt every row whose next attempt is due, batch_size
+        rows at a time, `workers` sends at once. Returns the number delivered.
+        """
+        delivered = 0
+        for _ in range(max(1, max_batches)):
+            handled, n = await self._drain_batch(time.time())
+            delivered += n
+            if handled < self.batch_size:   # nothing more due for our shards
+                break
+        return delivered
+
+    async def _drain_batch(self, now: float) -> Tuple[int, int]:
+        """One batch of drain(). Returns (rows handled, rows delivered)."""
+        rows = await self.dao.due(now, self.chat_id, self.batch_size, self.owned_shards(), self.shard_count)
+        if not rows:
+            return 0, 0
+
+        stale: List[OutboxKey] = []
+        todo: List[OutboxRow] = []
+        busy = self._held.union(self._delivered)
+        for row in rows:
+            if (row.reminder_id, row.fire_minute) in busy:    # a dispatch run has it, or it went out already
+                continue
+            if row.user_id in self.blocked:
+                stale.append((row.reminder_id, row.fire_minute))
+            elif now - row.fire_minute * 60 > self.max_age_seconds:
+                stale.append((row.reminder_id, row.fire_minute))
+                self._count("expired")
+                logger.warning(
+                    "Outbox: dropping %s/%s after %d attempts, over %.0f min old",
+                    row.user_id, row.label, row.attempts, self.max_age_seconds / 60,
+                )
+            else:
+                todo.append(row)
+        if stale:
+            await self.dao.delete(stale)
+
+        sem = asyncio.Semaphore(self.workers)
+        before = self._counters["delivered"]
+
+        async def one(row: OutboxRow) -> None:
+            async with sem:
+                if row.user_id in self.blocked:     # another row for this user just failed terminally
+                    return
+                text = row.text if row.text is not None else self.fallback(row.persona, row.label)
+                try:
+                    await self.deliver((row.reminder_id, row.fire_minute), row.user_id, text, row.attempts)
+                except Exception:
+                    return
+                if self.on_delivered is not None:
+                    self.on_delivered(row.user_id, row.reminder_id)
+
+        await asyncio.gather(*(one(r) for r in todo))
+        await self.flush()
+        delivered = self._counters["delivered"] - before
+        if todo:
+            logger.info("Outbox: retried %d reminders, %d delivered", len(todo), delivered)
+        return len(stale) + len(todo), delivered
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._counters, "undeliverable_users": len(self.blocked), "unflushed": len(self._delivered)}
+
+    # ---------- internals ----------
+    def _count(self, event: str) -> None:
+        self._counters[event] += 1
+        _EVENTS.labels(event).inc()
+
+    async def _renew_hold(self, keys: Set[OutboxKey]) -> None:
+        interval = max(0.05, self.hold_seconds / 2)
+        while True:
+            await asyncio.sleep(interval)
+            pending = [key for key in keys if key in self._held]
+            try:
+                await self.dao.extend_hold(pending, time.time() + self.hold_seconds)
+            except Exception:
+                logger.exception("Outbox: extending the hold on %d reminders failed", len(pending))
+
+    async def _retry_later(self, key: OutboxKey, text: str, attempts: int, error: Exception) -> None:
+        reason = f"{type(error).__name__}: {error}"
+        try:
+            if attempts >= self.max_attempts:
+                self._count("abandoned")
+                logger.error("Outbox: giving up on reminder %s after %d attempts (%s)", key, attempts, reason)
+                await self.dao.delete([key])
+                return
+            backoff = min(self.max_backoff_seconds, self.backoff_seconds * 2 ** (attempts - 1))
+            if isinstance(error, RateLimitedError):
+                backoff = max(backoff, error.retry_after)
+            backoff *= 1 + random.random() * 0.1
+            self._count("retried")
+            logger.warning("Outbox: delivery of reminder %s failed (%s); attempt %d in %.0fs", key, reason, attempts + 1, backoff)
+            await self.dao.reschedule(key, text, attempts, time.time() + backoff, reason)
+        except Exception:
+            # The row stays held and is picked up once the hold expires
+            logger.exception("Outbox: could not reschedule reminder %s", key)
+
+    async def _undeliverable(self, user_id: str, reason: str) -> None:
+        if user_id in self.blocked:
+            return
+        self.blocked.add(user_id)
+        self._count("undeliverable")
+        try:
+            dropped = await self.dao.mark_undeliverable(user_id, reason, self.chat_id)
+            logger.warning("Outbox: user %s is undeliverable (%s); skipping them, %d queued dropped", user_id, reason, dropped)
+        except Exception:
+            logger.exception("Outbox: could not record user %s as undeliverable", user_id)
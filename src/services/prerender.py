@@ -0,0 +1,146 @@
+# src/services/prerender.py
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from src.utils.timezones import minute_to_utc
+
+logger = logging.getLogger(__name__)
+
+# (send_at minute "YYYY-MM-DD HH:MM" in UTC, user_id, persona, label)
+StageKey = Tuple[str, str, str, str]
+NameResolver = Callable[[str], Awaitable[Optional[str]]]
+
+
+def stage_key(send_at: datetime, user_id: str, persona: str, label: str) -> StageKey:
+    return send_at.strftime("%Y-%m-%d %H:%M"), user_id, persona, label
+
+
+class PrerenderStore:
+    """
+    Bounded staging area for messages rendered ahead of their due minute, each
+    with its fallback flag. Oldest entries are evicted first once max_entries is reached.
+    """
+
+    def __init__(self, max_entries: int = 5000):
+        self.max_entries = max(1, max_entries)
+        self._items: "OrderedDict[StageKey, Tuple[str, bool]]" = OrderedDict()
+        self._counters: Dict[str, int] = {"staged": 0, "hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: StageKey) -> bool:
+        return key in self._items
+
+    def put(self, key: StageKey, text: str, fallback: bool = False) -> None:
+        self._items[key] = (text, fallback)
+        self._counters["staged"] += 1
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def pop(self, key: StageKey) -> Optional[Tuple[str, bool]]:
+        """(text, fallback) staged for key, or None."""
+        staged = self._items.pop(key, None)
+        self._counters["hits" if staged is not None else "misses"] += 1
+        return staged
+
+    def expire_before(self, minute: str) -> int:
+        """Drop entries whose due minute ("YYYY-MM-DD HH:MM") is earlier than `minute`."""
+        stale = [k for k in self._items if k[0] < minute]
+        for k in stale:
+            del self._items[k]
+        self._counters["expired"] += len(stale)
+        return len(stale)
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._counters, "size": len(self._items), "max_entries": self.max_entries}
+
+
+class Prerenderer:
+    """
+    Lookahead stage: renders reminders due in the next `lookahead_minutes` minutes
+    into a PrerenderStore so the dispatcher only has to send at the due minute.
+    Fallback lines (model down or shed) are not staged: the next lookahead pass,
+    or the dispatcher at the due minute, tries the model again.
+    """
+
+    def __init__(
+        self,
+        manager,
+        store: PrerenderStore,
+        resolve_name: Optional[NameResolver] = None,
+        *,
+        lookahead_minutes: int = 5,
+        concurrency: int = 4,
+    ):
+        self.manager = manager
+        self.store = store
+        self.resolve_name = resolve_name
+        self.lookahead_minutes = lookahead_minutes
+        self.concurrency = max(1, concurrency)
+
+    async def run(self, now: int) -> int:
+        """
+        Render everything due in (now, now + lookahead], `now` in UTC epoch minutes.
+        Returns how many were newly staged.
+        """
+        self.store.expire_before(minute_to_utc(now).strftime("%Y-%m-%d %H:%M"))
+
+        pending = []
+        for minute in range(now + 1, now + self.lookahead_minutes + 1):
+            for user_id, persona, label, at in self.manager.peek_due(minute):
+                key = stage_key(at, user_id, persona, label)
+                if key not in self.store:
+                    pending.append((key, user_id, persona, label))
+        if not pending:
+            return 0
+
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def with_name(key: StageKey, user_id: str, persona: str, label: str):
+            async with sem:
+                try:
+                    user_name = await self.resolve_name(user_id) if self.resolve_name else None
+                except Exception:
+                    user_name = None
+            return key, persona, label, user_name
+
+        named = await asyncio.gather(*(with_name(*p) for p in pending))
+
+        # One prompt per persona chunk (AIManager.batch_size items)
+        by_persona: Dict[str, list] = {}
+        for entry in named:
+            by_persona.setdefault(entry[1], []).append(entry)
+        batch_size = max(1, getattr(self.manager.ai, "batch_size", 1))
+        chunks = [
+            group[i:i + batch_size]
+            for group in by_persona.values()
+            for i in range(0, len(group), batch_size)
+        ]
+
+        async def render(chunk) -> int:
+            async with sem:
+                try:
+                    texts = await self.manager.render_batch([(p, l, n) for _, p, l, n in chunk])
+                except Exception as e:
+                    logger.warning("Pre-render failed for %d %s reminders: %s", len(chunk), chunk[0][1], e)
+                    return 0
+            staged = 0
+            for (key, _, _, _), (text, fallback) in zip(chunk, texts):
+                if not fallback:
+                    self.store.put(key, text)
+                    staged += 1
+            return staged
+
+        staged = sum(await asyncio.gather(*(render(c) for c in chunks)))
+        logger.info(
+            "Pre-rendered %d/%d reminders due in the next %d min (%d batches)",
+            staged, len(pending), self.lookahead_minutes, len(chunks),
+        )
+        return staged
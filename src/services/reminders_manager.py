@@ -1,28 +1,79 @@
 # src/services/reminders_manager.py
 from __future__ import annotations
 
+import asyncio
 import re
 import logging
+import time
 from datetime import datetime
-from typing import List, Tuple, Optional
-import pytz
+from typing import FrozenSet, Iterable, List, Tuple, Optional
 
+from src.infra import metrics
 from src.services.ai_manager import AIManager
+from src.services.dispatch_pipeline import DueReminder
+from src.services.listing_cache import ListingCache, ListingRow
+from src.services.schedule_index import ScheduleIndex, minute_of_day
+from src.services.shard_leases import shard_of
+from src.utils.timezones import get_tz, is_valid_timezone, minute_to_utc, next_fire_minute, now_minute
 
 logger = logging.getLogger(__name__)
 
 # HH:MM 24h
 TIME_24H = re.compile(r"^(?:[01]\d|2[0-3]):[0-5]\d$")
 
+# Discord caps a message at 2000 chars and an embed description at 4096; stay well under both
+PAGE_MAX_CHARS = 1800
+
+_CLAIMED = metrics.counter("dispatch_claimed_total", "Fires claimed for sending")
+_SKIPPED = metrics.counter("dispatch_skipped_total", "Fires not sent", ("reason",))
+_RENDER_SECONDS = metrics.histogram("render_seconds", "Reminder rendering latency (cache + model)", ("mode",))
+
 
 class RemindersManager:
-    def __init__(self, dao, default_tz: str = "America/New_York", chat_id: int = 1, config=None):
+    def __init__(
+        self,
+        dao,
+        default_tz: str = "America/New_York",
+        chat_id: int = 1,
+        config=None,
+        ai_cache=None,
+        max_catchup_minutes: int = 5,
+        shard_count: int = 1,
+        ack_log=None,
+        listing_cache: Optional[ListingCache] = None,
+        outbox=None,
+    ):
         self.dao = dao
         self.default_tz = default_tz
         self.chat_id = chat_id
-        self.ai = AIManager(config=config)  # AI uses your config
+        self.ai = AIManager(config=config, cache=ai_cache)  # AI uses your config
+        self.schedule = ScheduleIndex(default_tz)   # loaded once by load_schedule()
+        self._schedule_ops: Optional[List[Tuple[str, tuple]]] = None   # edits made while a load is building
+        self._change_seq = 0                        # reminder_changes already applied to the index
+        self.acks = ack_log                         # optional AckLog (sent / taken history)
+        self.listings = listing_cache or ListingCache()  # per-user `!l` rows
+        self.max_catchup_minutes = max_catchup_minutes  # older missed fires are skipped, not sent late
+        self.ledger_retention_minutes = 2 * 24 * 60     # ledger (and change feed) rows kept
+        # Users are split into shard_count shards; this process only dispatches owned_shards
+        # (all of them when unsharded, otherwise whatever LeaseManager hands us)
+        self.shard_count = max(1, shard_count)
+        self.owned_shards: FrozenSet[int] = frozenset({0}) if self.shard_count == 1 else frozenset()
+        self._backlog: List[Tuple[int, int, str, str, str]] = []   # replayed fires for the next take_due
+        self.outbox = outbox                        # optional Outbox (durable delivery + retries)
+        if outbox is not None:
+            outbox.shard_count = self.shard_count
+            outbox.owned_shards = lambda: self.owned_shards
+            outbox.on_delivered = self._record_delivery
+            outbox.fallback = lambda persona, label: self.ai.fallback_line(persona, label)
 
     # ---------- helpers ----------
+    def _owns_user(self, user_id: str) -> bool:
+        return self.shard_count == 1 or shard_of(user_id, self.shard_count) in self.owned_shards
+
+    def _record_delivery(self, user_id: str, reminder_id: int) -> None:
+        if self.acks is not None and reminder_id:
+            self.acks.record(user_id, reminder_id)
+
     @staticmethod
     def _validate_time_hhmm(time_str: str) -> Optional[str]:
         ts = (time_str or "").strip()
@@ -37,43 +88,371 @@ class RemindersManager:
         if not t:
             return False, "Time must be HH:MM in 24-hour format (e.g., 08:00, 21:30)."
 
-        await self.dao.ensure_user(user_id)
-        await self.dao.add_reminder(user_id, t, label, persona, chat_id=self.chat_id)
+        reminder_id = await self.dao.create_reminder(user_id, t, label, persona, chat_id=self.chat_id)
+        self.listings.invalidate(user_id)
+        if self.outbox is not None:
+            await self.outbox.unblock(user_id)
+        if self.schedule.loaded or self._schedule_ops is not None:
+            tz_name = self.schedule.user_timezone(user_id) or await self.dao.get_user_timezone(user_id)
+            self._schedule_apply("add", reminder_id, user_id, persona, label, t, tz_name, now_minute())
         return True, f"✅ Added `{label}` at `{t}` ({persona})."
 
-    async def get_reminders(self, user_id: str):
-        rows: List[Tuple[str, str, str]] = await self.dao.list_reminders(user_id, chat_id=self.chat_id)
-        if not rows:
-            return True, "You have no reminders yet. Use `!r` to create one."
-        lines = [f"- `{t}` — **{label}** ({persona})" for (t, label, persona) in rows]
-        return True, "Your reminders:\n" + "\n".join(lines)
+    async def list_reminders(self, user_id: str) -> List[ListingRow]:
+        """[(time_hhmm, label, persona), ...] for the user, served from the listing cache when fresh."""
+        rows = self.listings.get(user_id)
+        if rows is None:
+            generation = self.listings.generation(user_id)
+            rows = await self.dao.list_reminders(user_id, chat_id=self.chat_id)
+            self.listings.put(user_id, rows, generation)   # skipped if an edit landed meanwhile
+        return rows
+
+    async def get_reminder_pages(self, user_id: str, page_size: int = 10) -> List[str]:
+        """
+        The user's reminders as display pages of at most page_size lines (and
+        PAGE_MAX_CHARS characters). Returns [] if the user has none.
+        """
+        rows = await self.list_reminders(user_id)
+        pages: List[str] = []
+        current: List[str] = []
+        size = 0
+        for t, label, persona in rows:
+            line = f"- `{t}` — **{label}** ({persona})"
+            if len(line) > PAGE_MAX_CHARS:
+                line = line[:PAGE_MAX_CHARS - 1] + "…"
+            if current and (len(current) >= page_size or size + len(line) + 1 > PAGE_MAX_CHARS):
+                pages.append("\n".join(current))
+                current, size = [], 0
+            current.append(line)
+            size += len(line) + 1
+        if current:
+            pages.append("\n".join(current))
+        return pages
 
     async def delete_reminder(self, user_id: str, time_str: str, label: str):
         t = self._validate_time_hhmm(time_str)
         if not t:
             return False, "Time must be HH:MM in 24-hour format."
         deleted = await self.dao.delete_reminder(user_id, t, label, chat_id=self.chat_id)
+        self.listings.invalidate(user_id)
+        self._schedule_apply("remove", user_id, t, label)
         if deleted:
             return True, f"🗑️ Deleted `{label}` at `{t}`."
         return False, f"Couldn't find `{label}` at `{t}`."
 
+    # ---------- timezones ----------
+    async def get_timezone(self, user_id: str) -> str:
+        return await self.dao.get_user_timezone(user_id) or self.default_tz
+
+    async def set_timezone(self, user_id: str, tz_name: Optional[str]):
+        """
+        tz_name is an IANA zone ("Europe/Berlin"); None/"default" resets to DEFAULT_TIMEZONE.
+        Existing reminders keep their wall-clock time and move to the new zone.
+        """
+        name = (tz_name or "").strip()
+        if name.lower() in ("", "default", "reset"):
+            name = None
+        elif not is_valid_timezone(name):
+            return False, f"Unknown timezone `{name}`. Use an IANA name like `Europe/Berlin` or `America/Chicago`."
+        else:
+            name = get_tz(name).zone  # canonical spelling
+
+        await self.dao.set_user_timezone(user_id, name)
+        self._schedule_apply("set_timezone", user_id, name, now_minute())
+        return True, f"🌍 Timezone set to `{name or self.default_tz}`."
+
+    # ---------- acknowledgements ----------
+    def record_sent(self, results) -> None:
+        """Log a 'sent' ack for every delivered DispatchResult (buffered, written in batches)."""
+        if self.acks is None:
+            return
+        for r in results:
+            if r.sent and r.reminder_id:
+                self.acks.record(r.user_id, r.reminder_id)
+
+    async def mark_taken(self, user_id: str, label: Optional[str] = None):
+        if self.acks is None:
+            return False, "Taken tracking isn't enabled."
+        label = (label or "").strip() or None
+        status, found, at = await self.acks.mark_taken(user_id, label)
+        if status == "none":
+            if label:
+                return False, f"Couldn't find a reminder called `{label}`."
+            return False, "You have no reminders to confirm yet."
+        when = self._local_time(await self.get_timezone(user_id), at, "%H:%M")
+        if status == "already":
+            return False, f"⚠️ `{found}` was already marked taken at `{when}`. Don't double-dose!"
+        return True, f"✅ Marked `{found}` as taken at `{when}`."
+
+    async def get_last_taken(self, user_id: str):
+        if self.acks is None:
+            return False, "Taken tracking isn't enabled."
+        rows = await self.acks.dao.last_taken(user_id, chat_id=self.chat_id)
+        if not rows:
+            return True, "You have no reminders yet. Use `!r` to create one."
+        tz_name = await self.get_timezone(user_id)
+        lines = []
+        for t, label, _, taken in rows:
+            when = f"`{self._local_time(tz_name, taken, '%Y-%m-%d %H:%M')}`" if taken else "never"
+            lines.append(f"- `{t}` — **{label}**: last taken {when}")
+        return True, "Last taken:\n" + "\n".join(lines)
+
+    @staticmethod
+    def _local_time(tz_name: str, at: int, fmt: str) -> str:
+        return datetime.fromtimestamp(at, get_tz(tz_name)).strftime(fmt)
+
+    # ---------- in-memory schedule ----------
+    async def load_schedule(self, now: Optional[int] = None) -> int:
+        """
+        Build the ScheduleIndex from the reminders table. Returns the number of entries.
+        Fires missed since each owned shard's high-water mark (at most
+        max_catchup_minutes back) are queued for the next take_due().
+        """
+        now = now_minute() if now is None else now
+        # Built off the event loop (a 100k-reminder index takes seconds); the live
+        # index keeps serving ticks until the new one is swapped in
+        self._schedule_ops = []
+        try:
+            # Changes after this seq may or may not be in rows; sync_schedule re-applies them
+            change_seq = await self.dao.latest_change_seq()
+            rows = await self.dao.list_active_schedule(chat_id=self.chat_id)
+            index = ScheduleIndex(self.default_tz)
+            await asyncio.to_thread(index.load, rows, now)
+            for op, args in self._schedule_ops:     # commands that ran during the build
+                getattr(index, op)(*args)
+        finally:
+            self._schedule_ops = None
+        self.schedule = index
+        self._change_seq = change_seq
+        self._backlog = await self._replay(self.owned_shards, now)
+        return len(self.schedule)
+
+    async def sync_schedule(self, now: Optional[int] = None) -> int:
+        """
+        Apply edits committed since the last sync by anyone (other bot processes,
+        the bulk importer, this process): every user in the reminder_changes feed
+        is re-read and their index entries brought in line. Returns users synced.
+        """
+        if not self.schedule.loaded or self._schedule_ops is not None:
+            return 0    # a load in progress reads a newer snapshot and resets the feed position
+        index = self.schedule
+        seq, users = await self.dao.changes_since(self._change_seq)
+        rows = {user_id: [] for user_id in users}
+        if users:
+            for row in await self.dao.list_user_schedule(users, chat_id=self.chat_id):
+                rows[row[1]].append(row)
+        if self.schedule is not index or self._schedule_ops is not None:
+            return 0    # reloaded meanwhile
+        now = now_minute() if now is None else now
+        for user_id, user_rows in rows.items():
+            index.sync_user(user_id, user_rows, now)
+        self._change_seq = max(self._change_seq, seq)
+        return len(users)
+
+    def _schedule_apply(self, op: str, *args) -> None:
+        """Apply a reminder edit to the live index, and journal it if a load is in progress."""
+        if self._schedule_ops is not None:
+            self._schedule_ops.append((op, args))
+        if self.schedule.loaded:
+            getattr(self.schedule, op)(*args)
+
+    async def set_owned_shards(self, shards: Iterable[int], now: Optional[int] = None) -> None:
+        """
+        Switch the shards this process dispatches. Newly gained shards are caught
+        up from their high-water mark, so a takeover doesn't lose the minutes
+        since the previous owner's last tick.
+        """
+        shards = frozenset(shards)
+        gained = shards - self.owned_shards
+        self.owned_shards = shards
+        if gained:
+            self._backlog += await self._replay(gained, now_minute() if now is None else now)
+
+    async def _replay(self, shards: FrozenSet[int], now: int) -> List[Tuple[int, int, str, str, str]]:
+        if not shards or not self.schedule.loaded:
+            return []
+        marks = await self.dao.get_high_water_marks(chat_id=self.chat_id)
+        starts = {
+            shard: max(marks[shard] + 1, now - self.max_catchup_minutes)
+            for shard in shards if shard in marks
+        }
+        if not starts:
+            return []
+        # Everything up to the cursor has been popped already (and dropped if we didn't own it)
+        replayed = self.schedule.replay(
+            min(starts.values()),
+            self.schedule.cursor,
+            lambda user_id: shard_of(user_id, self.shard_count) in starts,
+        )
+        fires = [
+            (e.reminder_id, minute, e.user_id, e.persona, e.label)
+            for minute, e in replayed
+            if minute >= starts[shard_of(e.user_id, self.shard_count)]
+        ]
+        if fires:
+            logger.info("Replaying %d missed reminders for shards %s", len(fires), sorted(starts))
+        return fires
+
+    async def check_schedule(self) -> Tuple[int, int]:
+        """
+        Compare the ScheduleIndex against the reminders table.
+        Returns (missing, extra) counts; both 0 means the index is consistent.
+        """
+        rows = await self.dao.list_active_schedule(chat_id=self.chat_id)
+        missing, extra = self.schedule.diff(rows)
+        if missing or extra:
+            logger.warning(
+                "ScheduleIndex drift: %d missing, %d extra (e.g. missing=%s extra=%s)",
+                len(missing), len(extra), next(iter(missing), None), next(iter(extra), None),
+            )
+        return len(missing), len(extra)
+
     # ---------- minute-precision fetch for the dispatcher ----------
-    async def get_due_at_minute(self, hhmm: str) -> List[Tuple[str, str, str, datetime]]:
+    async def take_due(
+        self, now: Optional[int] = None, window_minutes: Optional[int] = None
+    ) -> List[DueReminder]:
         """
-        Returns: List[(user_id, persona, label, send_at_datetime)]
+        Claim everything that came due after the high-water mark, up to and including
+        `now` (UTC epoch minutes, default: the current minute).
+        Returns: List[DueReminder(user_id, persona, label, send_at_utc, reminder_id)]
+
+        - fires more than window_minutes old (default max_catchup_minutes) are skipped
+        - every fire is recorded in the dispatch ledger together with the new
+          high-water mark; fires an earlier run already claimed are dropped, so
+          overlapping callers (loop, !runbatch, cron, other workers) never send twice
+        - only users in owned_shards are returned; the high-water mark of each
+          owned shard moves to `now`
+        - edits made by other processes are synced into the index first, and
+          fires of reminders deleted since are never claimed
+        - with an outbox, claimed fires are enqueued in the same transaction and
+          users the platform refused to DM are skipped
         """
-        t = self._validate_time_hhmm(hhmm)
-        if not t:
+        now = now_minute() if now is None else now
+        window = self.max_catchup_minutes if window_minutes is None else max(0, window_minutes)
+        owned = self.owned_shards
+
+        if self.schedule.loaded:
+            await self.sync_schedule(now)
+            fires = self._backlog
+            self._backlog = []
+            fires += [(e.reminder_id, minute, e.user_id, e.persona, e.label) for minute, e in self.schedule.pop_due(now)]
+        else:
+            fires = await self._due_from_db(now, window, owned)
+        if self.shard_count > 1:
+            fires = [f for f in fires if shard_of(f[2], self.shard_count) in owned]
+        if not owned:
             return []
-        rows = await self.dao.due_at_minute(t, chat_id=self.chat_id)  # [(user_id, persona, label)]
-        tz = pytz.timezone(self.default_tz)
-        send_at = datetime.now(tz).replace(second=0, microsecond=0)
-        return [(user_id, persona, label, send_at) for (user_id, persona, label) in rows]
+
+        fresh = [f for f in fires if now - f[1] <= window]
+        if len(fresh) < len(fires):
+            _SKIPPED.labels("overdue").inc(len(fires) - len(fresh))
+            logger.warning("Skipped %d reminders more than %d min overdue", len(fires) - len(fresh), window)
+        outbox = None
+        if self.outbox is not None:
+            if self.outbox.blocked:
+                deliverable = [f for f in fresh if f[2] not in self.outbox.blocked]
+                _SKIPPED.labels("undeliverable").inc(len(fresh) - len(deliverable))
+                fresh = deliverable
+            outbox = {(f[0], f[1]): (f[2], f[3], f[4]) for f in fresh}
+
+        claimed = await self.dao.claim_fires(
+            ((f[0], f[1]) for f in fresh),
+            {shard: now for shard in owned},
+            chat_id=self.chat_id,
+            outbox=outbox,
+            hold_seconds=self.outbox.hold_seconds if self.outbox is not None else 0.0,
+        )
+        _CLAIMED.inc(len(claimed))
+        if len(claimed) < len(fresh):
+            _SKIPPED.labels("already_claimed").inc(len(fresh) - len(claimed))
+            logger.info("Dispatch ledger: %d reminders already sent or deleted, skipping", len(fresh) - len(claimed))
+        if now % 60 == 0:
+            pruned = await self.dao.prune_ledger(now - self.ledger_retention_minutes)
+            pruned_changes = await self.dao.prune_changes(time.time() - self.ledger_retention_minutes * 60)
+            logger.debug("Dispatch ledger: pruned %d rows (%d change-feed rows)", pruned, pruned_changes)
+
+        return [
+            DueReminder(user_id, persona, label, minute_to_utc(minute), reminder_id)
+            for reminder_id, minute, user_id, persona, label in fresh
+            if (reminder_id, minute) in claimed
+        ]
+
+    def peek_due(self, minute: int) -> List[Tuple[str, str, str, datetime]]:
+        """Reminders firing at `minute` (UTC epoch minutes) without consuming them (pre-render lookahead)."""
+        if not self.schedule.loaded:
+            return []
+        send_at = minute_to_utc(minute)
+        return [
+            (e.user_id, e.persona, e.label, send_at)
+            for e in self.schedule.peek(minute)
+            if self._owns_user(e.user_id) and not (self.outbox is not None and self.outbox.is_blocked(e.user_id))
+        ]
+
+    async def _due_from_db(
+        self, now: int, window: int, shards: FrozenSet[int]
+    ) -> List[Tuple[int, int, str, str, str]]:
+        """
+        Degraded mode (index failed to load): range queries over the local HH:MM of
+        every minute between the oldest owned high-water mark and now, in the default
+        zone and every zone a user has set. Each row's fires are then worked out in its
+        owner's zone as ScheduleIndex does (DST gaps shift forward, repeats fire once).
+        Returns [(reminder_id, fire_minute, user_id, persona, label)].
+        """
+        marks = await self.dao.get_high_water_marks(chat_id=self.chat_id)
+        hwm = min((marks[s] for s in shards if s in marks), default=None)
+        start = now if hwm is None else max(hwm + 1, now - window)
+
+        zones = {self.default_tz, *(name for name in await self.dao.list_timezones() if is_valid_timezone(name))}
+        runs: List[List[str]] = []
+        for name in zones:
+            tz = get_tz(name)
+            run = None
+            for minute in range(start, now + 1):
+                hhmm = minute_to_utc(minute).astimezone(tz).strftime("%H:%M")
+                if run is None or hhmm < run[1]:        # midnight / DST fall-back: start a new range
+                    run = [hhmm, hhmm]
+                    runs.append(run)
+                else:
+                    run[1] = hhmm                       # a spring-forward gap stays inside the range
+        merged: List[List[str]] = []
+        for lo, hi in sorted(runs):
+            if merged and lo <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], hi)
+            else:
+                merged.append([lo, hi])
+
+        fires = []
+        for lo, hi in merged:
+            for rid, user_id, persona, label, t, tz_name in await self.dao.due_between(lo, hi, chat_id=self.chat_id):
+                tz = get_tz(tz_name if tz_name in zones else self.default_tz)
+                local = minute_of_day(t)
+                fire = next_fire_minute(local, tz, start)
+                while fire <= now:
+                    fires.append((rid, fire, user_id, persona, label))
+                    fire = next_fire_minute(local, tz, fire + 1)
+        fires.sort(key=lambda f: f[1])
+        return fires
 
     # ---------- AI rendering ----------
-    async def render_message(self, persona: str, label: str, user_name: Optional[str] = None) -> str:
+    async def render_message(self, persona: str, label: str, user_name: Optional[str] = None) -> Tuple[str, bool]:
         """
         Ask AIManager to generate the one-line persona reminder,
         then append signature formatting handled in AIManager.
+        Returns (message, fallback), as render_batch does.
+        """
+        started = time.perf_counter()
+        try:
+            return await self.ai.render(persona=persona, label=label, user_name=user_name)
+        finally:
+            _RENDER_SECONDS.labels("single").observe(time.perf_counter() - started)
+
+    async def render_batch(self, items: List[Tuple[str, str, Optional[str]]]) -> List[Tuple[str, bool]]:
+        """
+        Render many reminders at once: [(persona, label, user_name), ...] → [(message, fallback), ...]
+        in order; fallback marks lines the model failed to produce (see AIManager.Rendered).
+        Callers group by persona so each prompt stays in one voice.
         """
-        return await self.ai.generate(persona=persona, label=label, user_name=user_name)
+        started = time.perf_counter()
+        try:
+            return await self.ai.generate_batch(items)
+        finally:
+            _RENDER_SECONDS.labels("batch").observe(time.perf_counter() - started)
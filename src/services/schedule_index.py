@@ -0,0 +1,255 @@
+# src/services/schedule_index.py
+from __future__ import annotations
+
+import logging
+import sys
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.utils.timezones import (
+    MINUTES_PER_DAY,
+    get_tz,
+    next_fire_minute,
+    next_transition_minute,
+)
+
+logger = logging.getLogger(__name__)
+
+# (id, user_id, persona, label, time_hhmm, timezone or None) — RemindersDAO.list_active_schedule
+ScheduleRow = Tuple[int, str, str, str, str, Optional[str]]
+
+
+def minute_of_day(hhmm: str) -> int:
+    """'HH:MM' -> 0..1439 (expects an already validated string)."""
+    h, m = hhmm.split(":")
+    return int(h) * 60 + int(m)
+
+
+class ScheduleEntry:
+    """One active reminder inside a minute bucket (kept deliberately small)."""
+
+    __slots__ = ("reminder_id", "user_id", "persona", "label", "local_minute", "tz_name", "fire_minute")
+
+    def __init__(self, reminder_id: int, user_id: str, persona: str, label: str, local_minute: int, tz_name: str):
+        self.reminder_id = reminder_id
+        self.user_id = sys.intern(user_id)
+        self.persona = sys.intern(persona)
+        self.label = sys.intern(label)
+        self.local_minute = local_minute    # wall-clock minute of day in tz_name
+        self.tz_name = sys.intern(tz_name)
+        self.fire_minute = 0                # next fire instant, UTC epoch minutes
+
+    def as_tuple(self) -> Tuple[str, str, str]:
+        return self.user_id, self.persona, self.label
+
+    def __repr__(self) -> str:
+        return (
+            f"ScheduleEntry({self.reminder_id}, {self.user_id!r}, {self.persona!r}, {self.label!r}, "
+            f"{self.local_minute // 60:02d}:{self.local_minute % 60:02d} {self.tz_name}, fire={self.fire_minute})"
+        )
+
+
+class ScheduleIndex:
+    """
+    In-memory schedule indexed by next UTC fire instant.
+
+    - 1,440 buckets keyed by fire_minute % 1440; each entry carries its absolute
+      fire_minute, so a tick is an integer lookup with no timezone math
+    - load() once from the reminders table (see RemindersDAO.list_active_schedule)
+    - add()/remove()/set_timezone() keep it in sync with commands; sync_user()
+      re-applies one user's rows after an edit made by another process
+    - pop_due(end) hands out every fire in (cursor, end] and advances those
+      entries one day; the local fire time is only recomputed when that day
+      crosses a DST transition. Every entry always fires after `cursor`, so
+      minutes missed between ticks are picked up by the next pop
+    """
+
+    def __init__(self, default_tz: str = "America/New_York"):
+        self.default_tz = default_tz
+        self._buckets: List[List[ScheduleEntry]] = [[] for _ in range(MINUTES_PER_DAY)]
+        self._by_user: Dict[str, List[ScheduleEntry]] = {}
+        self._size = 0
+        self._tz_recomputes = 0
+        self._transitions: Dict[str, Tuple[int, int]] = {}   # tz name -> (from, next offset change after it)
+        self.cursor = 0         # last UTC epoch minute handed out by pop_due()
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return self._size
+
+    # ---------- building ----------
+    def load(self, rows: Iterable[ScheduleRow], after_minute: int) -> None:
+        """Replace the contents; each entry's first fire is the earliest >= after_minute."""
+        self._buckets = [[] for _ in range(MINUTES_PER_DAY)]
+        self._by_user = {}
+        self._size = 0
+        self.cursor = after_minute - 1
+        for row in rows:
+            self._insert(self._entry(*row), after_minute)
+        self.loaded = True
+        logger.info("ScheduleIndex: loaded %d reminders", self._size)
+
+    def add(
+        self,
+        reminder_id: int,
+        user_id: str,
+        persona: str,
+        label: str,
+        time_hhmm: str,
+        tz_name: Optional[str],
+        after_minute: int,
+    ) -> None:
+        """Schedule a new reminder; a reminder_id already in the index is left alone."""
+        if any(e.reminder_id == reminder_id for e in self._by_user.get(user_id, ())):
+            return
+        self._insert(self._entry(reminder_id, user_id, persona, label, time_hhmm, tz_name), after_minute)
+
+    def remove(self, user_id: str, time_hhmm: str, label: str) -> int:
+        """Drop every entry matching (user_id, local time, label). Returns the number removed."""
+        local = minute_of_day(time_hhmm)
+        doomed = [e for e in self._by_user.get(user_id, ()) if e.local_minute == local and e.label == label]
+        for e in doomed:
+            self._unlink(e)
+        return len(doomed)
+
+    def set_timezone(self, user_id: str, tz_name: Optional[str], after_minute: int) -> int:
+        """Re-anchor all of a user's reminders to a new timezone. Returns entries moved."""
+        entries = list(self._by_user.get(user_id, ()))
+        for e in entries:
+            self._unlink(e)
+            e.tz_name = sys.intern(tz_name or self.default_tz)
+            self._insert(e, after_minute)
+        return len(entries)
+
+    def sync_user(self, user_id: str, rows: Iterable[ScheduleRow], after_minute: int) -> Tuple[int, int]:
+        """
+        Make user_id's entries match rows (all of the user's active reminders).
+        Entries that still match keep their next fire; new or changed rows are
+        scheduled from after_minute. Returns (added, removed).
+        """
+        wanted = {self._row_key(row): row for row in rows}
+        removed = 0
+        for e in list(self._by_user.get(user_id, ())):
+            if wanted.pop(self._entry_key(e), None) is None:
+                self._unlink(e)
+                removed += 1
+        for row in wanted.values():
+            self._insert(self._entry(*row), after_minute)
+        return len(wanted), removed
+
+    def user_timezone(self, user_id: str) -> Optional[str]:
+        entries = self._by_user.get(user_id)
+        return entries[0].tz_name if entries else None
+
+    # ---------- lookups ----------
+    def peek(self, minute: int) -> List[ScheduleEntry]:
+        """Entries firing at `minute` (UTC epoch minutes) without advancing them."""
+        return [e for e in self._buckets[minute % MINUTES_PER_DAY] if e.fire_minute == minute]
+
+    def pop_due(self, end_minute: int) -> List[Tuple[int, ScheduleEntry]]:
+        """
+        [(fire_minute, entry)] for every fire in (cursor, end_minute], oldest first,
+        advancing each entry to its next fire after end_minute.
+        """
+        start = self.cursor + 1
+        if end_minute < start:
+            return []
+        if end_minute - start + 1 >= MINUTES_PER_DAY:
+            buckets = range(MINUTES_PER_DAY)     # down for a day or more: check everything once
+        else:
+            buckets = (m % MINUTES_PER_DAY for m in range(start, end_minute + 1))
+        due = [(e.fire_minute, e) for b in buckets for e in self._buckets[b] if e.fire_minute <= end_minute]
+        due.sort(key=lambda item: item[0])
+        for _, e in due:
+            self._advance(e, end_minute + 1)
+        self.cursor = end_minute
+        return due
+
+    def replay(
+        self, start_minute: int, end_minute: int, user_filter: Callable[[str], bool]
+    ) -> List[Tuple[int, ScheduleEntry]]:
+        """
+        [(fire_minute, entry)] for every fire in [start_minute, end_minute] of users
+        matching user_filter, recomputed from wall-clock time. Nothing is advanced;
+        used to catch up fires that were popped while someone else owned the user.
+        """
+        out: List[Tuple[int, ScheduleEntry]] = []
+        if end_minute < start_minute:
+            return out
+        for user_id, entries in self._by_user.items():
+            if not user_filter(user_id):
+                continue
+            for e in entries:
+                tz = get_tz(e.tz_name)
+                fire = next_fire_minute(e.local_minute, tz, start_minute)
+                while fire <= end_minute:
+                    out.append((fire, e))
+                    fire = next_fire_minute(e.local_minute, tz, fire + 1)
+        out.sort(key=lambda item: item[0])
+        return out
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": self._size, "users": len(self._by_user), "tz_recomputes": self._tz_recomputes}
+
+    def bucket_keys(self) -> Set[Tuple[int, str, str, str, str, str]]:
+        return {self._entry_key(e) for bucket in self._buckets for e in bucket}
+
+    # ---------- consistency ----------
+    def diff(self, rows: Iterable[ScheduleRow]) -> Tuple[Set[tuple], Set[tuple]]:
+        """
+        Compare against the reminders table.
+        Returns (missing, extra): rows the index lacks, and entries the table no longer has.
+        """
+        expected = {self._row_key(row) for row in rows}
+        actual = self.bucket_keys()
+        return expected - actual, actual - expected
+
+    # ---------- internals ----------
+    def _row_key(self, row: ScheduleRow) -> Tuple[int, str, str, str, str, str]:
+        rid, uid, persona, label, time_hhmm, tz_name = row
+        return rid, uid, persona, label, time_hhmm, tz_name or self.default_tz
+
+    @staticmethod
+    def _entry_key(e: ScheduleEntry) -> Tuple[int, str, str, str, str, str]:
+        hhmm = f"{e.local_minute // 60:02d}:{e.local_minute % 60:02d}"
+        return e.reminder_id, e.user_id, e.persona, e.label, hhmm, e.tz_name
+
+    def _entry(self, reminder_id, user_id, persona, label, time_hhmm, tz_name) -> ScheduleEntry:
+        return ScheduleEntry(reminder_id, user_id, persona, label, minute_of_day(time_hhmm), tz_name or self.default_tz)
+
+    def _insert(self, e: ScheduleEntry, after_minute: int) -> None:
+        # Never schedule at or before the cursor: that minute has already been handed out
+        after_minute = max(after_minute, self.cursor + 1)
+        e.fire_minute = next_fire_minute(e.local_minute, get_tz(e.tz_name), after_minute)
+        self._buckets[e.fire_minute % MINUTES_PER_DAY].append(e)
+        self._by_user.setdefault(e.user_id, []).append(e)
+        self._size += 1
+
+    def _unlink(self, e: ScheduleEntry) -> None:
+        self._buckets[e.fire_minute % MINUTES_PER_DAY].remove(e)
+        user_entries = self._by_user[e.user_id]
+        user_entries.remove(e)
+        if not user_entries:
+            del self._by_user[e.user_id]
+        self._size -= 1
+
+    def _next_transition(self, tz_name: str, minute: int) -> int:
+        cached = self._transitions.get(tz_name)
+        if cached is None or not cached[0] <= minute < cached[1]:
+            cached = self._transitions[tz_name] = (minute, next_transition_minute(get_tz(tz_name), minute))
+        return cached[1]
+
+    def _advance(self, e: ScheduleEntry, after_minute: int) -> None:
+        old_bucket = e.fire_minute % MINUTES_PER_DAY
+        nxt = e.fire_minute + MINUTES_PER_DAY
+        if nxt < after_minute:
+            nxt += -(-(after_minute - nxt) // MINUTES_PER_DAY) * MINUTES_PER_DAY
+        # Recompute from wall-clock time if the offset changed since the previous day's
+        # fire (this one may have been shifted out of a DST gap) or changes before the next
+        if self._next_transition(e.tz_name, e.fire_minute - MINUTES_PER_DAY) <= nxt:
+            nxt = next_fire_minute(e.local_minute, get_tz(e.tz_name), after_minute)
+            self._tz_recomputes += 1
+        e.fire_minute = nxt
+        new_bucket = nxt % MINUTES_PER_DAY
+        if new_bucket != old_bucket:
+            self._buckets[old_bucket].remove(e)
+            self._buckets[new_bucket].append(e)
@@ -0,0 +1,74 @@
+# src/services/shard_leases.py
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import time
+import zlib
+from typing import FrozenSet, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def shard_of(user_id: str, shard_count: int) -> int:
+    """Stable shard for a user (crc32, so every process agrees without coordination)."""
+    if shard_count <= 1:
+        return 0
+    return zlib.crc32(user_id.encode("utf-8")) % shard_count
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaseManager:
+    """
+    Lease-based shard ownership for one dispatch worker.
+
+    - renew() heartbeats, extends our leases and rebalances toward a fair share
+      (see ShardLeaseDAO.renew); call it every lease_seconds / 3
+    - owned() is what this worker may dispatch right now; it goes empty on its own
+      if renewals stop succeeding, so a stalled worker can't keep sending for
+      shards that another worker may already have taken over
+    - claim_event() decides which worker answers a command they all received
+    """
+
+    def __init__(self, dao, shard_count: int, *, worker_id: Optional[str] = None, lease_seconds: float = 30.0):
+        self.dao = dao
+        self.shard_count = max(1, shard_count)
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self._owned: FrozenSet[int] = frozenset()
+        self._valid_until = 0.0     # time.monotonic() deadline of the last successful renewal
+
+    def owned(self) -> FrozenSet[int]:
+        if time.monotonic() >= self._valid_until:
+            return frozenset()
+        return self._owned
+
+    async def renew(self) -> FrozenSet[int]:
+        started = time.monotonic()
+        owned, released = await self.dao.renew(self.worker_id, self.shard_count, self.lease_seconds, time.time())
+        owned = frozenset(owned)
+        if owned != self._owned:
+            logger.info(
+                "Shard leases for %s: %s (gained %s, released %s)",
+                self.worker_id, sorted(owned), sorted(owned - self._owned), sorted(released),
+            )
+        self._owned = owned
+        # Leases were extended relative to the DB write; count from before it to stay conservative
+        self._valid_until = started + self.lease_seconds
+        return owned
+
+    async def claim_event(self, event_id: int) -> bool:
+        """
+        Workers sharing one bot token all receive the same gateway events (commands,
+        DMs); the first to claim an event's id handles it and the others drop it.
+        """
+        return await self.dao.claim_event(event_id)
+
+    async def release(self) -> None:
+        self._owned = frozenset()
+        self._valid_until = 0.0
+        await self.dao.release_all(self.worker_id)
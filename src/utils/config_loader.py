@@ -18,7 +18,6 @@ class ConfigLoader:
 
         # ---- SQLite paths ----
         self._sqlite_db_path = os.getenv("SQLITE_DB_PATH", str(root / "src" / "database" / "reminders.db"))
-        self._schema_path   = os.getenv("SQLITE_SCHEMA_PATH", str(root / "src" / "database" / "schema.sql"))
 
         # ---- Timezone ----
         self._default_timezone = os.getenv("DEFAULT_TIMEZONE", "America/New_York")
@@ -52,6 +51,20 @@ class ConfigLoader:
     def _parse_bool(val: str) -> bool:
         return str(val).strip().lower() in ("1", "true", "t", "yes", "y", "on")
 
+    @staticmethod
+    def _parse_int(val: str, default: int) -> int:
+        try:
+            return int(str(val).strip())
+        except (TypeError, ValueError):
+            return default
+
+    @staticmethod
+    def _parse_float(val: str, default: float) -> float:
+        try:
+            return float(str(val).strip())
+        except (TypeError, ValueError):
+            return default
+
     # ---- Discord
     def get_discord_token(self) -> str:
         return self._discord_token
@@ -60,8 +73,36 @@ class ConfigLoader:
     def get_sqlite_db_path(self) -> str:
         return self._sqlite_db_path
 
-    def get_schema_path(self) -> str:
-        return self._schema_path
+    # ---- Startup: app-command sync
+    def get_command_sync_state_path(self) -> str:
+        default = str(Path(self._sqlite_db_path).parent / "command_tree.sha256")
+        return os.getenv("COMMAND_SYNC_STATE_PATH") or default
+
+    def get_force_command_sync(self) -> bool:
+        return self._parse_bool(os.getenv("FORCE_COMMAND_SYNC", "false"))
+
+    # ---- SQLite tuning
+    def get_sqlite_readers(self) -> int:
+        return max(1, self._parse_int(os.getenv("SQLITE_READERS"), 4))
+
+    def get_sqlite_busy_timeout_ms(self) -> int:
+        return max(0, self._parse_int(os.getenv("SQLITE_BUSY_TIMEOUT_MS"), 5000))
+
+    def get_sqlite_synchronous(self) -> str:
+        value = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").strip().upper()
+        return value if value in ("OFF", "NORMAL", "FULL", "EXTRA") else "NORMAL"
+
+    def get_sqlite_cache_size_kb(self) -> int:
+        return max(0, self._parse_int(os.getenv("SQLITE_CACHE_SIZE_KB"), 20_000))
+
+    def get_sqlite_mmap_size_mb(self) -> int:
+        return max(0, self._parse_int(os.getenv("SQLITE_MMAP_SIZE_MB"), 256))
+
+    def get_sqlite_group_commit_ms(self) -> float:
+        return max(0.0, self._parse_float(os.getenv("SQLITE_GROUP_COMMIT_MS"), 2.0))
+
+    def get_sqlite_group_commit_max(self) -> int:
+        return max(1, self._parse_int(os.getenv("SQLITE_GROUP_COMMIT_MAX"), 128))
 
     # ---- Timezone
     def get_default_timezone(self) -> str:
@@ -79,3 +120,143 @@ class ConfigLoader:
 
     def is_ai_enabled(self) -> bool:
         return self._ai_enabled
+
+    def get_ai_http_limit_per_host(self) -> int:
+        return max(1, self._parse_int(os.getenv("AI_HTTP_LIMIT_PER_HOST"), 8))
+
+    def get_ai_http_keepalive_seconds(self) -> float:
+        return self._parse_float(os.getenv("AI_HTTP_KEEPALIVE_SECONDS"), 60.0)
+
+    def get_ai_http_timeout_seconds(self) -> float:
+        return self._parse_float(os.getenv("AI_HTTP_TIMEOUT_SECONDS"), 60.0)
+
+    def get_ai_batch_size(self) -> int:
+        return max(1, self._parse_int(os.getenv("AI_BATCH_SIZE"), 8))
+
+    def get_ai_stream(self) -> bool:
+        return self._parse_bool(os.getenv("AI_STREAM", "true"))
+
+    def get_ai_max_chars(self) -> int:
+        return max(20, self._parse_int(os.getenv("AI_MAX_CHARS"), 120))
+
+    def get_ai_max_pending(self) -> int:
+        return max(1, self._parse_int(os.getenv("AI_MAX_PENDING"), 32))
+
+    def get_ai_breaker_failures(self) -> int:
+        return max(1, self._parse_int(os.getenv("AI_BREAKER_FAILURES"), 5))
+
+    def get_ai_breaker_slow_seconds(self) -> float:
+        return max(0.0, self._parse_float(os.getenv("AI_BREAKER_SLOW_SECONDS"), 5.0))
+
+    def get_ai_breaker_reset_seconds(self) -> float:
+        return max(1.0, self._parse_float(os.getenv("AI_BREAKER_RESET_SECONDS"), 30.0))
+
+    def get_ai_cache_pool_size(self) -> int:
+        return max(1, self._parse_int(os.getenv("AI_CACHE_POOL_SIZE"), 5))
+
+    def get_ai_cache_refresh_probability(self) -> float:
+        return min(1.0, max(0.0, self._parse_float(os.getenv("AI_CACHE_REFRESH_PROBABILITY"), 0.1)))
+
+    def get_ai_cache_ttl_days(self) -> float:
+        return self._parse_float(os.getenv("AI_CACHE_TTL_DAYS"), 30.0)
+
+    def get_ai_cache_max_keys(self) -> int:
+        return max(1, self._parse_int(os.getenv("AI_CACHE_MAX_KEYS"), 10_000))
+
+    # ---- Dispatch
+    def get_dispatch_concurrency(self) -> int:
+        return max(1, self._parse_int(os.getenv("DISPATCH_CONCURRENCY"), 16))
+
+    def get_dispatch_deadline_seconds(self) -> float:
+        return self._parse_float(os.getenv("DISPATCH_DEADLINE_SECONDS"), 45.0)
+
+    def get_dispatch_render_budget_seconds(self) -> float:
+        return max(0.0, self._parse_float(os.getenv("DISPATCH_RENDER_BUDGET_SECONDS"), 5.0))
+
+    def get_dispatch_catchup_minutes(self) -> int:
+        return max(0, self._parse_int(os.getenv("DISPATCH_CATCHUP_MINUTES"), 15))
+
+    # ---- Tick tracing / profiling
+    def get_trace_buffer_ticks(self) -> int:
+        return max(1, self._parse_int(os.getenv("TRACE_BUFFER_TICKS"), 200))
+
+    def get_slow_tick_seconds(self) -> float:
+        return max(0.0, self._parse_float(os.getenv("SLOW_TICK_SECONDS"), 30.0))  # 0 = never dump
+
+    # ---- Acknowledgements (sent / taken log)
+    def get_ack_flush_size(self) -> int:
+        return max(1, self._parse_int(os.getenv("ACK_FLUSH_SIZE"), 500))
+
+    def get_ack_flush_seconds(self) -> float:
+        return max(0.5, self._parse_float(os.getenv("ACK_FLUSH_SECONDS"), 5.0))
+
+    def get_ack_retention_days(self) -> int:
+        return max(1, self._parse_int(os.getenv("ACK_RETENTION_DAYS"), 30))
+
+    # ---- Delivery outbox (retries + restart recovery)
+    def get_outbox_workers(self) -> int:
+        return max(1, self._parse_int(os.getenv("OUTBOX_WORKERS"), 4))
+
+    def get_outbox_poll_seconds(self) -> float:
+        return max(1.0, self._parse_float(os.getenv("OUTBOX_POLL_SECONDS"), 10.0))
+
+    def get_outbox_max_attempts(self) -> int:
+        return max(1, self._parse_int(os.getenv("OUTBOX_MAX_ATTEMPTS"), 6))
+
+    def get_outbox_backoff_seconds(self) -> float:
+        return max(1.0, self._parse_float(os.getenv("OUTBOX_BACKOFF_SECONDS"), 30.0))
+
+    def get_outbox_max_backoff_seconds(self) -> float:
+        return max(1.0, self._parse_float(os.getenv("OUTBOX_MAX_BACKOFF_SECONDS"), 1800.0))
+
+    def get_outbox_max_age_minutes(self) -> int:
+        return max(1, self._parse_int(os.getenv("OUTBOX_MAX_AGE_MINUTES"), 60))
+
+    def get_outbox_hold_seconds(self) -> float:
+        return max(10.0, self._parse_float(os.getenv("OUTBOX_HOLD_SECONDS"), 120.0))
+
+    # ---- Sharded dispatch (several bot processes on one database)
+    def get_shard_count(self) -> int:
+        return max(1, self._parse_int(os.getenv("SHARD_COUNT"), 1))
+
+    def get_shard_worker_id(self) -> str:
+        return os.getenv("SHARD_WORKER_ID", "").strip()
+
+    def get_shard_lease_seconds(self) -> float:
+        return max(3.0, self._parse_float(os.getenv("SHARD_LEASE_SECONDS"), 30.0))
+
+    def get_prerender_lookahead_minutes(self) -> int:
+        return max(0, self._parse_int(os.getenv("PRERENDER_LOOKAHEAD_MINUTES"), 5))  # 0 = render at due time
+
+    def get_prerender_max_entries(self) -> int:
+        return max(1, self._parse_int(os.getenv("PRERENDER_MAX_ENTRIES"), 5000))
+
+    # ---- `!l` listing cache / pagination
+    def get_listing_cache_size(self) -> int:
+        return max(1, self._parse_int(os.getenv("LISTING_CACHE_SIZE"), 5000))
+
+    def get_listing_cache_ttl_seconds(self) -> float:
+        return self._parse_float(os.getenv("LISTING_CACHE_TTL_SECONDS"), 300.0)
+
+    def get_listing_page_size(self) -> int:
+        return min(25, max(1, self._parse_int(os.getenv("LISTING_PAGE_SIZE"), 10)))
+
+    # ---- Discord user cache
+    def get_user_cache_size(self) -> int:
+        return max(1, self._parse_int(os.getenv("USER_CACHE_SIZE"), 10_000))
+
+    def get_user_cache_ttl_seconds(self) -> float:
+        return self._parse_float(os.getenv("USER_CACHE_TTL_SECONDS"), 3600.0)
+
+    # ---- Outbound chat sends
+    def get_chat_send_queue_size(self) -> int:
+        return max(1, self._parse_int(os.getenv("CHAT_SEND_QUEUE_SIZE"), 1000))
+
+    def get_chat_send_workers(self) -> int:
+        return max(1, self._parse_int(os.getenv("CHAT_SEND_WORKERS"), 4))
+
+    def get_chat_global_rate(self) -> float:
+        return self._parse_float(os.getenv("CHAT_GLOBAL_RATE"), 40.0)  # Discord global cap is 50/s
+
+    def get_chat_route_rate(self) -> float:
+        return self._parse_float(os.getenv("CHAT_ROUTE_RATE"), 1.0)
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import bisect
+import time as _time
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Optional
+
+import pytz
+
+MINUTES_PER_DAY = 24 * 60
+NEVER = 1 << 62  # "no further DST transition" sentinel, in epoch minutes
+
+
+@lru_cache(maxsize=None)
+def get_tz(name: str) -> pytz.BaseTzInfo:
+    """pytz.timezone(name), built once per name."""
+    return pytz.timezone(name)
+
+
+def is_valid_timezone(name: Optional[str]) -> bool:
+    if not name:
+        return False
+    try:
+        get_tz(name)
+    except pytz.UnknownTimeZoneError:
+        return False
+    return True
+
+
+def now_minute() -> int:
+    """Current UTC instant as whole epoch minutes."""
+    return int(_time.time() // 60)
+
+
+def minute_to_utc(minute: int) -> datetime:
+    return datetime.fromtimestamp(minute * 60, tz=pytz.utc)
+
+
+@lru_cache(maxsize=1 << 16)
+def _fire_minute_on(day: date, local_minute: int, tz: pytz.BaseTzInfo) -> int:
+    naive = datetime.combine(day, time(local_minute // 60, local_minute % 60))
+    try:
+        local = tz.localize(naive, is_dst=None)
+    except pytz.AmbiguousTimeError:
+        # Fall-back: the wall time happens twice; fire on the first one
+        local = tz.localize(naive, is_dst=True)
+    except pytz.NonExistentTimeError:
+        # Spring-forward: the wall time is skipped; fire just after the gap
+        # (02:30 -> 03:30 on a one-hour shift)
+        local = tz.normalize(tz.localize(naive, is_dst=False))
+    return int(local.timestamp()) // 60
+
+
+@lru_cache(maxsize=1 << 16)
+def next_fire_minute(local_minute: int, tz: pytz.BaseTzInfo, after_minute: int) -> int:
+    """
+    First UTC epoch minute >= after_minute at which local wall time equals local_minute.
+    Cached: a bulk load asks the same (minute, zone, after) question for many reminders.
+    """
+    today = minute_to_utc(after_minute).astimezone(tz).date()
+    for offset in (-1, 0, 1, 2):
+        candidate = _fire_minute_on(today + timedelta(days=offset), local_minute, tz)
+        if candidate >= after_minute:
+            return candidate
+    raise ValueError(f"no fire time found for minute {local_minute} in {tz}")
+
+
+def next_transition_minute(tz: pytz.BaseTzInfo, after_minute: int) -> int:
+    """Epoch minute of tz's next UTC-offset change after after_minute (NEVER if none)."""
+    transitions = getattr(tz, "_utc_transition_times", None)
+    if not transitions:
+        return NEVER
+    after = datetime.utcfromtimestamp(after_minute * 60)
+    i = bisect.bisect_right(transitions, after)
+    if i >= len(transitions):
+        return NEVER
+    return int((transitions[i] - datetime(1970, 1, 1)).total_seconds()) // 60
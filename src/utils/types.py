@@ -7,3 +7,23 @@ class AIClient(Protocol):
 @runtime_checkable
 class ChatClient(Protocol):
     async def send_dm(self, user_id: str, text: str) -> None: ...
+
+class RateLimitedError(Exception):
+    """Raised by a ChatClient when the platform answered 429; ChatManager retries after retry_after."""
+
+    def __init__(self, retry_after: float, *, is_global: bool = False):
+        super().__init__(f"rate limited (retry_after={retry_after:.2f}s, global={is_global})")
+        self.retry_after = retry_after
+        self.is_global = is_global
+
+class UndeliverableError(Exception):
+    """
+    Raised by a ChatClient when the platform will never accept a DM to this user
+    (DMs closed, bot blocked, account gone). Retrying is pointless; the outbox
+    records the user as undeliverable instead.
+    """
+
+    def __init__(self, user_id: str, reason: str):
+        super().__init__(f"cannot DM user {user_id}: {reason}")
+        self.user_id = user_id
+        self.reason = reason
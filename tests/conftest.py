@@ -0,0 +1,17 @@
+import pytest
+
+from src.dao.reminders_dao import RemindersDAO
+from src.services.database_manager import DatabaseManager
+from tests.support import DBConfig
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(DBConfig(str(tmp_path / "reminders.db")))
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def dao(db):
+    return RemindersDAO(db)
@@ -0,0 +1,8 @@
+class DBConfig:
+    """The one ConfigLoader getter DatabaseManager needs; the rest fall back to defaults."""
+
+    def __init__(self, path: str):
+        self._path = path
+
+    def get_sqlite_db_path(self) -> str:
+        return self._path
@@ -0,0 +1,99 @@
+import asyncio
+
+from src.dao.ack_dao import SENT, TAKEN, AckDAO
+from src.services.ack_log import AckLog
+
+DAY = 86400
+
+
+class DownDAO:
+    def __init__(self):
+        self.attempts = []
+
+    async def append(self, events):
+        self.attempts.append(len(events))
+        raise RuntimeError("database is locked")
+
+
+def test_failed_flushes_keep_at_most_max_buffered_events():
+    dao = DownDAO()
+    log = AckLog(dao, flush_size=1000, max_buffered=1000)
+
+    async def scenario():
+        for i in range(800):
+            log.record("u1", i, at=i)
+        await log.flush()
+        for i in range(800, 1500):
+            log.record("u1", i, at=i)
+        await log.flush()
+
+    asyncio.run(scenario())
+
+    assert dao.attempts[0] == 800 and max(dao.attempts) == 1000     # retries never resubmit more than the cap
+    assert log.stats()["buffered"] == 1000
+    assert log.stats()["dropped"] == 500
+    assert [event[1] for event in log._buffer[:2]] == [500, 501]     # oldest went first
+
+
+def test_append_keeps_latest_state_per_reminder(db):
+    acks = AckDAO(db)
+
+    async def scenario():
+        await acks.append([("u1", 1, SENT, 100), ("u1", 1, SENT, 300), ("u1", 1, TAKEN, 200), ("u1", 2, SENT, 50)])
+        await acks.append([("u1", 1, SENT, 250)])       # older than what's stored: ignored
+        return await acks.state(1), await acks.state(2), await acks.state(3)
+
+    assert asyncio.run(scenario()) == ((300, 200), (50, None), None)
+
+
+def test_mark_taken_confirms_the_latest_send_once(dao, db):
+    log = AckLog(AckDAO(db))
+
+    async def scenario():
+        meds = await dao.create_reminder("u1", "08:00", "meds", "batman")
+        water = await dao.create_reminder("u1", "12:00", "water", "batman")
+        log.record("u1", meds, at=1000)
+        log.record("u1", water, at=2000)
+        first = await log.mark_taken("u1", now=2100)              # flushes the buffered sends first
+        again = await log.mark_taken("u1", now=2200)
+        by_label = await log.mark_taken("u1", "meds", now=2300)
+        unknown = await log.mark_taken("u1", "vitamins", now=2400)
+        return first, again, by_label, unknown, await log.dao.last_taken("u1")
+
+    first, again, by_label, unknown, last = asyncio.run(scenario())
+
+    assert first == ("taken", "water", 2100)
+    assert again == ("already", "water", 2100)
+    assert by_label == ("taken", "meds", 2300)
+    assert unknown == ("none", "vitamins", None)
+    assert last == [("08:00", "meds", 1000, 2300), ("12:00", "water", 2000, 2100)]
+
+
+def test_compact_folds_old_events_into_daily_counts(dao, db):
+    acks = AckDAO(db)
+
+    async def scenario():
+        kept = await dao.create_reminder("u1", "08:00", "meds", "batman")
+        gone = await dao.create_reminder("u1", "09:00", "old", "batman")
+        await acks.append([
+            ("u1", kept, SENT, 1 * DAY + 10), ("u1", kept, TAKEN, 1 * DAY + 20),
+            ("u1", kept, SENT, 2 * DAY), ("u1", gone, SENT, 2 * DAY + 5),
+            ("u1", kept, SENT, 40 * DAY),
+        ])
+        await dao.delete_reminder("u1", "09:00", "old")
+        compacted = await acks.compact(before=30 * DAY, batch_size=2)
+
+        def read(conn):
+            daily = conn.execute("SELECT reminder_id, day, sent, taken FROM ack_daily ORDER BY reminder_id, day")
+            events = conn.execute("SELECT reminder_id, at FROM ack_events")
+            states = conn.execute("SELECT reminder_id FROM reminder_ack_state")
+            return [tuple(r) for r in daily], [tuple(r) for r in events], [r[0] for r in states]
+
+        return kept, gone, compacted, db.execute(read)
+
+    kept, gone, compacted, (daily, events, states) = asyncio.run(scenario())
+
+    assert compacted == 4
+    assert daily == [(kept, 1, 1, 1), (kept, 2, 1, 0), (gone, 2, 1, 0)]
+    assert events == [(kept, 40 * DAY)]
+    assert states == [kept]
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from src.dao import ai_cache_dao
+from src.dao.ai_cache_dao import AICacheDAO
+
+DAY = 86400
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ai_cache_dao.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(db):
+    return AICacheDAO(db)
+
+
+def _lines(cache, key):
+    return [line for _, line, _ in asyncio.run(cache.variants(key))]
+
+
+def test_add_variant_trims_the_pool_to_the_most_recently_used(cache, clock):
+    async def scenario():
+        for line in ("a", "b", "c"):
+            await cache.add_variant("k", line, pool_size=3)
+            clock.now += 1
+        await cache.add_variant("k", "a", pool_size=3)     # regenerated: counts as used, no new row
+        clock.now += 1
+        await cache.add_variant("k", "d", pool_size=3)     # pool full: b is the least recently used
+        await cache.add_variant("other", "x", pool_size=3)
+
+    asyncio.run(scenario())
+
+    assert _lines(cache, "k") == ["c", "a", "d"]
+    assert _lines(cache, "other") == ["x"]
+
+
+def test_variants_rotate_least_recently_used_first(cache, clock):
+    async def scenario():
+        for line in ("a", "b", "c"):
+            await cache.add_variant("k", line, pool_size=3)
+            clock.now += 1
+        served = []
+        for _ in range(4):
+            variant_id, line, _ = (await cache.variants("k"))[0]
+            served.append(line)
+            await cache.touch(variant_id)
+            clock.now += 1
+        return served
+
+    assert asyncio.run(scenario()) == ["a", "b", "c", "a"]
+
+
+def test_evict_drops_keys_unused_for_the_ttl(cache, clock):
+    async def scenario():
+        await cache.add_variant("mixed", "a", pool_size=3)
+        await cache.add_variant("mixed", "b", pool_size=3)
+        await cache.add_variant("old", "c", pool_size=3)           # never used again
+        clock.now += 10 * DAY
+        await cache.add_variant("mixed", "d", pool_size=3)         # one recent use keeps the whole key
+        await cache.add_variant("fresh", "e", pool_size=3)
+        clock.now += 10 * DAY
+        await cache.add_variant("fresh", "f", pool_size=3)
+        return await cache.evict(ttl_seconds=15 * DAY, max_keys=100)
+
+    deleted = asyncio.run(scenario())
+
+    assert deleted == 1
+    assert _lines(cache, "old") == []
+    assert _lines(cache, "mixed") == ["a", "b", "d"]
+    assert _lines(cache, "fresh") == ["e", "f"]
+
+
+def test_evict_keeps_only_the_most_recently_used_keys(cache, clock):
+    async def scenario():
+        for key in ("k1", "k2", "k3", "k4"):
+            await cache.add_variant(key, "a", pool_size=3)
+            await cache.add_variant(key, "b", pool_size=3)
+            clock.now += 1
+        await cache.add_variant("k1", "c", pool_size=3)     # k1 is the newest again
+        return await cache.evict(ttl_seconds=DAY, max_keys=2)
+
+    deleted = asyncio.run(scenario())
+
+    assert deleted == 4
+    assert [key for key in ("k1", "k2", "k3", "k4") if _lines(cache, key)] == ["k1", "k4"]
@@ -0,0 +1,133 @@
+import asyncio
+import json
+
+from aiohttp import web
+
+from src.services.ai_manager import AIManager
+from src.services.circuit_breaker import CLOSED, OPEN, CircuitBreaker
+
+
+async def _fake_ollama(delay: float, lines: int):
+    async def generate(request: web.Request) -> web.Response:
+        body = await request.json()
+        await asyncio.sleep(delay)
+        if body["stream"]:
+            chunk = json.dumps({"response": "Take your meds, citizen.", "done": True})
+            return web.Response(text=chunk + "\n", content_type="application/x-ndjson")
+        return web.json_response({"response": json.dumps([f"Line {i}." for i in range(lines)]), "done": True})
+
+    app = web.Application()
+    app.router.add_post("/api/generate", generate)
+    runner = web.AppRunner(app, shutdown_timeout=0.1)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+
+def _run(delay: float, items: int) -> AIManager:
+    async def scenario():
+        runner, host = await _fake_ollama(delay, items)
+        ai = AIManager(provider="ollama", ollama_host=host, enabled=True)
+        ai.batch_size = 8
+        ai.breaker = CircuitBreaker("ollama", failure_threshold=1, slow_call_seconds=0.1, reset_seconds=60)
+        try:
+            await ai.generate_batch([("batman", f"med {i}", None) for i in range(items)])
+        finally:
+            await ai.close()
+            await runner.cleanup()
+        return ai
+
+    return asyncio.run(scenario())
+
+
+def test_batch_call_slow_threshold_scales_with_items():
+    ai = _run(delay=0.3, items=8)       # 0.3s for 8 lines: well under 0.1s per line
+    assert ai.breaker.state == CLOSED
+    assert ai.breaker.stats()["slow"] == 0
+
+
+def test_slow_single_call_still_trips_the_breaker():
+    ai = _run(delay=0.3, items=1)
+    assert ai.breaker.state == OPEN
+    assert ai.breaker.stats()["slow"] == 1
+
+
+def test_batch_flags_lines_the_model_did_not_write():
+    async def scenario():
+        down = AIManager(provider="ollama", ollama_host="http://127.0.0.1:9", enabled=True)
+        disabled = AIManager(provider="ollama", enabled=False)
+        items = [("batman", "meds", "Sam"), ("batman", "water", None)]
+        try:
+            return await down.generate_batch(items), await disabled.generate_batch(items)
+        finally:
+            await down.close()
+            await disabled.close()
+
+    down, disabled = asyncio.run(scenario())
+
+    assert down == [("Remember to meds, Sam.\n- batman", True), ("Remember to water.\n- batman", True)]
+    assert [fallback for _, fallback in disabled] == [False, False]     # configured off: nothing failed
+
+
+class ChunkedResponse:
+    """Stands in for an aiohttp streaming response: NDJSON lines, as Ollama sends them."""
+
+    def __init__(self, *chunks, done_at=None):
+        self.lines = [
+            json.dumps({"response": text, "done": i == done_at}).encode() + b"\n" for i, text in enumerate(chunks)
+        ]
+        self.read = 0
+        self.closed = False
+
+    @property
+    def content(self):
+        return self._iter()
+
+    async def _iter(self):
+        for line in self.lines:
+            self.read += 1
+            yield line
+            yield b"\n"     # keep-alive blank lines are skipped
+
+    def close(self):
+        self.closed = True
+
+
+def _first_sentence(resp, max_chars=120):
+    ai = AIManager(enabled=False)
+    ai.max_chars = max_chars
+    return asyncio.run(ai._read_first_sentence(resp))
+
+
+def test_stream_stops_at_the_first_sentence():
+    resp = ChunkedResponse('"Take your', " meds now, citizen.", " Gotham needs", " you.", " More.", done_at=4)
+
+    assert _first_sentence(resp) == "Take your meds now, citizen."
+    # "citizen." only ends a sentence once the next chunk shows whitespace after it
+    assert resp.read == 3 and resp.closed       # the rest is never read; the connection is dropped
+
+
+def test_stream_skips_short_openers():
+    resp = ChunkedResponse("Hey. ", "Drink some water, friend.", done_at=1)
+
+    assert _first_sentence(resp) == "Hey. Drink some water, friend."
+    assert not resp.closed                      # finished on the done chunk: nothing left to cut off
+
+
+def test_stream_cut_at_max_chars_on_a_word_boundary():
+    resp = ChunkedResponse("Remember to take your evening ", "medication with plenty of water", done_at=None)
+
+    assert _first_sentence(resp, max_chars=40) == "Remember to take your evening."
+    assert resp.closed
+
+
+def test_stream_closed_early_returns_what_arrived():
+    cut_off = ChunkedResponse("Take your meds", " tonight")      # no done chunk, no sentence end
+    finished = ChunkedResponse("Take your meds", " tonight", done_at=1)
+    empty = ChunkedResponse()
+
+    assert _first_sentence(cut_off) == "Take your meds tonight"
+    assert _first_sentence(finished) == "Take your meds tonight"
+    assert _first_sentence(empty) == ""
+    assert not (cut_off.closed or finished.closed)
@@ -0,0 +1,114 @@
+import asyncio
+import csv
+import io
+import json
+
+from src.dao.reminders_dao import RemindersDAO
+from src.services.bulk_io import export_reminders, import_reminders
+from src.services.database_manager import DatabaseManager
+from tests.support import DBConfig
+
+LINES = [
+    {"user_id": "u1", "time": "08:00", "label": "meds", "persona": "batman", "timezone": "Europe/Berlin"},
+    {"user_id": "u1", "time_hhmm": "08:30", "label": "water", "persona": "batman"},        # time_hhmm alias
+    "not json",
+    ["a", "list"],
+    {"user_id": "u2", "time": "25:00", "label": "late", "persona": "batman"},
+    {"user_id": "u2", "time": "21:15", "label": "stretch", "persona": ""},
+    "",
+    {"user_id": "u3", "time": "07:00", "label": "walk", "persona": "soft voice", "timezone": "Mars/Olympus"},
+    {"user_id": 42, "time": "07:00", "label": "  walk ", "persona": "soft voice", "timezone": "asia/kolkata"},
+    {"user_id": "u1", "time": "08:00", "label": "meds", "persona": "batman"},              # duplicate in the file
+]
+
+EXPORTED = [
+    ("u1", "08:00", "meds", "batman", "Europe/Berlin"),
+    ("u1", "08:30", "water", "batman", "Europe/Berlin"),
+    ("42", "07:00", "walk", "soft voice", "Asia/Kolkata"),
+]
+
+
+def _jsonl(lines):
+    return io.StringIO("".join((line if isinstance(line, str) else json.dumps(line)) + "\n" for line in lines))
+
+
+def _rows(text: str, fmt: str):
+    if fmt == "csv":
+        return [
+            (r["user_id"], r["time"], r["label"], r["persona"], r["timezone"] or None)
+            for r in csv.DictReader(io.StringIO(text))
+        ]
+    return [
+        (r["user_id"], r["time"], r["label"], r["persona"], r.get("timezone"))
+        for r in map(json.loads, text.splitlines())
+    ]
+
+
+async def _export(dao, fmt):
+    out = io.StringIO()
+    written = await export_reminders(dao, out, fmt, batch_size=2)
+    return written, out.getvalue()
+
+
+def test_jsonl_import_reports_rejections_and_exports_what_was_imported(dao):
+    progress = []
+
+    async def scenario():
+        report = await import_reminders(dao, _jsonl(LINES), "jsonl", chunk_size=2, progress=lambda *p: progress.append(p))
+        return report, await _export(dao, "jsonl")
+
+    report, (written, text) = asyncio.run(scenario())
+
+    assert (report.read, report.imported, report.skipped, report.rejected) == (9, 3, 1, 5)
+    assert report.errors == [
+        "line 3: invalid JSON (Expecting value)",
+        "line 4: expected a JSON object",
+        "line 5: time must be HH:MM (24h)",
+        "line 6: user_id, label and persona are required",
+        "line 8: unknown timezone 'Mars/Olympus'",
+    ]
+    assert progress[-1] == (9, 3, 5) and len(progress) == 2       # one callback per written chunk
+    assert written == 3 and _rows(text, "jsonl") == EXPORTED
+    assert '"timezone"' in text.splitlines()[0]
+
+
+def test_reimporting_an_export_skips_every_row(dao):
+    async def scenario():
+        await import_reminders(dao, _jsonl(LINES), "jsonl")
+        _, text = await _export(dao, "jsonl")
+        again = await import_reminders(dao, io.StringIO(text), "jsonl")
+        return again, await _export(dao, "jsonl")
+
+    again, (written, _) = asyncio.run(scenario())
+
+    assert (again.read, again.imported, again.skipped, again.rejected) == (3, 0, 3, 0)
+    assert written == 3
+
+
+def test_csv_round_trip_into_a_fresh_database(dao, tmp_path):
+    other = DatabaseManager(DBConfig(str(tmp_path / "restored.db")))
+    restored = RemindersDAO(other)
+
+    async def scenario():
+        await import_reminders(dao, _jsonl(LINES), "jsonl")
+        _, csv_text = await _export(dao, "csv")
+        report = await import_reminders(restored, io.StringIO(csv_text, newline=""), "csv")
+        return csv_text, report, await _export(restored, "csv")
+
+    try:
+        csv_text, report, (written, again) = asyncio.run(scenario())
+    finally:
+        other.close()
+
+    assert csv_text.splitlines()[0] == "user_id,time,label,persona,timezone"
+    assert (report.imported, report.rejected) == (3, 0)
+    assert again == csv_text and _rows(again, "csv") == EXPORTED
+
+
+def test_csv_rejections_carry_line_numbers_and_errors_are_capped(dao):
+    text = "user_id,time,label,persona\n" + "".join(f"u{i},99:99,x,batman\n" for i in range(30)) + "u1,08:00,ok,batman\n"
+
+    report = asyncio.run(import_reminders(dao, io.StringIO(text), "csv", max_errors=3))
+
+    assert (report.read, report.imported, report.rejected) == (31, 1, 30)
+    assert report.errors == [f"line {n}: time must be HH:MM (24h)" for n in (2, 3, 4)]
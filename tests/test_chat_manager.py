@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+from src.services.chat_manager import ChatManager
+from src.utils.types import RateLimitedError
+
+
+class FakeClient:
+    def __init__(self, rate_limit_once=()):
+        self.sent = []              # (user_id, text, seconds since start)
+        self.rate_limit_once = set(rate_limit_once)
+        self.started = time.monotonic()
+
+    async def send_dm(self, user_id, text):
+        if user_id in self.rate_limit_once:
+            self.rate_limit_once.discard(user_id)
+            raise RateLimitedError(0.3)
+        self.sent.append((user_id, text, time.monotonic() - self.started))
+
+
+async def _send_all(chat, messages):
+    await asyncio.gather(*(chat.send_dm(user_id, text) for user_id, text in messages))
+    await chat.close()
+
+
+def test_busy_route_does_not_block_other_users():
+    chat = ChatManager(workers=2, route_rate=4.0, route_burst=1.0)
+    client = FakeClient()
+    chat.register("discord", client)
+
+    messages = [("busy", f"dose {i}") for i in range(4)] + [("other", "hello")]
+    asyncio.run(_send_all(chat, messages))
+
+    sent_at = {text: at for _, text, at in client.sent}
+    assert len(client.sent) == 5
+    # the other user's DM goes out right away, not after the busy channel's 0.25s refills
+    assert sent_at["hello"] < 0.1
+    # the busy channel still respects its own rate, in order
+    assert [text for user, text, _ in client.sent if user == "busy"] == [f"dose {i}" for i in range(4)]
+    assert sent_at["dose 3"] >= 0.7
+    assert chat.stats()["deferred"] == 0
+
+
+def test_queue_wait_excludes_retry_backoff():
+    chat = ChatManager(workers=1)
+    client = FakeClient(rate_limit_once={"u1"})
+    chat.register("discord", client)
+
+    asyncio.run(_send_all(chat, [("u1", "meds")]))
+
+    stats = chat.stats()
+    assert stats["sent"] == 1 and stats["retries"] == 1
+    assert stats["retry_delay_seconds_total"] >= 0.3
+    assert stats["wait_max_seconds"] < 0.1
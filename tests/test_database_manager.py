@@ -0,0 +1,77 @@
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+
+def _users(conn):
+    return [r[0] for r in conn.execute("SELECT user_id FROM users ORDER BY user_id")]
+
+
+def _hold_writer(db):
+    """Park the writer thread inside a unit until the returned event is set."""
+    entered, release = threading.Event(), threading.Event()
+
+    def blocker(conn):
+        entered.set()
+        release.wait(5)
+
+    done = db.submit_write(blocker)
+    assert entered.wait(5)
+    return release, done
+
+
+def _insert(user_id):
+    def work(conn):
+        conn.execute("INSERT INTO users(user_id) VALUES(?)", (user_id,))
+        return user_id
+    return work
+
+
+def test_failing_unit_is_rolled_back_alone_within_its_group(db):
+    def half_done(conn):
+        conn.execute("INSERT INTO users(user_id) VALUES('partial')")
+        raise ValueError("boom")
+
+    release, blocked = _hold_writer(db)
+    # Queued behind the blocker, so all three land in the next group
+    futures = [db.submit_write(_insert("a")), db.submit_write(half_done), db.submit_write(_insert("b"))]
+    release.set()
+    blocked.result(5)
+
+    assert futures[0].result(5) == "a" and futures[2].result(5) == "b"
+    with pytest.raises(ValueError, match="boom"):
+        futures[1].result(5)
+    stats = db.write_stats()
+    assert (stats["units"], stats["commits"], stats["max_group"]) == (4, 2, 3)     # blocker, then one group of three
+    assert stats["failed_units"] == 1
+    assert db.execute(_users) == ["a", "b"]
+
+
+def test_read_pool_is_read_only(db):
+    with pytest.raises(sqlite3.OperationalError, match="readonly"):
+        asyncio.run(db.run_read(_insert("intruder")))
+    assert db.execute(_users) == []
+
+
+def test_reads_proceed_while_the_writer_holds_a_transaction(db):
+    db.execute(_insert("committed"))
+    entered, release = threading.Event(), threading.Event()
+
+    def long_write(conn):
+        conn.execute("INSERT INTO users(user_id) VALUES('pending')")
+        entered.set()
+        release.wait(5)
+
+    pending = db.submit_write(long_write)
+    assert entered.wait(5)
+    try:
+        # The write transaction is open: readers see the last commit without waiting for it
+        during = asyncio.run(asyncio.wait_for(db.run_read(_users), timeout=2))
+    finally:
+        release.set()
+    pending.result(5)
+
+    assert during == ["committed"]
+    assert asyncio.run(db.run_read(_users)) == ["committed", "pending"]
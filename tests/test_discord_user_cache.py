@@ -0,0 +1,155 @@
+import asyncio
+
+import pytest
+
+from src.adapters.chat import discord_user_cache
+from src.adapters.chat.discord_user_cache import DiscordUserCache
+
+
+class FakeUser:
+    def __init__(self, uid):
+        self.id = uid
+        self.name = f"user{uid}"
+        self.dm_channel = None
+
+
+class FakeBot:
+    def __init__(self, gateway=(), fetch_delay=0.0, fail=False):
+        self.gateway = {uid: FakeUser(uid) for uid in gateway}
+        self.fetch_delay = fetch_delay
+        self.fail = fail
+        self.fetches = []
+
+    def get_user(self, uid):
+        return self.gateway.get(uid)
+
+    async def fetch_user(self, uid):
+        self.fetches.append(uid)
+        await asyncio.sleep(self.fetch_delay)
+        if self.fail:
+            raise RuntimeError("503 Service Unavailable")
+        return FakeUser(uid)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_concurrent_misses_share_one_fetch():
+    bot = FakeBot(fetch_delay=0.05)
+    cache = DiscordUserCache(bot)
+
+    async def scenario():
+        users = await asyncio.gather(*(cache.get_user("42") for _ in range(5)))
+        return users, await cache.get_user("42")
+
+    users, again = asyncio.run(scenario())
+
+    assert bot.fetches == [42]
+    assert all(user is users[0] for user in users) and again is users[0]
+    stats = cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 4, 1)
+    assert cache._inflight == {}
+
+
+def test_failed_fetch_reaches_every_waiter_and_is_retried():
+    bot = FakeBot(fetch_delay=0.05, fail=True)
+    cache = DiscordUserCache(bot)
+
+    async def scenario():
+        first = await asyncio.gather(cache.get_user("42"), cache.get_user("42"), return_exceptions=True)
+        bot.fail = False
+        return first, await cache.get_user("42")
+
+    first, retried = asyncio.run(scenario())
+
+    assert [type(result) for result in first] == [RuntimeError, RuntimeError]
+    assert retried.id == 42 and bot.fetches == [42, 42]
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_fetch():
+    bot = FakeBot(fetch_delay=0.05)
+    cache = DiscordUserCache(bot)
+
+    async def scenario():
+        impatient = asyncio.create_task(cache.get_user("42"))
+        patient = asyncio.create_task(cache.get_user("42"))
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+        return await patient, impatient
+
+    user, impatient = asyncio.run(scenario())
+
+    assert user.id == 42 and impatient.cancelled()
+    assert bot.fetches == [42]
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(discord_user_cache.time, "monotonic", clock)
+    bot = FakeBot()
+    cache = DiscordUserCache(bot, ttl_seconds=60)
+
+    async def scenario():
+        await cache.get_user("42")
+        clock.now += 59
+        await cache.get_user("42")
+        clock.now += 2
+        await cache.get_user("42")
+
+    asyncio.run(scenario())
+
+    assert bot.fetches == [42, 42]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expired"]) == (1, 2, 1)
+
+
+def test_least_recently_used_user_is_evicted():
+    bot = FakeBot(gateway=(1, 2))
+    cache = DiscordUserCache(bot, max_size=2)
+
+    async def scenario():
+        await cache.get_user("1")
+        await cache.get_user("2")
+        await cache.get_user("1")        # 2 is now the oldest
+        await cache.get_user("3")
+        return list(cache._entries)
+
+    assert asyncio.run(scenario()) == [1, 3]
+    stats = cache.stats()
+    assert (stats["gateway_hits"], stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 1, 1)
+    assert (stats["size"], stats["max_size"]) == (2, 2)
+
+
+@pytest.mark.parametrize("cached_channel", [False, True])
+def test_dm_channel_is_created_once(cached_channel):
+    class Channel:
+        pass
+
+    created = []
+
+    class DMUser(FakeUser):
+        async def create_dm(self):
+            created.append(self.id)
+            self.dm_channel = Channel()
+            return self.dm_channel
+
+    bot = FakeBot()
+    user = DMUser(7)
+    if cached_channel:
+        user.dm_channel = Channel()
+    bot.gateway[7] = user
+    cache = DiscordUserCache(bot)
+
+    async def scenario():
+        return await cache.get_dm_channel("7"), await cache.get_dm_channel("7")
+
+    first, second = asyncio.run(scenario())
+
+    assert first is second is user.dm_channel
+    assert created == ([] if cached_channel else [7])
+    assert cache.stats()["dm_channel_hits"] == 1
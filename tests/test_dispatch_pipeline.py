@@ -0,0 +1,127 @@
+import asyncio
+from datetime import datetime, timezone
+
+from src.services.dispatch_pipeline import DispatchPipeline, DueReminder
+from src.services.prerender import PrerenderStore, Prerenderer, stage_key
+
+
+class FakeAI:
+    def fallback_line(self, persona, label, user_name=None):
+        return f"Remember to {label}."
+
+
+class FakeManager:
+    def __init__(self, render_delay=0.0, model_down_for=()):
+        self.ai = FakeAI()
+        self.render_delay = render_delay
+        self.model_down_for = set(model_down_for)     # labels the model "fails" on
+        self.single = []
+        self.batches = []
+        self.upcoming = []
+
+    async def render_message(self, persona, label, user_name=None):
+        self.single.append((persona, label))
+        await asyncio.sleep(self.render_delay)
+        if label in self.model_down_for:
+            return f"Remember to {label}.", True
+        return f"{persona} says {label}", False
+
+    async def render_batch(self, items):
+        self.batches.append([(persona, label) for persona, label, _ in items])
+        await asyncio.sleep(self.render_delay)
+        return [
+            (f"Remember to {label}.", True) if label in self.model_down_for else (f"{persona} says {label}", False)
+            for persona, label, _ in items
+        ]
+
+    def peek_due(self, minute):
+        return self.upcoming
+
+
+class FakeChat:
+    def __init__(self):
+        self.sent = []
+
+    async def send_dm(self, user_id, text):
+        self.sent.append((user_id, text))
+
+
+def _due(*items):
+    now = datetime.now(timezone.utc)
+    return [DueReminder(user, persona, label, now, i + 1) for i, (user, persona, label) in enumerate(items)]
+
+
+def test_store_miss_is_rendered_on_demand():
+    manager, chat, store = FakeManager(), FakeChat(), PrerenderStore()
+    due = _due(("u1", "batman", "meds"), ("u2", "batman", "water"))
+    store.put(stage_key(due[0].send_at, "u1", "batman", "meds"), "staged line")
+    pipeline = DispatchPipeline(manager, chat, store=store)
+
+    report = asyncio.run(pipeline.run(due))
+
+    assert sorted(chat.sent) == [("u1", "staged line"), ("u2", "batman says water")]
+    assert manager.single == [("batman", "water")]
+    assert report.fallbacks == 0
+
+
+def test_store_miss_uses_fallback_once_budget_is_spent():
+    manager, chat = FakeManager(), FakeChat()
+    pipeline = DispatchPipeline(manager, chat, store=PrerenderStore(), render_budget_seconds=0.0)
+
+    report = asyncio.run(pipeline.run(_due(("u1", "batman", "meds"))))
+
+    assert chat.sent == [("u1", "Remember to meds.")]
+    assert manager.single == []
+    assert report.fallbacks == 1
+
+
+def test_store_misses_render_in_persona_batches_without_holding_staged_sends():
+    manager, chat, store = FakeManager(render_delay=0.2), FakeChat(), PrerenderStore()
+    due = _due(
+        ("u1", "batman", "meds"), ("u2", "batman", "water"), ("u3", "soft voice", "stretch"), ("u4", "batman", "staged")
+    )
+    store.put(stage_key(due[3].send_at, "u4", "batman", "staged"), "staged line")
+    pipeline = DispatchPipeline(manager, chat, store=store, batch_size=8)
+
+    report = asyncio.run(pipeline.run(due))
+
+    assert chat.sent[0] == ("u4", "staged line")
+    assert sorted(manager.batches) == [[("batman", "meds"), ("batman", "water")], [("soft voice", "stretch")]]
+    assert manager.single == []
+    assert report.sent == 4 and report.fallbacks == 0
+    assert [r.reminder_id for r in report.results] == [1, 2, 3, 4]
+
+
+def test_batch_fallback_lines_are_reported_as_fallbacks():
+    manager, chat = FakeManager(model_down_for={"water"}), FakeChat()
+    pipeline = DispatchPipeline(manager, chat, batch_size=8)
+
+    report = asyncio.run(pipeline.run(_due(("u1", "batman", "meds"), ("u2", "batman", "water"))))
+
+    assert [(r.label, r.fallback) for r in report.results] == [("meds", False), ("water", True)]
+    assert report.fallbacks == 1
+
+
+def test_prerender_does_not_stage_fallback_lines():
+    manager, store = FakeManager(model_down_for={"water"}), PrerenderStore()
+    at = datetime.now(timezone.utc)
+    manager.upcoming = [("u1", "batman", "meds", at), ("u2", "batman", "water", at)]
+
+    staged = asyncio.run(Prerenderer(manager, store, lookahead_minutes=1).run(0))
+
+    assert staged == 1
+    assert stage_key(at, "u1", "batman", "meds") in store
+    assert stage_key(at, "u2", "batman", "water") not in store
+
+
+def test_fallback_flags_survive_staging_and_single_renders():
+    manager, chat, store = FakeManager(model_down_for={"water"}), FakeChat(), PrerenderStore()
+    due = _due(("u1", "batman", "meds"), ("u2", "batman", "water"), ("u3", "batman", "stretch"))
+    store.put(stage_key(due[0].send_at, "u1", "batman", "meds"), "staged line")
+    store.put(stage_key(due[2].send_at, "u3", "batman", "stretch"), "Remember to stretch.", fallback=True)
+    pipeline = DispatchPipeline(manager, chat, store=store)
+
+    report = asyncio.run(pipeline.run(due))
+
+    assert [(r.label, r.fallback) for r in report.results] == [("meds", False), ("water", True), ("stretch", True)]
+    assert manager.single == [("batman", "water")]
@@ -0,0 +1,111 @@
+import asyncio
+
+from src.services import listing_cache
+from src.services.listing_cache import ListingCache
+from src.services.reminders_manager import PAGE_MAX_CHARS, RemindersManager
+
+ROWS = [("08:00", "meds", "batman")]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(listing_cache.time, "monotonic", clock)
+    cache = ListingCache(ttl_seconds=60)
+    cache.put("u1", ROWS)
+
+    clock.now += 59
+    assert cache.get("u1") == ROWS
+    clock.now += 1
+    assert cache.get("u1") is None
+    assert cache.stats() == {
+        "hits": 1, "misses": 1, "invalidations": 0, "evictions": 0, "stale_puts": 0, "size": 0,
+    }
+
+
+def test_least_recently_used_user_is_evicted():
+    cache = ListingCache(max_size=2)
+    cache.put("u1", ROWS)
+    cache.put("u2", ROWS)
+    cache.get("u1")
+    cache.put("u3", ROWS)
+
+    assert cache.get("u2") is None
+    assert cache.get("u1") == ROWS and cache.get("u3") == ROWS
+    assert cache.stats()["evictions"] == 1
+
+
+def test_put_after_invalidate_is_dropped():
+    cache = ListingCache()
+    generation = cache.generation("u1")
+    cache.invalidate("u1")
+    cache.put("u1", ROWS, generation)
+
+    assert cache.get("u1") is None
+    assert cache.stats()["stale_puts"] == 1
+
+
+def test_edit_during_a_listing_read_is_not_cached_over(dao):
+    manager = RemindersManager(dao, default_tz="UTC")
+
+    async def scenario():
+        await manager.create_reminder("u1", "batman", "08:00", "meds")
+        gate = asyncio.Event()
+        real_list = dao.list_reminders
+
+        async def slow_list(user_id, chat_id=1):
+            rows = await real_list(user_id, chat_id=chat_id)
+            await gate.wait()
+            return rows
+
+        dao.list_reminders = slow_list
+        listing = asyncio.create_task(manager.list_reminders("u1"))
+        await asyncio.sleep(0.05)
+        await manager.create_reminder("u1", "batman", "09:00", "water")
+        gate.set()
+        first = await listing
+        dao.list_reminders = real_list
+        return first, await manager.list_reminders("u1")
+
+    first, second = asyncio.run(scenario())
+
+    assert first == [("08:00", "meds", "batman")]
+    assert second == [("08:00", "meds", "batman"), ("09:00", "water", "batman")]
+
+
+def test_delete_invalidates_the_listing(dao):
+    manager = RemindersManager(dao, default_tz="UTC")
+
+    async def scenario():
+        await manager.create_reminder("u1", "batman", "08:00", "meds")
+        before = await manager.list_reminders("u1")
+        await manager.delete_reminder("u1", "08:00", "meds")
+        return before, await manager.list_reminders("u1")
+
+    assert asyncio.run(scenario()) == ([("08:00", "meds", "batman")], [])
+
+
+def test_reminder_pages_split_by_count_and_size(dao):
+    manager = RemindersManager(dao, default_tz="UTC")
+    rows = [(f"{h:02d}:00", f"label {h}", "batman") for h in range(23)]
+    manager.listings.put("u1", rows)
+    manager.listings.put("u2", [("08:00", "x" * 700, "batman") for _ in range(5)])
+    manager.listings.put("u3", [("08:00", "x" * 5000, "batman")])
+
+    by_count = asyncio.run(manager.get_reminder_pages("u1", page_size=10))
+    by_size = asyncio.run(manager.get_reminder_pages("u2", page_size=10))
+    one_long = asyncio.run(manager.get_reminder_pages("u3"))
+
+    assert [page.count("\n") + 1 for page in by_count] == [10, 10, 3]
+    assert by_count[0].startswith("- `00:00` — **label 0** (batman)")
+    assert [page.count("\n") + 1 for page in by_size] == [2, 2, 1]
+    assert all(len(page) <= PAGE_MAX_CHARS for page in by_size + one_long)
+    assert len(one_long) == 1 and one_long[0].endswith("…")
+    assert asyncio.run(manager.get_reminder_pages("nobody")) == []
@@ -0,0 +1,119 @@
+import asyncio
+import math
+import re
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+import src.services.outbox  # noqa: F401  (registers the outbox's metrics)
+from src.infra import metrics
+from src.infra.cron_http import make_app
+from src.infra.metrics import Registry
+
+_NAME = r"[a-zA-Z_:][a-zA-Z0-9_:]*"
+_LABEL = r'[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\["\\n])*"'
+_SAMPLE = re.compile(rf"^({_NAME})(\{{{_LABEL}(?:,{_LABEL})*\}})? (\S+)$")
+_KINDS = {"counter", "gauge", "histogram", "summary", "untyped"}
+
+
+def parse_exposition(text: str):
+    """
+    Check text against the Prometheus 0.0.4 text format and return
+    {family: (type, [(sample name, labels, value)])}.
+    """
+    assert text.endswith("\n")
+    families = {}
+    current = None
+    for line in text.splitlines():
+        if line.startswith("# HELP "):
+            name = line.split(" ", 3)[2]
+            assert re.fullmatch(_NAME, name), line
+            assert name not in families, f"duplicate family {name}"
+            current = name
+            families[name] = [None, []]
+        elif line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            assert name == current and kind in _KINDS, line
+            families[name][0] = kind
+        else:
+            m = _SAMPLE.match(line)
+            assert m, f"bad sample line: {line!r}"
+            name, labels, value = m.groups()
+            kind = families[current][0]
+            suffixes = ("_bucket", "_sum", "_count") if kind == "histogram" else ("",)
+            assert any(name == current + s for s in suffixes), f"{name} outside its family {current}"
+            parsed = float("inf") if value == "+Inf" else float(value)
+            families[current][1].append((name, dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', labels or "")), parsed))
+    for name, (kind, samples) in families.items():
+        assert kind is not None, f"{name} has no TYPE"
+        if kind == "histogram":
+            _check_histogram(name, samples)
+    return {name: (kind, samples) for name, (kind, samples) in families.items()}
+
+
+def _check_histogram(name, samples):
+    series = {}
+    for sample, labels, value in samples:
+        key = tuple(sorted((k, v) for k, v in labels.items() if k != "le"))
+        series.setdefault(key, {"buckets": [], "sum": None, "count": None})
+        if sample.endswith("_bucket"):
+            series[key]["buckets"].append((float(labels["le"].replace("+Inf", "inf")), value))
+        else:
+            series[key][sample.rsplit("_", 1)[1]] = value
+    for key, s in series.items():
+        bounds = [b for b, _ in s["buckets"]]
+        counts = [c for _, c in s["buckets"]]
+        assert bounds == sorted(bounds) and bounds[-1] == math.inf, (name, key)
+        assert counts == sorted(counts), f"{name}{key} buckets are not cumulative"
+        assert counts[-1] == s["count"] and s["sum"] is not None, (name, key)
+
+
+def test_render_is_valid_exposition_text():
+    registry = Registry("test")
+    sends = registry.counter("sends_total", "DMs sent", ("platform", "result"))
+    sends.labels("discord", "ok").inc(3)
+    sends.labels("discord", 'say "hi"\\\n').inc()
+    registry.gauge("queue_depth", "Queued").set(2.5)
+    registry.gauge_callback("by_shard", "Per shard", lambda: {("0",): 4, ("1",): 0}, ("shard",))
+    registry.gauge_callback("broken", "Raises on scrape", lambda: 1 / 0)
+    latency = registry.histogram("latency_seconds", "Latency", ("kind",), buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        latency.labels("read").observe(value)
+
+    families = parse_exposition(registry.render())
+
+    assert families["test_sends_total"] == ("counter", [
+        ("test_sends_total", {"platform": "discord", "result": "ok"}, 3),
+        ("test_sends_total", {"platform": "discord", "result": 'say \\"hi\\"\\\\\\n'}, 1),
+    ])
+    assert families["test_queue_depth"][1] == [("test_queue_depth", {}, 2.5)]
+    assert [s[2] for s in families["test_by_shard"][1]] == [4, 0]
+    assert families["test_broken"] == ("gauge", [])
+    assert [(labels["le"], value) for name, labels, value in families["test_latency_seconds"][1] if "le" in labels] == [
+        ("0.1", 2), ("1", 3), ("+Inf", 4),     # le is inclusive
+    ]
+
+
+def test_labels_must_match_the_declared_names():
+    registry = Registry("test")
+    sends = registry.counter("sends_total", "DMs sent", ("platform",))
+    with pytest.raises(ValueError, match="expects labels"):
+        sends.labels("discord", "extra")
+    assert registry.counter("sends_total", "DMs sent", ("platform",)) is sends     # re-registration keeps the series
+
+
+def test_metrics_route_serves_the_global_registry():
+    async def scenario():
+        client = TestClient(TestServer(await make_app(bot=None)))
+        await client.start_server()
+        try:
+            resp = await client.get("/metrics")
+            return resp.status, resp.headers["Content-Type"], await resp.text()
+        finally:
+            await client.close()
+
+    status, content_type, text = asyncio.run(scenario())
+
+    assert status == 200 and content_type == metrics.CONTENT_TYPE
+    families = parse_exposition(text)
+    assert families["medsbot_outbox_events_total"][0] == "counter"
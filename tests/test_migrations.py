@@ -0,0 +1,37 @@
+import sqlite3
+
+import pytest
+
+from src.database.migrations import HOT_QUERIES, LATEST_VERSION, check_query_plans, migrate, schema_version
+
+
+@pytest.fixture
+def conn():
+    connection = sqlite3.connect(":memory:", isolation_level=None)
+    migrate(connection)
+    yield connection
+    connection.close()
+
+
+def test_fresh_database_is_migrated_to_latest(conn):
+    assert schema_version(conn) == LATEST_VERSION
+    assert migrate(conn) == 0
+
+
+@pytest.mark.parametrize("name, sql, params", HOT_QUERIES, ids=[q[0] for q in HOT_QUERIES])
+def test_hot_query_does_not_scan(conn, name, sql, params):
+    plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+    assert not [step for step in plan if step.startswith("SCAN")], plan
+    assert check_query_plans(conn, [(name, sql, params)]) == []
+
+
+def test_covering_index_scan_is_reported(conn):
+    query = ("full index read", "SELECT user_id FROM reminders WHERE label=?", ("x",))
+    plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query[1]}", query[2])]
+    assert any("COVERING INDEX" in step for step in plan), plan
+
+    assert check_query_plans(conn, [query]) == [f"full index read: {plan[0]}"]
+
+
+def test_database_manager_migrates_on_open(db):
+    assert db.execute(schema_version) == LATEST_VERSION
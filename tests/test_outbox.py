@@ -0,0 +1,111 @@
+import asyncio
+import contextlib
+import time
+from collections import Counter
+
+from src.dao.outbox_dao import OutboxDAO
+from src.services.dispatch_pipeline import DispatchPipeline
+from src.services.outbox import Outbox
+from src.services.reminders_manager import RemindersManager
+from src.services.shard_leases import shard_of
+from src.utils.timezones import minute_to_utc, now_minute
+
+
+class FakeChat:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent = []
+
+    async def send_dm(self, user_id, text):
+        await asyncio.sleep(self.delay)
+        self.sent.append((user_id, text))
+
+
+class DownChat:
+    async def send_dm(self, user_id, text):
+        raise RuntimeError("gateway down")
+
+
+def _enqueue(db, rows):
+    """rows: [(reminder_id, fire_minute, user_id, next_attempt_at)]"""
+    def work(conn):
+        conn.executemany(
+            "INSERT INTO outbox(reminder_id, fire_minute, chat_id, user_id, persona, label, text, next_attempt_at) "
+            "VALUES(?, ?, 1, ?, 'batman', 'meds', 'take your meds', ?)",
+            rows,
+        )
+
+    db.execute(work)
+
+
+def test_drain_is_not_starved_by_other_shards_rows(db):
+    users = [str(u) for u in range(1000)]
+    ours = [u for u in users if shard_of(u, 4) == 1]
+    theirs = [u for u in users if shard_of(u, 4) != 1]
+    now = time.time()
+    minute = int(now // 60)
+    # A full batch of other workers' rows is due before any of ours
+    _enqueue(db, [(i, minute, u, now - 100 + i * 0.01) for i, u in enumerate(theirs[:50])])
+    _enqueue(db, [(1000 + i, minute, u, now - 10) for i, u in enumerate(ours[:5])])
+    chat = FakeChat()
+    outbox = Outbox(OutboxDAO(db), chat, batch_size=20)
+    outbox.shard_count = 4
+    outbox.owned_shards = lambda: frozenset({1})
+
+    delivered = asyncio.run(outbox.drain())
+
+    assert delivered == 5
+    assert sorted(u for u, _ in chat.sent) == sorted(ours[:5])
+    assert asyncio.run(outbox.dao.pending_count()) == 50
+
+
+def test_tick_longer_than_the_hold_sends_each_dm_once(dao, db):
+    chat = FakeChat(delay=0.05)
+    outbox = Outbox(OutboxDAO(db), chat, hold_seconds=0.2, backoff_seconds=0.05)
+    manager = RemindersManager(dao, default_tz="UTC", outbox=outbox)
+    pipeline = DispatchPipeline(manager, chat, concurrency=2, outbox=outbox)
+    users = [f"u{i}" for i in range(30)]
+
+    async def scenario():
+        minute = now_minute()
+        for user in users:
+            await dao.create_reminder(user, minute_to_utc(minute).strftime("%H:%M"), "meds", "batman")
+        tick = asyncio.create_task(pipeline.run(await manager.take_due(minute)))
+        while not tick.done():      # the retry worker polls throughout the ~0.75s tick
+            await outbox.drain()
+            await asyncio.sleep(0.02)
+        report = await tick
+        await asyncio.sleep(0.3)
+        await outbox.drain()
+        return report, await outbox.dao.pending_count()
+
+    report, pending = asyncio.run(scenario())
+
+    assert report.elapsed > 3 * outbox.hold_seconds
+    assert report.sent == len(users)
+    assert Counter(user for user, _ in chat.sent) == Counter(users)
+    assert pending == 0
+
+
+def test_release_frees_held_rows_but_keeps_retry_backoff(dao, db):
+    outbox = Outbox(OutboxDAO(db), DownChat(), backoff_seconds=600)
+    minute = now_minute()
+
+    async def scenario():
+        held = await dao.create_reminder("u1", "08:00", "meds", "batman")
+        failing = await dao.create_reminder("u2", "08:00", "meds", "batman")
+        await dao.claim_fires(
+            [(held, minute), (failing, minute)], {0: minute},
+            outbox={(held, minute): ("u1", "batman", "meds"), (failing, minute): ("u2", "batman", "meds")},
+            hold_seconds=120,
+        )
+        with contextlib.suppress(RuntimeError):
+            await outbox.deliver((failing, minute), "u2", "take your meds")   # backed off ~10 min
+        released = await outbox.load()
+        due = await outbox.dao.due(time.time() + 60)
+        return held, released, [row.reminder_id for row in due]
+
+    held, released, due = asyncio.run(scenario())
+
+    assert released == 1
+    assert due == [held]
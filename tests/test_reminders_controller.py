@@ -0,0 +1,122 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.controllers.reminders_controller import INLINE_USAGE, RemindersController
+from src.services.reminders_manager import RemindersManager
+
+
+class FakeCtx:
+    def __init__(self, user_id=1):
+        self.author = SimpleNamespace(id=user_id)
+        self.sent = []
+
+    async def send(self, text=None, **kwargs):
+        self.sent.append(text)
+
+
+class FakeResponse:
+    def __init__(self):
+        self.sent = []
+
+    def is_done(self):
+        return bool(self.sent)
+
+    async def send_message(self, text, ephemeral=False):
+        self.sent.append((text, ephemeral))
+
+
+class FakeInteraction:
+    def __init__(self, user_id=1):
+        self.user = SimpleNamespace(id=user_id)
+        self.response = FakeResponse()
+        self.followup = SimpleNamespace(send=self.response.send_message)
+
+
+@pytest.mark.parametrize("args, expected", [
+    ("08:00 batman | Take Adderall", ("08:00", "batman", "Take Adderall")),
+    ("  21:30   gremlin best friend |   drink water  ", ("21:30", "gremlin best friend", "drink water")),
+    ('08:00 batman | "Take meds"', ("08:00", "batman", "Take meds")),
+    ("08:00 batman | 'Take meds'", ("08:00", "batman", "Take meds")),
+    ("08:00 “soft voice” | “stretch”", ("08:00", "soft voice", "stretch")),
+    ('08:00 batman | "pills | vitamins"', ("08:00", "batman", "pills | vitamins")),    # only the first | splits
+    ('08:00 batman | "Take meds', ("08:00", "batman", '"Take meds')),                  # unbalanced: kept as typed
+    ("25:00 batman | meds", ("25:00", "batman", "meds")),                               # time is the manager's job
+])
+def test_parse_inline(args, expected):
+    assert RemindersController.parse_inline(args) == expected
+
+
+@pytest.mark.parametrize("args", [
+    "08:00 | meds",             # no persona
+    '08:00 "" | meds',          # quoted but empty persona
+    "08:00 batman |",           # no label
+    "08:00 batman | ''",
+    "08:00 batman meds",        # no separator
+    "batman | meds",            # no time: "batman" is taken as the time, leaving no persona
+    "",
+    None,
+])
+def test_parse_inline_rejects_incomplete_commands(args):
+    assert RemindersController.parse_inline(args) is None
+
+
+def test_inline_command_validates_the_time_and_usage(dao):
+    manager = RemindersManager(dao, default_tz="UTC")
+    controller = RemindersController(manager)
+
+    async def scenario():
+        ctx = FakeCtx()
+        await controller.handle_create_reminder(ctx, "25:00 batman | meds")
+        await controller.handle_create_reminder(ctx, "08:00 | meds")
+        await controller.handle_create_reminder(ctx, '08:05 soft voice | "stretch"')
+        return ctx.sent, await manager.list_reminders("1")
+
+    sent, rows = asyncio.run(scenario())
+
+    assert sent == [
+        "Time must be HH:MM in 24-hour format (e.g., 08:00, 21:30).",
+        INLINE_USAGE,
+        "✅ Added `stretch` at `08:05` (soft voice).",
+    ]
+    assert rows == [("08:05", "stretch", "soft voice")]
+
+
+def test_remind_interaction_creates_and_reports_errors_privately(dao):
+    manager = RemindersManager(dao, default_tz="UTC")
+    controller = RemindersController(manager)
+
+    async def scenario():
+        replies = []
+        for persona, time_str, label in [
+            (" batman ", "08:00", ' "Take meds" '),
+            ("batman", "8:75", "water"),
+            ("   ", "09:00", "walk"),          # persona that is only whitespace
+            ("batman", "09:00", '""'),
+        ]:
+            interaction = FakeInteraction()
+            await controller.handle_remind_interaction(interaction, persona, time_str, label)
+            replies.extend(interaction.response.sent)
+        return replies, await manager.list_reminders("1")
+
+    replies, rows = asyncio.run(scenario())
+
+    assert replies == [
+        ("✅ Added `Take meds` at `08:00` (batman).", False),
+        ("Time must be HH:MM in 24-hour format (e.g., 08:00, 21:30).", True),
+        ("Persona and label can't be blank.", True),
+        ("Persona and label can't be blank.", True),
+    ]
+    assert rows == [("08:00", "Take meds", "batman")]
+
+
+def test_remind_interaction_reports_failures():
+    class BrokenManager:
+        async def create_reminder(self, **kwargs):
+            raise RuntimeError("database is locked")
+
+    interaction = FakeInteraction()
+    asyncio.run(RemindersController(BrokenManager()).handle_remind_interaction(interaction, "batman", "08:00", "meds"))
+
+    assert interaction.response.sent == [("❌ Something went wrong creating the reminder. Check logs.", True)]
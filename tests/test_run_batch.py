@@ -0,0 +1,137 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from src.cogs import reminders_cog
+from src.cogs.reminders_cog import RemindersCog
+from src.dao.reminders_dao import RemindersDAO
+from src.services.database_manager import DatabaseManager
+from src.services.dispatch_pipeline import DispatchReport, DispatchResult
+from src.services.reminders_manager import RemindersManager
+from tests.support import DBConfig
+
+START = int(datetime(2026, 6, 1, 9, 0, tzinfo=timezone.utc).timestamp()) // 60     # 09:00 UTC
+TIMES = [f"09:{m:02d}" for m in range(1, 11)]                                        # one reminder per minute after
+
+
+class RecordingPipeline:
+    def __init__(self):
+        self.sent = []
+
+    async def run(self, due):
+        self.sent.extend((d.label, d.send_at.strftime("%H:%M")) for d in due)
+        return DispatchReport([DispatchResult(d.user_id, d.label, True, False, 0.0) for d in due], 0.0)
+
+
+class Worker:
+    """A RemindersCog wired to a real manager and DB, without a Discord bot."""
+
+    def __init__(self, path, monkeypatch, now):
+        self.db = DatabaseManager(DBConfig(path))
+        self.manager = RemindersManager(RemindersDAO(self.db), default_tz="UTC", max_catchup_minutes=30)
+        self.pipeline = RecordingPipeline()
+        self.cog = RemindersCog.__new__(RemindersCog)
+        self.cog.bot = SimpleNamespace(chat=object())
+        self.cog.manager, self.cog.controller, self.cog.pipeline = self.manager, object(), self.pipeline
+        self.cog.leases, self.cog._init_error = None, None
+        self.cog._dispatch_lock = asyncio.Lock()
+        self.now = now
+        monkeypatch.setattr(reminders_cog, "now_minute", lambda: self.now)
+
+    async def start(self):
+        await self.manager.load_schedule(now=self.now)
+
+    async def tick(self, now, window_minutes=None):
+        self.now = now
+        await self.cog.run_batch(window_minutes)
+        return self.pipeline.sent
+
+    def close(self):
+        self.db.close()
+
+
+async def _seed(worker):
+    for i, hhmm in enumerate(TIMES):
+        await worker.manager.create_reminder(f"u{i}", persona="batman", time_str=hhmm, label=f"r{hhmm}")
+
+
+def test_missed_minutes_are_caught_up_once(tmp_path, monkeypatch):
+    worker = Worker(str(tmp_path / "reminders.db"), monkeypatch, START)
+
+    async def scenario():
+        await _seed(worker)
+        await worker.start()
+        await worker.tick(START)                    # high-water mark: 09:00
+        caught_up = list(await worker.tick(START + len(TIMES)))    # the loop stalled for 10 minutes
+        again = await worker.tick(START + len(TIMES))
+        return caught_up, again
+
+    try:
+        caught_up, again = asyncio.run(scenario())
+    finally:
+        worker.close()
+
+    assert caught_up == [(f"r{t}", t) for t in TIMES]
+    assert again == caught_up
+
+
+def test_restart_replays_the_gap_once_and_resends_nothing(tmp_path, monkeypatch):
+    path = str(tmp_path / "reminders.db")
+    first = Worker(path, monkeypatch, START)
+
+    async def before_crash():
+        await _seed(first)
+        await first.start()
+        await first.tick(START)
+        return list(await first.tick(START + 3))    # 09:01-09:03 sent, then the process dies
+
+    try:
+        sent_before = asyncio.run(before_crash())
+    finally:
+        first.close()
+
+    gap_end = START + len(TIMES)
+    second = Worker(path, monkeypatch, gap_end)
+
+    async def after_restart():
+        await second.start()                        # down 09:04-09:09: replayed from the high-water mark
+        sent = list(await second.tick(gap_end))
+        await second.tick(gap_end + 1)
+        return sent, second.pipeline.sent
+
+    try:
+        sent_after, total = asyncio.run(after_restart())
+    finally:
+        second.close()
+
+    third = Worker(path, monkeypatch, gap_end + 1)  # and a restart with nothing missed resends nothing
+
+    async def second_restart():
+        await third.start()
+        return await third.tick(gap_end + 1)
+
+    try:
+        sent_third = asyncio.run(second_restart())
+    finally:
+        third.close()
+
+    assert sent_before == [(f"r{t}", t) for t in TIMES[:3]]
+    assert sent_after == [(f"r{t}", t) for t in TIMES[3:]]
+    assert total == sent_after and sent_third == []
+
+
+def test_fires_older_than_the_window_are_skipped(tmp_path, monkeypatch):
+    worker = Worker(str(tmp_path / "reminders.db"), monkeypatch, START)
+
+    async def scenario():
+        await _seed(worker)
+        await worker.start()
+        await worker.tick(START)
+        return await worker.tick(START + len(TIMES), window_minutes=2)
+
+    try:
+        sent = asyncio.run(scenario())
+    finally:
+        worker.close()
+
+    assert sent == [(f"r{t}", t) for t in TIMES[-3:]]
@@ -0,0 +1,234 @@
+import asyncio
+import threading
+from datetime import datetime, timezone
+
+from src.services.reminders_manager import RemindersManager
+from src.services.schedule_index import ScheduleIndex
+from src.utils.timezones import MINUTES_PER_DAY, now_minute
+
+ROWS = [
+    (1, "u1", "batman", "meds", "08:00", None),
+    (2, "u1", "batman", "water", "12:30", "Europe/Berlin"),
+    (3, "u2", "soft voice", "stretch", "21:15", "Asia/Kolkata"),
+]
+
+
+def _utc(text: str) -> int:
+    """'2026-03-08 07:30' (UTC) -> epoch minutes."""
+    return int(datetime.strptime(text, "%Y-%m-%d %H:%M").replace(tzinfo=timezone.utc).timestamp()) // 60
+
+
+def _fires(index: ScheduleIndex, start: int, end: int):
+    """Tick minute by minute like the dispatcher; [(fire_minute, label)]."""
+    out = []
+    for minute in range(start, end + 1):
+        out.extend((fire, e.label) for fire, e in index.pop_due(minute))
+    return out
+
+
+def _loaded(rows=ROWS) -> ScheduleIndex:
+    index = ScheduleIndex("UTC")
+    index.load(rows, now_minute())
+    return index
+
+
+def test_diff_consistent():
+    assert _loaded().diff(ROWS) == (set(), set())
+
+
+def test_diff_reports_missing_and_extra_rows():
+    index = _loaded()
+    index.remove("u1", "12:30", "water")
+    index.add(9, "u3", "batman", "late", "23:59", None, now_minute())
+
+    missing, extra = index.diff(ROWS)
+
+    assert missing == {(2, "u1", "batman", "water", "12:30", "Europe/Berlin")}
+    assert extra == {(9, "u3", "batman", "late", "23:59", "UTC")}
+
+
+def test_diff_resolves_default_timezone():
+    index = _loaded()
+    index.set_timezone("u2", None, now_minute())
+
+    missing, extra = index.diff(ROWS)
+
+    assert {row[0] for row in missing} == {3}
+    assert extra == {(3, "u2", "soft voice", "stretch", "21:15", "UTC")}
+
+
+def test_add_ignores_known_reminder_id():
+    index = _loaded()
+    index.add(1, "u1", "batman", "meds", "08:00", None, now_minute())
+    assert len(index) == len(ROWS)
+
+
+def test_load_schedule_builds_off_the_loop_and_keeps_concurrent_edits(dao, monkeypatch):
+    manager = RemindersManager(dao, default_tz="UTC")
+    loop_thread = []
+    real_load = ScheduleIndex.load
+
+    def load(index, rows, after_minute):
+        loop_thread.append(threading.current_thread() is threading.main_thread())
+        real_load(index, rows, after_minute)
+
+    monkeypatch.setattr(ScheduleIndex, "load", load)
+
+    async def scenario():
+        await manager.create_reminder("u1", persona="batman", time_str="08:00", label="meds")
+        gate = asyncio.Event()
+        real_list = dao.list_active_schedule
+
+        async def slow_list(chat_id=1):
+            rows = await real_list(chat_id=chat_id)
+            await gate.wait()
+            return rows
+
+        dao.list_active_schedule = slow_list
+        loading = asyncio.create_task(manager.load_schedule())
+        await asyncio.sleep(0)
+        # Runs while the load is in flight: must survive the swap to the new index
+        await manager.create_reminder("u2", persona="batman", time_str="09:00", label="water")
+        await manager.delete_reminder("u1", "08:00", "meds")
+        gate.set()
+        count = await loading
+        dao.list_active_schedule = real_list
+        return count, await manager.check_schedule()
+
+    count, drift = asyncio.run(scenario())
+
+    assert loop_thread == [False]
+    assert count == 1
+    assert drift == (0, 0)
+
+
+def test_sync_user_keeps_unchanged_entries_and_applies_edits():
+    index = _loaded()
+    kept = next(e for e in index._by_user["u1"] if e.reminder_id == 1)
+    rows = [
+        (1, "u1", "batman", "meds", "08:00", None),                 # unchanged
+        (2, "u1", "batman", "water", "12:30", "America/Chicago"),   # timezone moved
+        (4, "u1", "batman", "walk", "18:00", None),                 # new
+    ]
+
+    added, removed = index.sync_user("u1", rows, now_minute())
+
+    assert (added, removed) == (2, 1)
+    assert kept in index._by_user["u1"]
+    assert index.diff(rows + ROWS[2:]) == (set(), set())
+    assert index.sync_user("u1", [], now_minute()) == (0, 3)
+    assert index.user_timezone("u1") is None
+
+
+def test_spring_forward_gap_fires_just_after_the_gap():
+    # America/New_York, 2026-03-08: 02:00 EST jumps to 03:00 EDT (07:00 UTC)
+    index = ScheduleIndex("America/New_York")
+    start = _utc("2026-03-07 12:00")
+    index.load([(1, "u1", "batman", "in gap", "02:30", None), (2, "u1", "batman", "after", "08:00", None)], start)
+
+    fires = _fires(index, start, _utc("2026-03-10 00:00"))
+
+    assert fires == [
+        (_utc("2026-03-07 13:00"), "after"),        # 08:00 EST
+        (_utc("2026-03-08 07:30"), "in gap"),       # 02:30 doesn't exist: 03:30 EDT
+        (_utc("2026-03-08 12:00"), "after"),        # 08:00 EDT
+        (_utc("2026-03-09 06:30"), "in gap"),       # 02:30 EDT again
+        (_utc("2026-03-09 12:00"), "after"),
+    ]
+
+
+def test_fall_back_repeat_fires_once():
+    # America/New_York, 2026-11-01: 02:00 EDT falls back to 01:00 EST (06:00 UTC), so 01:30 happens twice
+    index = ScheduleIndex("America/New_York")
+    start = _utc("2026-10-31 12:00")
+    index.load([(1, "u1", "batman", "repeat", "01:30", None), (2, "u1", "batman", "after", "08:00", None)], start)
+
+    fires = _fires(index, start, _utc("2026-11-03 00:00"))
+
+    assert fires == [
+        (_utc("2026-10-31 12:00"), "after"),        # 08:00 EDT
+        (_utc("2026-11-01 05:30"), "repeat"),       # first 01:30 (EDT); not again at 06:30
+        (_utc("2026-11-01 13:00"), "after"),        # 08:00 EST
+        (_utc("2026-11-02 06:30"), "repeat"),       # 01:30 EST
+        (_utc("2026-11-02 13:00"), "after"),
+    ]
+    assert index.stats()["tz_recomputes"] > 0
+
+
+def test_set_timezone_rebuckets_every_entry_of_the_user():
+    index = _loaded()
+    start = _utc("2026-06-01 00:00")
+    index.load(ROWS, start)
+    u2 = index._by_user["u2"][0]
+
+    moved = index.set_timezone("u1", "Asia/Kolkata", start)       # UTC+05:30
+
+    assert moved == 2 and index.user_timezone("u1") == "Asia/Kolkata"
+    assert index._by_user["u2"] == [u2]
+    by_label = {e.label: e for e in index._by_user["u1"]}
+    assert by_label["meds"].fire_minute == _utc("2026-06-01 02:30")     # 08:00 IST
+    assert by_label["water"].fire_minute == _utc("2026-06-01 07:00")    # 12:30 IST
+    for e in by_label.values():
+        assert e in index._buckets[e.fire_minute % MINUTES_PER_DAY]
+        assert sum(bucket.count(e) for bucket in index._buckets) == 1
+    assert [label for _, label in _fires(index, start, _utc("2026-06-01 08:00"))] == ["meds", "water"]
+
+    index.set_timezone("u1", None, _utc("2026-06-01 08:01"))
+    assert index.diff(ROWS) == ({ROWS[1]}, {(2, "u1", "batman", "water", "12:30", "UTC")})
+    assert by_label["meds"].fire_minute == _utc("2026-06-02 08:00")
+
+
+def test_manager_set_timezone_moves_the_next_fire(dao):
+    manager = RemindersManager(dao, default_tz="UTC")
+    ist_fire = -(-(now_minute() + 1 - 150) // MINUTES_PER_DAY) * MINUTES_PER_DAY + 150     # next 02:30 UTC
+    utc_fire = ist_fire + 330                                                               # 08:00 UTC after it
+
+    async def scenario():
+        await manager.create_reminder("u1", persona="batman", time_str="08:00", label="meds")
+        await manager.load_schedule()
+        ok, _ = await manager.set_timezone("u1", "Asia/Kolkata")
+        return ok, await manager.take_due(now=ist_fire), await manager.take_due(now=utc_fire)
+
+    ok, early, late = asyncio.run(scenario())
+
+    assert ok
+    assert [(d.label, d.send_at.strftime("%H:%M")) for d in early] == [("meds", "02:30")]    # 08:00 IST
+    assert late == []
+
+
+def test_degraded_dispatch_uses_each_users_timezone(dao):
+    # No load_schedule(): take_due falls back to range queries on the reminders table
+    manager = RemindersManager(dao, default_tz="America/New_York")
+
+    async def scenario():
+        await manager.create_reminder("ny", persona="batman", time_str="02:30", label="in gap")
+        await manager.create_reminder("ny", persona="batman", time_str="08:00", label="ny morning")
+        await manager.create_reminder("in", persona="batman", time_str="13:00", label="ist lunch")
+        await manager.create_reminder("in", persona="batman", time_str="02:30", label="ist night")
+        await manager.create_reminder("utc", persona="batman", time_str="07:30", label="utc")
+        await manager.set_timezone("in", "Asia/Kolkata")
+        await manager.set_timezone("utc", "UTC")
+        assert not manager.schedule.loaded
+        await manager.take_due(now=_utc("2026-03-08 06:50"))          # sets the high-water mark
+        return await manager.take_due(now=_utc("2026-03-08 07:40"), window_minutes=60)
+
+    due = asyncio.run(scenario())
+
+    assert sorted((d.user_id, d.label, d.send_at.strftime("%H:%M")) for d in due) == [
+        ("in", "ist lunch", "07:30"),       # 13:00 IST
+        ("ny", "in gap", "07:30"),          # 02:30 skipped in New York: 03:30 EDT
+        ("utc", "utc", "07:30"),
+    ]
+
+
+def test_degraded_dispatch_fires_a_fall_back_repeat_once(dao):
+    manager = RemindersManager(dao, default_tz="America/New_York")
+
+    async def scenario():
+        await manager.create_reminder("ny", persona="batman", time_str="01:30", label="repeat")
+        await manager.take_due(now=_utc("2026-11-01 05:00"))
+        return await manager.take_due(now=_utc("2026-11-01 07:00"), window_minutes=180)
+
+    due = asyncio.run(scenario())
+
+    assert [d.send_at.strftime("%H:%M") for d in due] == ["05:30"]
@@ -0,0 +1,282 @@
+"""
+Multi-process dispatch: several workers share one SQLite file, split the users
+into shards via leases, one worker crashes part-way and another joins late.
+Meanwhile a separate process creates and deletes reminders and moves users to
+other timezones. Every expected (reminder, fire minute) must be sent exactly once.
+
+Time is simulated: one "minute" lasts `step` seconds of wall time.
+"""
+import asyncio
+import json
+import multiprocessing as mp
+import os
+import random
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+from src.dao.reminders_dao import RemindersDAO
+from src.dao.shard_lease_dao import ShardLeaseDAO
+from src.services.database_manager import DatabaseManager
+from src.services.reminders_manager import RemindersManager
+from src.services.shard_leases import LeaseManager, shard_of
+from src.utils.timezones import get_tz, minute_to_utc, next_fire_minute, now_minute
+from tests.support import DBConfig
+
+TIMEZONES = [None, "Europe/Berlin", "Asia/Kolkata", "America/Los_Angeles"]
+
+PARAMS = SimpleNamespace(
+    workers=3, shards=8, reminders=3000, users=600, minutes=120, step=0.05, lease=0.6,
+    edit_at=20, settle=50, edits=40,    # edits land at start+edit_at; none of them fires before start+settle
+)
+
+
+def _seed(path: str, params, start: int) -> list:
+    rnd = random.Random(7)
+    db = DatabaseManager(DBConfig(path))
+    rows = [
+        (i + 1, str(rnd.randrange(params.users)), f"{rnd.randrange(24):02d}:{rnd.randrange(60):02d}")
+        for i in range(params.reminders)
+    ]
+
+    def work(conn):
+        conn.executemany(
+            "INSERT OR IGNORE INTO users(user_id, timezone) VALUES(?,?)",
+            [(str(u), rnd.choice(TIMEZONES)) for u in range(params.users)],
+        )
+        conn.executemany(
+            "INSERT INTO reminders(id, user_id, chat_id, label, persona, time_hhmm, active) "
+            "VALUES(?,?,1,?,'p',?,1)",
+            [(rid, uid, f"r{rid}", t) for rid, uid, t in rows],
+        )
+        # Pretend the fleet has dispatched everything before `start`
+        conn.executemany(
+            "INSERT INTO dispatch_state(name, value) VALUES(?, ?)",
+            [(f"hwm:1:{s}", start - 1) for s in range(params.shards)],
+        )
+        return [
+            (r["id"], r["user_id"], r["timezone"], r["time_hhmm"])
+            for r in conn.execute("SELECT r.id, r.user_id, u.timezone, r.time_hhmm FROM reminders r JOIN users u USING(user_id)")
+        ]
+
+    expected = db.execute(work)
+    db.close()
+    return expected
+
+
+def _worker(name: str, path: str, out_path: str, params, t0: float, start: int, crash_at: int) -> None:
+    asyncio.run(_run_worker(name, path, out_path, params, t0, start, crash_at))
+
+
+async def _run_worker(name, path, out_path, params, t0, start, crash_at) -> None:
+    end = start + params.minutes
+    db = DatabaseManager(DBConfig(path))
+    manager = RemindersManager(
+        RemindersDAO(db), "America/New_York", max_catchup_minutes=params.minutes, shard_count=params.shards
+    )
+    leases = LeaseManager(ShardLeaseDAO(db), params.shards, worker_id=name, lease_seconds=params.lease)
+
+    def vnow() -> int:
+        return start + int((time.time() - t0) / params.step)
+
+    await asyncio.sleep(max(0.0, t0 - time.time()))
+    await manager.load_schedule(now=vnow())
+    last_renew = 0.0
+    with open(out_path, "w") as out:
+        while True:
+            now = min(vnow(), end)
+            if time.monotonic() - last_renew >= params.lease / 3:
+                await leases.renew()
+                last_renew = time.monotonic()
+            await manager.set_owned_shards(leases.owned(), now)
+            for due in await manager.take_due(now):
+                out.write(f"{due.reminder_id} {int(due.send_at.timestamp()) // 60} {name}\n")
+            out.flush()
+            if 0 <= crash_at <= now:
+                os._exit(3)     # simulated crash: no lease release, no cleanup
+            if now >= end:
+                break
+            await asyncio.sleep(params.step / 4)
+    db.close()
+
+
+def _editor(path: str, out_path: str, params, t0: float, start: int, edits: dict) -> None:
+    asyncio.run(_run_editor(path, out_path, params, t0, start, edits))
+
+
+async def _run_editor(path, out_path, params, t0, start, edits) -> None:
+    """Another bot process taking commands: it owns no shards and never loads a schedule."""
+    db = DatabaseManager(DBConfig(path))
+    manager = RemindersManager(RemindersDAO(db), "America/New_York", shard_count=params.shards)
+    await asyncio.sleep(max(0.0, t0 + params.edit_at * params.step - time.time()))
+    for user_id, hhmm, label in edits["delete"]:
+        assert (await manager.delete_reminder(user_id, hhmm, label))[0]
+    for user_id, tz_name in edits["timezone"]:
+        assert (await manager.set_timezone(user_id, tz_name))[0]
+    created = []
+    for user_id, hhmm in edits["create"]:
+        assert (await manager.create_reminder(user_id, "p", hhmm, f"new {hhmm}"))[0]
+        created.append(db.execute(lambda conn: conn.execute("SELECT MAX(id) FROM reminders").fetchone()[0]))
+    with open(out_path, "w") as out:
+        json.dump({"created": created, "done": start + int((time.time() - t0) / params.step)}, out)
+    db.close()
+
+
+def _fires(tz_name, hhmm: str, start: int, end: int) -> list:
+    tz = get_tz(tz_name or "America/New_York")
+    local = int(hhmm[:2]) * 60 + int(hhmm[3:])
+    out = []
+    fire = next_fire_minute(local, tz, start)
+    while fire <= end:
+        out.append(fire)
+        fire = next_fire_minute(local, tz, fire + 1)
+    return out
+
+
+def _expected_fires(rows, start: int, end: int) -> set:
+    return {(rid, fire) for rid, _, tz_name, hhmm in rows for fire in _fires(tz_name, hhmm, start, end)}
+
+
+def _plan_edits(rows, params, start: int, end: int) -> dict:
+    """
+    Deletes, timezone moves and creates whose fires (before and after the edit)
+    all fall after start + settle, so the outcome doesn't depend on tick timing.
+    """
+    rnd = random.Random(11)
+    settle = start + params.settle
+    by_user = {}
+    for row in rows:
+        by_user.setdefault(row[1], []).append(row)
+
+    def clear(fires):
+        return all(f >= settle for f in fires)
+
+    deletes, moves = [], []
+    for rid, user_id, tz_name, hhmm in rows:
+        fires = _fires(tz_name, hhmm, start, end)
+        if fires and clear(fires) and len(deletes) < params.edits:
+            deletes.append((user_id, hhmm, f"r{rid}"))
+    deleted_users = {d[0] for d in deletes}
+    for user_id in rnd.sample(sorted(by_user), len(by_user)):
+        if len(moves) >= params.edits or user_id in deleted_users:
+            continue
+        user_rows = by_user[user_id]
+        new_tz = rnd.choice([tz for tz in ["Australia/Sydney", "America/Chicago", "Europe/London"] if tz != user_rows[0][2]])
+        old = [f for _, _, tz_name, hhmm in user_rows for f in _fires(tz_name, hhmm, start, end)]
+        new = [f for _, _, _, hhmm in user_rows for f in _fires(new_tz, hhmm, start, end)]
+        if (old or new) and clear(old) and clear(new):
+            moves.append((user_id, new_tz))
+    moved = {m[0] for m in moves}
+    creates = []
+    for user_id in rnd.sample(sorted(set(by_user) - moved), params.edits):
+        target = rnd.randrange(settle, end)
+        tz = get_tz(by_user[user_id][0][2] or "America/New_York")
+        creates.append((user_id, minute_to_utc(target).astimezone(tz).strftime("%H:%M")))
+    return {"delete": deletes, "timezone": moves, "create": creates}
+
+
+def _apply_edits(expected: set, rows, edits: dict, created: list, start: int, end: int) -> set:
+    expected = set(expected)
+    rows_by_user = {}
+    for row in rows:
+        rows_by_user.setdefault(row[1], []).append(row)
+    deleted = {int(label[1:]) for _, _, label in edits["delete"]}
+    expected = {(rid, fire) for rid, fire in expected if rid not in deleted}
+    for user_id, new_tz in edits["timezone"]:
+        for rid, _, tz_name, hhmm in rows_by_user[user_id]:
+            expected -= {(rid, fire) for fire in _fires(tz_name, hhmm, start, end)}
+            expected |= {(rid, fire) for fire in _fires(new_tz, hhmm, start, end)}
+    for rid, (user_id, hhmm) in zip(created, edits["create"]):
+        tz_name = rows_by_user[user_id][0][2]
+        expected |= {(rid, fire) for fire in _fires(tz_name, hhmm, start, end)}
+    return expected
+
+
+def test_workers_crash_and_join_without_double_sends_or_gaps(tmp_path):
+    params = PARAMS
+    ctx = mp.get_context("spawn")
+    path = str(tmp_path / "shards.db")
+    start = now_minute()
+    end = start + params.minutes
+    rows = _seed(path, params, start)
+    edits = _plan_edits(rows, params, start, end)
+    assert all(len(edits[kind]) == params.edits for kind in ("delete", "timezone", "create"))
+
+    t0 = time.time() + 2.0   # give every process time to start before minute `start`
+    procs = []
+    for i in range(params.workers):
+        crash_at = start + params.minutes // 3 if i == 0 else -1
+        p = ctx.Process(target=_worker, args=(f"w{i}", path, str(tmp_path / f"w{i}.out"), params, t0, start, crash_at))
+        p.start()
+        procs.append(p)
+
+    editor = ctx.Process(target=_editor, args=(path, str(tmp_path / "edits.json"), params, t0, start, edits))
+    editor.start()
+
+    # A late joiner takes a share of the shards mid-run
+    time.sleep(max(0.0, t0 + params.minutes / 2 * params.step - time.time()))
+    late = ctx.Process(target=_worker, args=("late", path, str(tmp_path / "late.out"), params, t0, start, -1))
+    late.start()
+    procs.append(late)
+    for p in procs + [editor]:
+        p.join(timeout=120)
+    assert editor.exitcode == 0
+    editor_out = json.loads((tmp_path / "edits.json").read_text())
+    assert editor_out["done"] < start + params.settle     # otherwise the expectations below are racy
+    created = editor_out["created"]
+    expected = _apply_edits(_expected_fires(rows, start, end), rows, edits, created, start, end)
+
+    sent = Counter()
+    by_worker = Counter()
+    for out in tmp_path.glob("*.out"):
+        for line in out.read_text().splitlines():
+            rid, minute, worker = line.split()
+            sent[(int(rid), int(minute))] += 1
+            by_worker[worker] += 1
+
+    assert [p.exitcode for p in procs] == [3] + [0] * params.workers     # w0 crashes on purpose
+    assert by_worker["late"] > 0 and all(by_worker[f"w{i}"] > 0 for i in range(params.workers))
+    assert [k for k, n in sent.items() if n > 1] == []
+    assert sorted(expected - set(sent))[:5] == []
+    assert sorted(set(sent) - expected)[:5] == []
+
+
+def test_edits_from_another_process_reach_the_owner(db):
+    owner = RemindersManager(RemindersDAO(db), "UTC", shard_count=2)
+    other = RemindersManager(RemindersDAO(db), "UTC", shard_count=2)
+    user = "42"
+    owner.owned_shards = frozenset({shard_of(user, 2)})
+    minute = now_minute() + 5
+    hhmm = minute_to_utc(minute).strftime("%H:%M")
+
+    async def scenario():
+        await other.create_reminder(user, "batman", hhmm, "pills1")
+        await owner.load_schedule(now=minute - 10)
+        await other.create_reminder(user, "batman", hhmm, "pills2")
+        await other.delete_reminder(user, hhmm, "pills1")
+        return [due.label for due in await owner.take_due(minute)]
+
+    assert asyncio.run(scenario()) == ["pills2"]
+
+
+def test_claim_fires_skips_deleted_reminders(dao):
+    async def scenario():
+        kept = await dao.create_reminder("u1", "08:00", "kept", "batman")
+        gone = await dao.create_reminder("u1", "09:00", "gone", "batman")
+        await dao.delete_reminder("u1", "09:00", "gone")
+        return kept, await dao.claim_fires([(kept, 100), (gone, 100)], {0: 100})
+
+    kept, claimed = asyncio.run(scenario())
+    assert claimed == {(kept, 100)}
+
+
+def test_one_worker_claims_each_gateway_event(db):
+    a = LeaseManager(ShardLeaseDAO(db), 4, worker_id="a")
+    b = LeaseManager(ShardLeaseDAO(db), 4, worker_id="b")
+
+    async def scenario():
+        first = [await a.claim_event(1001), await b.claim_event(1001)]
+        pruned = await a.dao.prune_events(1002)
+        return first, pruned, await b.claim_event(1001)
+
+    assert asyncio.run(scenario()) == ([True, False], 1, True)
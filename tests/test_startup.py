@@ -0,0 +1,103 @@
+import asyncio
+
+import discord
+import pytest
+from discord.ext import commands
+
+from src.cogs.events_cog import EventsCog
+from src.infra.startup import command_tree_hash, read_synced_hash, write_synced_hash
+
+
+class SyncConfig:
+    def __init__(self, state_path: str, force: bool = False):
+        self.state_path = state_path
+        self.force = force
+
+    def get_command_sync_state_path(self) -> str:
+        return self.state_path
+
+    def get_force_command_sync(self) -> bool:
+        return self.force
+
+
+def _bot(*names: str) -> commands.Bot:
+    bot = commands.Bot(command_prefix="!", intents=discord.Intents.default())
+    for name in names:
+        async def callback(interaction: discord.Interaction):
+            await interaction.response.send_message(name)
+
+        bot.tree.command(name=name, description=f"{name} command")(callback)
+    return bot
+
+
+def _boot(bot: commands.Bot, config: SyncConfig) -> list:
+    """Fire on_ready twice (start + gateway reconnect); returns the tree.sync calls."""
+    calls = []
+
+    async def fake_sync(*, guild=None):
+        calls.append(guild)
+        return []
+
+    bot.tree.sync = fake_sync
+    bot.config = config
+    cog = EventsCog(bot)
+
+    async def ready():
+        await cog.on_ready()
+        await cog.on_ready()
+
+    asyncio.run(ready())
+    return calls
+
+
+@pytest.fixture
+def state_path(tmp_path):
+    return str(tmp_path / "state" / "command_tree.sha256")
+
+
+def test_tree_hash_is_stable_and_tracks_changes():
+    assert command_tree_hash(_bot("remind", "list").tree) == command_tree_hash(_bot("list", "remind").tree)
+    assert command_tree_hash(_bot("remind").tree) != command_tree_hash(_bot("remind", "ping").tree)
+    assert command_tree_hash(_bot("remind").tree, 1) != command_tree_hash(_bot("remind").tree, 2)
+
+
+def test_synced_hash_round_trip(state_path):
+    assert read_synced_hash(state_path) is None
+    write_synced_hash(state_path, "abc123")
+    assert read_synced_hash(state_path) == "abc123"
+
+
+def test_first_boot_syncs_and_records_the_hash(state_path):
+    bot = _bot("remind")
+    assert _boot(bot, SyncConfig(state_path)) == [None]
+    assert read_synced_hash(state_path) == command_tree_hash(bot.tree)
+
+
+def test_unchanged_tree_skips_sync(state_path):
+    _boot(_bot("remind"), SyncConfig(state_path))
+    assert _boot(_bot("remind"), SyncConfig(state_path)) == []
+
+
+def test_changed_tree_syncs_and_rewrites_the_hash(state_path):
+    _boot(_bot("remind"), SyncConfig(state_path))
+    bot = _bot("remind", "ping")
+
+    assert _boot(bot, SyncConfig(state_path)) == [None]
+    assert read_synced_hash(state_path) == command_tree_hash(bot.tree)
+
+
+def test_force_command_sync_always_syncs(state_path):
+    _boot(_bot("remind"), SyncConfig(state_path))
+    assert _boot(_bot("remind"), SyncConfig(state_path, force=True)) == [None]
+    assert _boot(_bot("remind"), SyncConfig(state_path, force=True)) == [None]
+
+
+def test_force_command_sync_reads_env(monkeypatch, tmp_path):
+    from src.utils.config_loader import ConfigLoader
+
+    monkeypatch.setenv("SQLITE_DB_PATH", str(tmp_path / "reminders.db"))
+    monkeypatch.setenv("FORCE_COMMAND_SYNC", "true")
+    config = ConfigLoader()
+
+    assert config.get_force_command_sync() is True
+    assert config.get_command_sync_state_path() == str(tmp_path / "command_tree.sha256")
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.infra import tracing
+from src.infra.cron_http import make_app
+from src.infra.tracing import TRACER, Tracer, annotate, record, span
+
+
+def test_spans_aggregate_per_stage_within_a_tick():
+    tracer = Tracer(capacity=2, slow_tick_seconds=0)
+    leftovers = []
+
+    async def send(i):
+        with span("send"):
+            await asyncio.sleep(0.01 * i)
+
+    async def late_flush():
+        await asyncio.sleep(0.05)
+        record("flush", 1.0)        # the tick is over by now
+        leftovers.append(True)
+
+    async def scenario():
+        record("outside", 1.0)      # no tick: ignored
+        async with tracer.tick("dispatch") as trace:
+            with span("claim"):
+                record("db", 0.25)
+                record("db", 0.5)
+            await asyncio.gather(send(1), send(2))      # tasks inherit the tick
+            annotate(due=2, sent=2)
+            flush = asyncio.create_task(late_flush())
+        await flush
+        return trace
+
+    trace = asyncio.run(scenario())
+
+    [tick] = tracer.recent()
+    assert tick["name"] == "dispatch" and tick["meta"] == {"due": 2, "sent": 2}
+    assert set(tick["stages"]) == {"claim", "db", "send"}
+    assert tick["stages"]["db"] == {"count": 2, "total": 0.75, "max": 0.5}
+    assert tick["stages"]["send"]["count"] == 2
+    assert tick["stages"]["send"]["max"] >= 0.02
+    assert list(tick["stages"])[0] == "db"             # largest total first
+    assert leftovers and "flush" not in trace.stages
+    assert trace.duration >= tick["stages"]["send"]["max"]
+
+
+def test_recent_keeps_the_last_capacity_ticks_and_logs_slow_ones(caplog):
+    tracer = Tracer(capacity=2, slow_tick_seconds=0.02)
+
+    async def scenario():
+        for i in range(3):
+            async with tracer.tick(f"t{i}"):
+                await asyncio.sleep(0.03 if i == 2 else 0)
+
+    with caplog.at_level(logging.WARNING, logger=tracing.__name__):
+        asyncio.run(scenario())
+
+    assert [t["name"] for t in tracer.recent()] == ["t1", "t2"]
+    assert [t["name"] for t in tracer.recent(1)] == ["t2"] and tracer.recent(0) == []
+    [slow] = [r.getMessage() for r in caplog.records]
+    assert slow.startswith("Slow tick (>= 0.0s): t2 ")
+
+
+def test_profile_future_resolves_after_the_requested_ticks():
+    tracer = Tracer()
+
+    async def scenario():
+        fut = tracer.start_profile(2)
+        with pytest.raises(RuntimeError, match="already running"):
+            tracer.start_profile(1)
+        async with tracer.tick("dispatch"):
+            sum(range(1000))
+        async with tracer.tick("outbox"):       # other tick names are not profiled
+            pass
+        pending_after_one = not fut.done()
+        async with tracer.tick("dispatch"):
+            pass
+        return pending_after_one, await asyncio.wait_for(fut, 1)
+
+    pending_after_one, report = asyncio.run(scenario())
+
+    assert pending_after_one
+    assert report.startswith("cProfile over 2 dispatch tick(s)")
+    assert "cumulative" in report
+    assert tracer.last_profile == report and not tracer.profiling
+
+
+def test_cancel_profile_cancels_the_waiter():
+    tracer = Tracer()
+
+    async def scenario():
+        fut = tracer.start_profile(1)
+        assert tracer.cancel_profile()
+        async with tracer.tick("dispatch"):
+            pass
+        return fut
+
+    fut = asyncio.run(scenario())
+
+    assert fut.cancelled()
+    assert tracer.last_profile is None and not tracer.cancel_profile()
+
+
+def test_profile_and_trace_routes(monkeypatch):
+    monkeypatch.setattr(TRACER, "last_profile", None)
+
+    async def scenario():
+        client = TestClient(TestServer(await make_app(bot=None)))
+        await client.start_server()
+        try:
+            none_yet = (await client.get("/debug/profile")).status
+            waiting = asyncio.create_task(client.post("/debug/profile?ticks=1&wait=1"))
+            while not TRACER.profiling:
+                await asyncio.sleep(0.01)
+            running = await client.get("/debug/profile")
+            busy = await client.post("/debug/profile")
+            async with TRACER.tick("dispatch"):
+                annotate(due=1)
+            resp = await waiting
+            report = await resp.text()
+            last = await (await client.get("/debug/profile")).text()
+            traces = await (await client.get("/debug/traces?n=1")).json()
+            bad = (await client.get("/debug/traces?n=x")).status
+            return none_yet, (running.status, await running.json()), busy.status, resp.status, report, last, traces, bad
+        finally:
+            TRACER.cancel_profile()
+            await client.close()
+
+    none_yet, running, busy, status, report, last, traces, bad = asyncio.run(scenario())
+
+    assert none_yet == 404
+    assert running == (404, {"ok": False, "status": "running"})
+    assert busy == 409
+    assert status == 200 and report.startswith("cProfile over 1 dispatch tick(s)")
+    assert last == report
+    assert traces["ticks"][-1]["meta"] == {"due": 1}
+    assert bad == 400